@@ -0,0 +1,153 @@
+# backends_busca.py
+#
+# Implementações da busca de vizinhos usada por busca_midia. Todas recebem
+# os itens de indice_midia.carregar() (ids + vetores do acervo de embeddings)
+# e respondem buscar(consultas, k) -> (ids, similaridades), com as
+# similaridades na escala dos limites (1 - distância angular / 2).
+#
+#   "exato"  multiplicação de matrizes NumPy/BLAS; recall 100%, bom até
+#            algumas dezenas de milhares de mídias
+#   "annoy"  o index.ann já gerado pelo importador; search_k troca
+#            velocidade por recall (o delta ainda não mesclado é busca exata)
+#   "hnsw"   hnswlib (opcional, pip install hnswlib); ef troca velocidade
+#            por recall; o grafo fica em cache em data_midia/index_annoy
+#
+# Escolha com BUSCA_MIDIA_BACKEND no .env (padrão "exato") ou passando o
+# nome para busca_midia.carregar_index(). Ver teste_benchmark_busca.py.
+
+import hashlib
+
+import numpy as np
+
+from app_midia_manual_importer import indice_midia
+
+
+def normalizar(vetores):
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return vetores / normas
+
+
+def para_similaridade(cos):
+    """Cosseno → escala usada nos limites (1 - distância angular / 2)."""
+    return 1 - np.sqrt(np.clip(2 - 2 * cos, 0, None)) / 2
+
+
+def _top_k(cos, k):
+    """Posições e cossenos dos k maiores de cada linha, do maior para o menor."""
+    k = min(k, cos.shape[1])
+    if k == 0:
+        return np.empty((len(cos), 0), dtype=int), np.empty((len(cos), 0))
+    # argpartition acha os k maiores sem ordenar a linha inteira
+    posicoes = np.argpartition(-cos, k - 1, axis=1)[:, :k]
+    valores = np.take_along_axis(cos, posicoes, axis=1)
+    ordem = np.argsort(-valores, axis=1)
+    return np.take_along_axis(posicoes, ordem, axis=1), np.take_along_axis(valores, ordem, axis=1)
+
+
+class BuscaExata:
+    """Similaridade contra todos os itens, em lote."""
+
+    nome = "exato"
+
+    def __init__(self, ids, vetores):
+        self.ids = np.asarray(ids, dtype="int64")
+        self.vetores = normalizar(np.asarray(vetores, dtype="float32"))
+        self._posicao = {int(i): p for p, i in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def buscar(self, consultas, k):
+        posicoes, cos = _top_k(consultas @ self.vetores.T, k)
+        return self.ids[posicoes], para_similaridade(cos)
+
+
+class BuscaAnnoy(BuscaExata):
+    """index.ann para as linhas já mescladas + busca exata nas do delta."""
+
+    nome = "annoy"
+
+    def __init__(self, ids, vetores, search_k=-1):
+        super().__init__(ids, vetores)
+        from annoy import AnnoyIndex
+
+        self.search_k = search_k   # -1 = padrão do Annoy (n_arvores * k)
+        self.annoy = AnnoyIndex(indice_midia.VECTOR_SIZE, "angular")
+        if indice_midia.ANNOY_FILE.exists():
+            self.annoy.load(str(indice_midia.ANNOY_FILE))
+        no_annoy = self.ids < self.annoy.get_n_items()
+        self._delta = np.flatnonzero(~no_annoy)
+
+    def buscar(self, consultas, k):
+        k = min(k, len(self.ids))
+        ids_final = np.empty((len(consultas), k), dtype="int64")
+        sims_final = np.empty((len(consultas), k))
+        validos = self._posicao
+        for linha, consulta in enumerate(consultas):
+            achados, distancias = self.annoy.get_nns_by_vector(
+                consulta, k, search_k=self.search_k, include_distances=True
+            )
+            candidatos = [(1 - d / 2, i) for i, d in zip(achados, distancias) if i in validos]
+            if len(self._delta):
+                cos = self.vetores[self._delta] @ consulta
+                candidatos += [(s, int(self.ids[p])) for s, p in zip(para_similaridade(cos), self._delta)]
+            if len(candidatos) < k:
+                # Annoy devolveu poucos (search_k baixo ou ids apagados): busca exata
+                ids_final[linha], sims_final[linha] = BuscaExata.buscar(self, consulta[None], k)
+                continue
+            candidatos.sort(reverse=True)
+            candidatos = candidatos[:k]
+            sims_final[linha] = [s for s, _ in candidatos]
+            ids_final[linha] = [i for _, i in candidatos]
+        return ids_final, sims_final
+
+
+class BuscaHNSW(BuscaExata):
+    """Grafo HNSW (hnswlib), reconstruído só quando os itens mudam."""
+
+    nome = "hnsw"
+    CACHE = indice_midia.INDEX_DIR / "hnsw.bin"
+    CACHE_ASSINATURA = indice_midia.INDEX_DIR / "hnsw_assinatura.txt"
+
+    def __init__(self, ids, vetores, ef=64, M=16, ef_construction=200):
+        super().__init__(ids, vetores)
+        import hnswlib
+
+        # hash dos ids E dos vetores: mesmo id com outro conteúdo (acervo
+        # recriado, mídia trocada) invalida o grafo
+        assinatura = self._assinatura(M, ef_construction)
+        self.hnsw = hnswlib.Index(space="cosine", dim=indice_midia.VECTOR_SIZE)
+        if (self.CACHE.exists() and self.CACHE_ASSINATURA.exists()
+                and self.CACHE_ASSINATURA.read_text(encoding="utf-8").strip() == assinatura):
+            self.hnsw.load_index(str(self.CACHE), max_elements=len(self.ids))
+        else:
+            self.hnsw.init_index(max_elements=max(1, len(self.ids)), M=M, ef_construction=ef_construction)
+            if len(self.ids):
+                self.hnsw.add_items(self.vetores, self.ids)
+            self.hnsw.save_index(str(self.CACHE))
+            self.CACHE_ASSINATURA.write_text(assinatura, encoding="utf-8")
+        self.hnsw.set_ef(ef)
+
+    def _assinatura(self, M, ef_construction):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{M}:{ef_construction}:{self.vetores.shape}".encode("utf-8"))
+        h.update(np.ascontiguousarray(self.ids).tobytes())
+        h.update(np.ascontiguousarray(self.vetores).tobytes())
+        return h.hexdigest()
+
+    def buscar(self, consultas, k):
+        k = min(k, len(self.ids))
+        self.hnsw.set_ef(max(self.hnsw.ef, k))
+        rotulos, distancias = self.hnsw.knn_query(consultas, k=k)
+        # distância "cosine" do hnswlib = 1 - cosseno
+        return rotulos.astype("int64"), para_similaridade(1 - distancias)
+
+
+BACKENDS = {b.nome: b for b in (BuscaExata, BuscaAnnoy, BuscaHNSW)}
+
+
+def criar_backend(nome, ids, vetores, **parametros):
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend de busca desconhecido: '{nome}' (use {', '.join(BACKENDS)})")
+    return BACKENDS[nome](ids, vetores, **parametros)
@@ -0,0 +1,111 @@
+# busca_midia.py
+#
+# Busca de mídias por descrição, compartilhada por preencher_nome_midia e
+# preencher_segmentos_obrigatorio.
+#
+# - Todas as descrições pendentes de um segmentos.json viram embedding numa
+#   chamada só (em lotes), em vez de um encode por segmento.
+# - Os vizinhos de todas elas saem de uma consulta em lote ao backend de
+#   busca (exata, Annoy ou HNSW, ver backends_busca.py) sobre as mídias do
+#   acervo (ver acervo_embeddings.py e indice_midia.py).
+# - A similaridade devolvida é a mesma escala de antes (1 - distância
+#   angular / 2), então os limites já calibrados continuam valendo.
+
+import os
+import numpy as np
+
+import modelos
+from app_midia_manual_importer import indice_midia
+from app_gerador_de_video import backends_busca
+
+VECTOR_SIZE = indice_midia.VECTOR_SIZE
+TAMANHO_LOTE = 64   # descrições por forward pass do modelo
+BACKEND_PADRAO = "exato"
+
+
+def carregar_index(backend=None, **parametros):
+    """
+    (index, index_map): index é o backend de busca (ver backends_busca.py)
+    com as mídias ativas do acervo. `backend` padrão: variável
+    BUSCA_MIDIA_BACKEND ou BACKEND_PADRAO.
+    """
+    nome = backend or os.getenv("BUSCA_MIDIA_BACKEND", BACKEND_PADRAO).strip().lower()
+    ids, vetores, index_map = indice_midia.carregar()
+    return backends_busca.criar_backend(nome, ids, vetores, **parametros), index_map
+
+
+def embutir(textos):
+    """Embeddings normalizados de uma lista de textos, num encode em lote."""
+    if not textos:
+        return np.empty((0, VECTOR_SIZE), dtype="float32")
+    with modelos.usar("embedding") as embedding_model:
+        vetores = embedding_model.encode(list(textos), batch_size=TAMANHO_LOTE, convert_to_numpy=True)
+    return backends_busca.normalizar(np.asarray(vetores, dtype="float32"))
+
+
+def vizinhos(consultas, index, k):
+    """
+    Os k itens mais próximos de cada consulta (linhas de `consultas`, já
+    normalizadas). Retorna (ids, similaridades), ambos (m, k), do mais
+    parecido para o menos parecido.
+    """
+    if len(consultas) == 0 or len(index) == 0:
+        vazio = np.empty((len(consultas), 0))
+        return vazio.astype(int), vazio
+    return index.buscar(np.asarray(consultas, dtype="float32"), k)
+
+
+def atribuir_com_limite(ids, sims, capacidade):
+    """
+    Atribuição global: escolhe um candidato para cada segmento maximizando a
+    soma das similaridades, sem usar nenhum candidato mais vezes que a sua
+    capacidade.
+
+    ids, sims:  saída de vizinhos() (n segmentos × k candidatos).
+    capacidade: {id do índice: quantos usos ainda restam} (ausente = 0).
+
+    Vira um emparelhamento bipartido de custo mínimo esparso: cada uso
+    possível de um candidato é uma coluna, e cada segmento tem ainda uma
+    coluna "sem mídia" com custo alto, usada só quando não há como atender
+    todos. Retorna a lista de n ids escolhidos (None = sem mídia).
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+    n = len(ids)
+    if n == 0:
+        return []
+
+    # colunas de cada candidato: no máximo uma por segmento que o tem na lista
+    aparicoes = {}
+    for c in ids.ravel():
+        aparicoes[c] = aparicoes.get(c, 0) + 1
+    colunas, dono_coluna = {}, []
+    for c, vezes in aparicoes.items():
+        usos = min(capacidade.get(c, 0), vezes)
+        colunas[c] = range(len(dono_coluna), len(dono_coluna) + usos)
+        dono_coluna.extend([c] * usos)
+    total = len(dono_coluna)
+
+    # custo 2 - similaridade fica em [1, 2] (zero seria "sem aresta" na matriz esparsa);
+    # "sem mídia" custa mais que qualquer troca entre candidatos reais
+    sem_midia = 2.0 * (n + 1)
+    linhas, cols, custos = [], [], []
+    for i in range(n):
+        for c, s in zip(ids[i], sims[i]):
+            for col in colunas.get(c, ()):
+                linhas.append(i)
+                cols.append(col)
+                custos.append(2.0 - float(s))
+        linhas.append(i)
+        cols.append(total + i)
+        custos.append(sem_midia)
+
+    grafo = csr_matrix((custos, (linhas, cols)), shape=(n, total + n))
+    linhas_escolhidas, cols_escolhidas = min_weight_full_bipartite_matching(grafo)
+
+    escolhidos = [None] * n
+    for i, col in zip(linhas_escolhidas, cols_escolhidas):
+        if col < total:
+            escolhidos[i] = dono_coluna[col]
+    return escolhidos
@@ -1,4 +1,3 @@
-import os
 import sys
 import subprocess
 import time
@@ -15,7 +14,9 @@ from app_gerador_de_video.gerador_descricao_chave import processar_segmentos
 from app_gerador_de_video.preencher_nome_midia import preencher_segmentos_json
 
 from app_midia_manual_importer.controller_midia import iniciar_importador
+from app_midia_manual_importer import indice_midia
 from app_gerador_de_video.preencher_segmentos_obrigatorio import preencher_segmentos_obrigatorio
+from status_etapas import registrar_fluxo, listar_pendentes, marcar, reabrir_sem_saida, CONCLUIDA, FALHOU
 
 
 
@@ -23,6 +24,9 @@ from app_gerador_de_video.preencher_segmentos_obrigatorio import preencher_segme
 DATA_DIR = "data"
 AUDIO_FILE_NAME = "narracao.wav"
 SEGMENTOS_FILE_NAME = "segmentos.json"
+FLUXO = "gerador_video"
+
+registrar_fluxo(FLUXO, {"video": []})
 
 log_callback = print
 
@@ -30,26 +34,26 @@ def set_logger(callback):
     global log_callback
     log_callback = callback
 
+def _finalizado(canal, video_id):
+    return (Path(DATA_DIR) / canal / video_id / "control" / "video_finalizado.txt").exists()
+
 def listar_videos_para_gerar_video():
+    """
+    Vídeos com a etapa "video" pendente na tabela de etapas (ver
+    status_etapas.py). Apagar o video_finalizado.txt refaz o vídeo.
+    """
+    reabrir_sem_saida(FLUXO, "video", _finalizado)
     tarefas = {}
-    for canal in os.listdir(DATA_DIR):
-        canal_path = os.path.join(DATA_DIR, canal)
-        if not os.path.isdir(canal_path):
-            continue
-
-        videos = []
-        for item in os.listdir(canal_path):
-            video_path = os.path.join(canal_path, item)
-            control_path = os.path.join(video_path, "control")
-            finalizado_path = os.path.join(control_path, "video_finalizado.txt")
-
-            if os.path.isdir(video_path) and item.isdigit():
-                if not os.path.exists(finalizado_path):
-                    videos.append(item)
-
-        if videos:
-            tarefas[canal] = sorted(videos)
-
+    for canal, videos in listar_pendentes(FLUXO, "video").items():
+        restantes = []
+        for video_id in videos:
+            # finalizado antes da tabela existir
+            if _finalizado(canal, video_id):
+                marcar(FLUXO, canal, video_id, "video", CONCLUIDA)
+            else:
+                restantes.append(video_id)
+        if restantes:
+            tarefas[canal] = restantes
     return tarefas
 
 def processar_videos():
@@ -74,6 +78,7 @@ def processar_videos():
                 sucesso = transcrever_com_whisperx(audio_path, segmentos_path)
                 if not sucesso:
                     log_callback(f"⛔ Falha na transcrição de {canal}/{video_id}. Pulando...")
+                    marcar(FLUXO, canal, video_id, "video", FALHOU)
                     continue
 
             # Geração de descrições visuais
@@ -83,9 +88,8 @@ def processar_videos():
             # Preenchimento automático de nome_midia com busca semântica
             log_callback("🔗 Buscando mídias semelhantes para os segmentos...")
 
-            index_file = Path("data_midia/index_annoy/index.ann")
-            if not index_file.exists():
-                log_callback("⚙️ Índice Annoy não encontrado. Reconstruindo...")
+            if not indice_midia.existe():
+                log_callback("⚙️ Índice de mídias não encontrado. Reconstruindo...")
                 iniciar_importador()
 
             preencher_segmentos_json(segmentos_path)
@@ -123,6 +127,7 @@ def processar_videos():
             with open(finalizado_path, "w", encoding="utf-8") as f:
                 f.write("✅ Vídeo finalizado.\n")
 
+            marcar(FLUXO, canal, video_id, "video", CONCLUIDA)
             log_callback(f"✅ Vídeo marcado como finalizado: {canal}/{video_id}")
 
 def iniciar_controller():
@@ -1,21 +1,20 @@
 import os
+import sys
 import json
-import time
 import re
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
 
-# Carrega a chave da API do arquivo .env
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+# Adiciona o diretório raiz ao sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from cliente_openai import completar, completar_varios
 
 DATA_DIR = "data"
 SEGMENTOS_FILE_NAME = "segmentos.json"
+LOTE_SEGMENTOS = 10  # chamadas simultâneas por lote (e salvamento a cada lote)
 
-def gerar_descricao(texto):
-    prompt = (
+def montar_prompt_descricao(texto):
+    return (
         "You are an expert in video production.\n"
         "Given a short spoken sentence from a video narration, generate a unique and visual search tag (max 8 words) "
         "to help find matching stock video footage.\n"
@@ -26,14 +25,9 @@ def gerar_descricao(texto):
         "Search Tag:"
     )
 
+def gerar_descricao(texto):
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.6,
-            max_tokens=60
-        )
-        return response.choices[0].message.content.strip()
+        return completar(montar_prompt_descricao(texto), model="gpt-4o", temperature=0.6, max_tokens=60).strip()
     except Exception as e:
         print(f"❌ Erro na API: {e}")
         return None
@@ -63,8 +57,7 @@ def processar_segmentos(segmentos_path):
         t = s["text"]
         texto_map.setdefault(t, []).append(s)
 
-    contador = 0
-
+    pendentes = []
     for idx, segmento in enumerate(segmentos):
         if segmento.get("descricao_chave"):
             continue
@@ -74,23 +67,33 @@ def processar_segmentos(segmentos_path):
         index_no_grupo = lista_repetidos.index(segmento)
         total_repetidos = len(lista_repetidos)
         subtexto = dividir_texto_proporcional(texto, total_repetidos, index_no_grupo)
+        pendentes.append((idx, segmento, subtexto))
+
+    # Cada lote vai em paralelo; o cliente_openai segura RPM/TPM e faz retry.
+    for inicio in range(0, len(pendentes), LOTE_SEGMENTOS):
+        lote = pendentes[inicio:inicio + LOTE_SEGMENTOS]
+        respostas = completar_varios([
+            {"prompt": montar_prompt_descricao(subtexto), "model": "gpt-4o", "temperature": 0.6, "max_tokens": 60}
+            for _, _, subtexto in lote
+        ])
+
+        lote_alterado = False
+        for (idx, segmento, _), resposta in zip(lote, respostas):
+            if isinstance(resposta, Exception):
+                print(f"❌ Erro na API: {resposta}")
+                resposta = None
+            descricao = resposta.strip() if resposta else None
+            if descricao:
+                segmento["descricao_chave"] = descricao
+                alterado = lote_alterado = True
+                print(f"🧠 {idx + 1}: {descricao}")
+            else:
+                print(f"⚠️ Segmento {idx + 1} falhou.")
 
-        descricao = gerar_descricao(subtexto)
-        if descricao:
-            segmento["descricao_chave"] = descricao
-            alterado = True
-            contador += 1
-            print(f"🧠 {idx + 1}: {descricao}")
-            time.sleep(1.2)
-
-            if contador % 10 == 0:
-                salvar_temporario(segmentos_path, data)
-
-        else:
-            print(f"⚠️ Segmento {idx + 1} falhou.")
+        if lote_alterado:
+            salvar_temporario(segmentos_path, data)
 
     if alterado:
-        salvar_temporario(segmentos_path, data)
         print(f"✅ Segmentos atualizados em: {segmentos_path}")
     else:
         print("⏩ Nenhuma alteração feita.")
@@ -1,43 +1,31 @@
 import json
-import numpy as np
 from pathlib import Path
-from annoy import AnnoyIndex
-from sentence_transformers import SentenceTransformer
 
-VECTOR_SIZE = 384
-SIMILARITY_THRESHOLD = 0.75  # << Reduzido para permitir mais matches
+from app_gerador_de_video.busca_midia import carregar_index, embutir, vizinhos
 
-# Caminhos
-INDEX_DIR = Path("data_midia/index_annoy")
-INDEX_FILE = INDEX_DIR / "index.ann"
-MAP_FILE = INDEX_DIR / "index_map.json"
+SIMILARITY_THRESHOLD = 0.75  # << Reduzido para permitir mais matches
 
-# Modelo
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+def buscar_midias(descricoes, index, index_map):
+    """
+    Melhor mídia para cada descrição ("" se abaixo do threshold), com um
+    encode em lote e uma busca vetorizada para todas.
+    """
+    if not descricoes or len(index) == 0:
+        return [""] * len(descricoes)
+    ids, sims = vizinhos(embutir(descricoes), index, 1)
 
-def carregar_index():
-    index = AnnoyIndex(VECTOR_SIZE, "angular")
-    index.load(str(INDEX_FILE))
-    with open(MAP_FILE, "r", encoding="utf-8") as f:
-        index_map = json.load(f)
-    return index, index_map
+    nomes = []
+    for i, similaridade in zip(ids[:, 0], sims[:, 0]):
+        caminho = Path(index_map[str(i)]["caminho"])
+        if similaridade >= SIMILARITY_THRESHOLD:
+            nomes.append(caminho.name)
+        else:
+            print(f"🔍 Melhor match: {caminho.name} | Similaridade: {similaridade:.2f} (abaixo do threshold)")
+            nomes.append("")
+    return nomes
 
 def buscar_midia(descricao, index, index_map):
-    emb = embedding_model.encode(descricao).astype("float32")
-    ids_proximos = index.get_nns_by_vector(emb, 1, include_distances=True)
-
-    if not ids_proximos[0]:
-        return ""
-
-    i, dist = ids_proximos[0][0], ids_proximos[1][0]
-    similaridade = 1 - dist / 2  # Conversão angular → cos_sim approx
-    caminho = Path(index_map[str(i)]["caminho"])
-
-    if similaridade >= SIMILARITY_THRESHOLD:
-        return caminho.name
-    else:
-        print(f"🔍 Melhor match: {caminho.name} | Similaridade: {similaridade:.2f} (abaixo do threshold)")
-    return ""
+    return buscar_midias([descricao], index, index_map)[0]
 
 def preencher_segmentos_json(json_path):
     index, index_map = carregar_index()
@@ -48,18 +36,22 @@ def preencher_segmentos_json(json_path):
     faltando = []
     alterado = False
 
+    pendentes = []
     for seg in data.get("segments", []):
         if not seg.get("nome_midia"):
             descricao = seg.get("descricao_chave", "").strip('" ')
             if descricao:
-                nome_midia = buscar_midia(descricao, index, index_map)
-                if nome_midia:
-                    seg["nome_midia"] = nome_midia
-                    print(f'✅ Segmento atualizado: "{descricao}" → {nome_midia}')
-                    alterado = True
-                else:
-                    faltando.append(descricao)
-                    print(f'⚠️ Nenhuma mídia encontrada para: "{descricao}"')
+                pendentes.append((seg, descricao))
+
+    nomes = buscar_midias([descricao for _, descricao in pendentes], index, index_map)
+    for (seg, descricao), nome_midia in zip(pendentes, nomes):
+        if nome_midia:
+            seg["nome_midia"] = nome_midia
+            print(f'✅ Segmento atualizado: "{descricao}" → {nome_midia}')
+            alterado = True
+        else:
+            faltando.append(descricao)
+            print(f'⚠️ Nenhuma mídia encontrada para: "{descricao}"')
 
     if alterado:
         with open(json_path, "w", encoding="utf-8") as f:
@@ -1,40 +1,33 @@
 import json
-import numpy as np
 from pathlib import Path
-from annoy import AnnoyIndex
-from sentence_transformers import SentenceTransformer
 
-VECTOR_SIZE = 384
-INDEX_DIR = Path("data_midia/index_annoy")
-INDEX_FILE = INDEX_DIR / "index.ann"
-MAP_FILE = INDEX_DIR / "index_map.json"
-LIMITE_REPETICAO = 3
-
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-def carregar_index():
-    index = AnnoyIndex(VECTOR_SIZE, "angular")
-    index.load(str(INDEX_FILE))
-    with open(MAP_FILE, "r", encoding="utf-8") as f:
-        index_map = json.load(f)
-    return index, index_map
+from app_gerador_de_video.busca_midia import carregar_index, embutir, vizinhos, atribuir_com_limite
 
-def buscar_midia_obrigatoria(descricao, index, index_map, usados, max_tentativas=50):
-    emb = embedding_model.encode(descricao).astype("float32")
-    ids_proximos = index.get_nns_by_vector(emb, max_tentativas, include_distances=True)
+LIMITE_REPETICAO = 3
+MAX_TENTATIVAS = 50   # vizinhos considerados por segmento
 
+def _chave_video(i, index_map):
+    """nome_midia de um item do índice (caminho relativo a data_midia/videos); None se não for vídeo."""
     base_videos = Path("data_midia/videos").resolve()
+    caminho = Path(index_map[str(i)]["caminho"]).resolve()
+    try:
+        return str(caminho.relative_to(base_videos))
+    except ValueError:
+        return None
 
-    for i in ids_proximos[0]:
-        caminho = Path(index_map[str(i)]["caminho"])
-        caminho_relativo = caminho.resolve().relative_to(base_videos)
-        chave = str(caminho_relativo)
-
-        if usados.get(chave, 0) < LIMITE_REPETICAO:
+def _escolher_candidato(candidatos, index_map, usados):
+    """Primeiro vizinho (do mais parecido) que ainda não atingiu o limite de repetição."""
+    for i in candidatos:
+        chave = _chave_video(i, index_map)
+        if chave and usados.get(chave, 0) < LIMITE_REPETICAO:
             usados[chave] = usados.get(chave, 0) + 1
             return chave
     return None
 
+def buscar_midia_obrigatoria(descricao, index, index_map, usados, max_tentativas=MAX_TENTATIVAS):
+    ids, _ = vizinhos(embutir([descricao]), index, max_tentativas)
+    return _escolher_candidato(ids[0], index_map, usados)
+
 def preencher_segmentos_obrigatorio(json_path):
     index, index_map = carregar_index()
 
@@ -50,18 +43,36 @@ def preencher_segmentos_obrigatorio(json_path):
     alterado = False
     erros = []
 
+    pendentes = []
     for seg in data.get("segments", []):
         if not seg.get("nome_midia"):
             descricao = seg.get("descricao_chave", "").strip('" ')
             if descricao:
-                nome_midia = buscar_midia_obrigatoria(descricao, index, index_map, usados)
-                if nome_midia:
-                    seg["nome_midia"] = nome_midia
-                    print(f'✅ Segmento: "{descricao}" → {nome_midia}')
-                    alterado = True
-                else:
-                    erros.append(descricao)
-                    print(f'❌ ERRO: Todas as mídias próximas atingiram o limite para "{descricao}"')
+                pendentes.append((seg, descricao))
+
+    # um encode em lote e uma busca vetorizada para todos os segmentos pendentes
+    ids, sims = vizinhos(embutir([descricao for _, descricao in pendentes]), index, MAX_TENTATIVAS)
+
+    # atribuição global: melhor soma de similaridades respeitando LIMITE_REPETICAO
+    # (os primeiros segmentos não "gastam" as mídias que os seguintes precisam)
+    chaves, capacidade = {}, {}
+    for i in set(ids.ravel().tolist()):
+        chave = _chave_video(i, index_map)
+        if chave:
+            chaves[i] = chave
+            capacidade[i] = max(0, LIMITE_REPETICAO - usados.get(chave, 0))
+    escolhidos = atribuir_com_limite(ids, sims, capacidade)
+
+    for (seg, descricao), escolhido in zip(pendentes, escolhidos):
+        nome_midia = chaves[escolhido] if escolhido is not None else None
+        if nome_midia:
+            usados[nome_midia] = usados.get(nome_midia, 0) + 1
+            seg["nome_midia"] = nome_midia
+            print(f'✅ Segmento: "{descricao}" → {nome_midia}')
+            alterado = True
+        else:
+            erros.append(descricao)
+            print(f'❌ ERRO: Todas as mídias próximas atingiram o limite para "{descricao}"')
 
     if alterado:
         with open(json_path, "w", encoding="utf-8") as f:
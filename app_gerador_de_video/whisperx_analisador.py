@@ -1,9 +1,15 @@
 import os
+import sys
 import json
 import subprocess
 from pathlib import Path
 import math
 
+# permite rodar direto: python app_gerador_de_video/whisperx_analisador.py
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import governador
+
 DATA_DIR = "data"
 AUDIO_FILE_NAME = "narracao.wav"
 SEGMENTOS_FILE_NAME = "segmentos.json"
@@ -51,17 +57,19 @@ def transcrever_com_whisperx(caminho_audio, caminho_segmentos):
     print_etapa(f"Transcrevendo com WhisperX: {caminho_audio}")
 
     try:
-        result = subprocess.run(
-            [
-                str(Path(".venv/Scripts/whisperx.exe").resolve()),
-                str(caminho_audio),
-                "--output_format", "json",
-                "--output_dir", str(caminho_segmentos.parent),
-                "--device", "cuda"
-            ],
-            capture_output=True,
-            text=True
-        )
+        # divide a máquina com o importador e os demais trabalhos pesados (ver governador.py)
+        with governador.vaga():
+            result = subprocess.run(
+                [
+                    str(Path(".venv/Scripts/whisperx.exe").resolve()),
+                    str(caminho_audio),
+                    "--output_format", "json",
+                    "--output_dir", str(caminho_segmentos.parent),
+                    "--device", "cuda"
+                ],
+                capture_output=True,
+                text=True
+            )
 
         if result.returncode != 0:
             print("❌ Erro ao executar WhisperX:")
@@ -0,0 +1,179 @@
+# acervo_embeddings.py
+#
+# Embeddings de todas as mídias num arquivo só, no lugar dos sidecars .npy
+# (um por mídia).
+#
+#   data_midia/embeddings.bin  matriz (n, 384) só de acréscimo, sem
+#                              cabeçalho; a linha i é o vetor do id i
+#   data_midia/midias.db       tabela midias: id -> caminho, tipo, descricao
+#                              (esquema em db_manager.MIGRACOES_MIDIAS)
+#
+# - Os vetores são gravados normalizados, em float32 (padrão), float16 ou
+#   int8 (componente * 127), conforme ACERVO_FORMATO na criação do acervo;
+#   depois o formato fica gravado no banco.
+# - A leitura é por np.memmap: montar um índice é uma leitura sequencial e
+#   pegar os vetores de N candidatos é um único fancy-index (vetores(ids)).
+# - Gravação: o vetor vai para o arquivo antes do INSERT, dentro da mesma
+#   transação BEGIN IMMEDIATE. Quem lê só enxerga as linhas com registro no
+#   banco, então uma linha meio gravada (processo caiu) nunca aparece e é
+#   sobrescrita pela próxima.
+
+import os
+import time
+import numpy as np
+from pathlib import Path
+
+from db_manager import MIDIAS_DB_PATH, MIGRACOES_MIDIAS, conectar, ativar_wal, aplicar_migracoes
+
+MATRIZ_FILE = MIDIAS_DB_PATH.parent / "embeddings.bin"
+VECTOR_SIZE = 384
+FORMATOS = {"float32": "float32", "float16": "float16", "int8": "int8"}
+FORMATO_PADRAO = "float32"
+ESCALA_INT8 = 127.0
+
+_pronto = False
+_formato = None
+
+
+def _banco():
+    """Conexão do acervo, criando/migrando o banco na primeira chamada do processo."""
+    global _pronto
+    if not _pronto:
+        MIDIAS_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        ativar_wal(MIDIAS_DB_PATH)
+        aplicar_migracoes(MIDIAS_DB_PATH, MIGRACOES_MIDIAS)
+        _pronto = True
+    return conectar(MIDIAS_DB_PATH)
+
+
+def formato():
+    """dtype da matriz: o gravado no banco ou, num acervo novo, ACERVO_FORMATO."""
+    global _formato
+    if _formato is None:
+        conn = _banco()
+        linha = conn.execute("SELECT valor FROM acervo_config WHERE chave = 'formato'").fetchone()
+        if linha is None:
+            pedido = os.getenv("ACERVO_FORMATO", FORMATO_PADRAO).strip().lower()
+            if pedido not in FORMATOS:
+                raise ValueError(f"ACERVO_FORMATO inválido: '{pedido}' (use {', '.join(FORMATOS)})")
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO acervo_config (chave, valor) VALUES ('formato', ?)", (pedido,))
+            linha = conn.execute("SELECT valor FROM acervo_config WHERE chave = 'formato'").fetchone()
+        _formato = FORMATOS[linha[0]]
+    return _formato
+
+
+def _codificar(vetores):
+    vetores = np.asarray(vetores, dtype="float32").reshape(-1, VECTOR_SIZE)
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    vetores = vetores / normas
+    if formato() == "int8":
+        return np.round(vetores * ESCALA_INT8).astype("int8")
+    return vetores.astype(formato())
+
+
+def _decodificar(linhas):
+    if formato() == "int8":
+        return linhas.astype("float32") / ESCALA_INT8
+    return np.asarray(linhas, dtype="float32")
+
+
+# ─── Escrita ──────────────────────────────────────────────────────
+
+def adicionar_lote(itens):
+    """
+    Acrescenta mídias ao acervo. `itens`: lista de (caminho, tipo, descricao,
+    vetor). Um caminho que já estava no acervo ganha id novo (a linha antiga
+    é desativada). Retorna os ids, na ordem dos itens.
+    """
+    if not itens:
+        return []
+    matriz = _codificar([vetor for _, _, _, vetor in itens])
+    caminhos = [str(Path(caminho).resolve()) for caminho, _, _, _ in itens]
+    agora = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = _banco()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        primeiro = conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM midias").fetchone()[0]
+        # grava as linhas no lugar delas (sobrescreve restos de uma gravação interrompida)
+        with open(MATRIZ_FILE, "r+b" if MATRIZ_FILE.exists() else "wb") as f:
+            f.seek(primeiro * matriz.itemsize * VECTOR_SIZE)
+            f.write(matriz.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        conn.executemany("UPDATE midias SET ativo = 0 WHERE caminho = ? AND ativo = 1", [(c,) for c in caminhos])
+        ids = list(range(primeiro, primeiro + len(itens)))
+        conn.executemany(
+            "INSERT INTO midias (id, caminho, tipo, descricao, criado_em) VALUES (?, ?, ?, ?, ?)",
+            [(i, c, tipo, descricao, agora) for i, c, (_, tipo, descricao, _) in zip(ids, caminhos, itens)]
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return ids
+
+
+def adicionar(caminho, tipo, descricao, vetor):
+    return adicionar_lote([(caminho, tipo, descricao, vetor)])[0]
+
+
+def desativar(caminhos):
+    """Tira do acervo (ativo = 0) as mídias dos caminhos dados. Retorna quantas."""
+    caminhos = [str(Path(c).resolve()) for c in caminhos]
+    with _banco() as conn:
+        cursor = conn.executemany("UPDATE midias SET ativo = 0 WHERE caminho = ? AND ativo = 1", [(c,) for c in caminhos])
+    return cursor.rowcount
+
+
+# ─── Leitura ──────────────────────────────────────────────────────
+
+def existe():
+    return MIDIAS_DB_PATH.exists() and MATRIZ_FILE.exists()
+
+
+def total():
+    """Linhas da matriz (ativas ou não) = próximo id."""
+    return _banco().execute("SELECT COALESCE(MAX(id) + 1, 0) FROM midias").fetchone()[0]
+
+
+def matriz(n=None):
+    """As primeiras `n` linhas (padrão: todas as gravadas) como np.memmap, sem copiar."""
+    n = total() if n is None else n
+    if n == 0:
+        return np.empty((0, VECTOR_SIZE), dtype=formato())
+    return np.memmap(MATRIZ_FILE, dtype=formato(), mode="r", shape=(n, VECTOR_SIZE))
+
+
+def vetores(ids):
+    """Vetores float32 (normalizados) dos ids, num fancy-index só sobre o memmap."""
+    ids = np.asarray(ids, dtype="int64")
+    if len(ids) == 0:
+        return np.empty((0, VECTOR_SIZE), dtype="float32")
+    return _decodificar(matriz(int(ids.max()) + 1)[ids])
+
+
+def ids_ativos():
+    linhas = _banco().execute("SELECT id FROM midias WHERE ativo = 1").fetchall()
+    return np.sort(np.fromiter((i for (i,) in linhas), dtype="int64", count=len(linhas)))
+
+
+def mapa():
+    """{str(id): {tipo, caminho, descricao}} das mídias ativas (o antigo index_map)."""
+    linhas = _banco().execute("SELECT id, tipo, caminho, descricao FROM midias WHERE ativo = 1").fetchall()
+    return {str(i): {"tipo": tipo, "caminho": caminho, "descricao": descricao} for i, tipo, caminho, descricao in linhas}
+
+
+def caminhos_ativos():
+    return {caminho for (caminho,) in _banco().execute("SELECT caminho FROM midias WHERE ativo = 1")}
+
+
+def carregar():
+    """(ids, vetores float32, mapa) de todas as mídias ativas; sem cópia se nada foi desativado."""
+    n = total()
+    ids = ids_ativos()
+    if len(ids) == n and formato() == "float32":
+        return ids, matriz(n), mapa()
+    return ids, vetores(ids), mapa()
@@ -0,0 +1,120 @@
+# amostragem_quadros.py
+#
+# Quadros de um vídeo para legenda, sem decodificar o clipe inteiro.
+#
+# Políticas (AMOSTRAGEM_QUADROS no .env ou o parâmetro `politica`):
+#   "intervalo"  um quadro a cada INTERVALO_SEGUNDOS (o comportamento antigo):
+#                seek até o keyframe anterior ao alvo e decodifica só até
+#                chegar nele; GOPs sem alvo nenhum nem são decodificados
+#   "n"          QUADROS_POR_CLIPE quadros espaçados por igual, mesmo seek
+#   "cena"       só keyframes (o decoder pula os demais) e fica com os que
+#                mudam o bastante em relação ao último escolhido
+#
+# Nada aqui redimensiona para 1920x1080 nem grava vídeo: a transcodificação
+# é separada (ver transcodificacao.py). `transformar` (ex.: reduzir_quadro
+# do BLIP) roda em cada quadro assim que ele é decodificado, então só os
+# quadros já reduzidos ficam na memória, não o clipe inteiro em 4K.
+
+import os
+import math
+import bisect
+
+INTERVALO_SEGUNDOS = 2.0
+QUADROS_POR_CLIPE = 6
+LIMIAR_CENA = 0.25        # diferença média de histograma (0..1) para contar como cena nova
+POLITICA_PADRAO = "intervalo"
+POLITICAS = ("intervalo", "n", "cena")
+
+
+def _duracao(container, stream):
+    if stream.duration is not None:
+        return float(stream.duration * stream.time_base)
+    if container.duration is not None:
+        import av
+        return container.duration / av.time_base
+    return 0.0
+
+
+def _keyframes(container, stream):
+    """pts dos keyframes, lidos só do demux (pacotes, sem decodificar)."""
+    chaves = sorted(p.pts for p in container.demux(stream) if p.is_keyframe and p.pts is not None)
+    container.seek(0)
+    return chaves
+
+
+def _imagem(frame, transformar):
+    imagem = frame.to_image()
+    return transformar(imagem) if transformar else imagem
+
+
+def _por_tempos(container, stream, tempos, transformar=None):
+    """
+    Primeiro quadro em cada tempo (segundos do início do clipe, crescentes).
+    Só faz seek quando há um keyframe entre a posição atual e o alvo; se não,
+    segue decodificando (com GOPs longos, um seek por alvo decodificaria o
+    mesmo trecho várias vezes).
+    """
+    inicio = stream.start_time or 0
+    chaves = _keyframes(container, stream)
+    quadros, frames, frame = [], None, None
+    for segundos in tempos:
+        alvo = inicio + int(segundos / stream.time_base)
+        if frame is not None and frame.pts is not None and frame.pts >= alvo:
+            quadros.append(quadros[-1])   # o mesmo quadro já cobre este alvo
+            continue
+        posicao = bisect.bisect_right(chaves, alvo) - 1
+        chave = chaves[posicao] if posicao >= 0 else inicio
+        if frames is None or frame is None or frame.pts is None or frame.pts < chave:
+            container.seek(chave, stream=stream, backward=True)
+            frames = container.decode(stream)
+        frame = next((f for f in frames if f.pts is None or f.pts >= alvo), None)
+        if frame is None:
+            break
+        quadros.append(_imagem(frame, transformar))
+    return quadros
+
+
+def _histograma(imagem):
+    import numpy as np
+    cinza = np.asarray(imagem.convert("L").resize((64, 36)))
+    contagem, _ = np.histogram(cinza, bins=32, range=(0, 256))
+    return contagem / contagem.sum()
+
+
+def _por_cena(container, stream, limiar, transformar=None):
+    import numpy as np
+    stream.codec_context.skip_frame = "NONKEY"
+    quadros, ultimo = [], None
+    for frame in container.decode(stream):
+        imagem = frame.to_image()
+        hist = _histograma(imagem)
+        # metade da soma das diferenças absolutas: 0 = igual, 1 = nada em comum
+        if ultimo is None or np.abs(hist - ultimo).sum() / 2 >= limiar:
+            quadros.append(transformar(imagem) if transformar else imagem)
+            ultimo = hist
+    return quadros
+
+
+def amostrar(caminho, politica=None, intervalo=INTERVALO_SEGUNDOS, n=QUADROS_POR_CLIPE, limiar=LIMIAR_CENA,
+             transformar=None):
+    """
+    Quadros (PIL) de `caminho` segundo a política escolhida, na resolução
+    original ou já passados por transformar(imagem).
+    """
+    import av
+
+    politica = politica or os.getenv("AMOSTRAGEM_QUADROS", POLITICA_PADRAO).strip().lower()
+    if politica not in POLITICAS:
+        raise ValueError(f"Política de amostragem desconhecida: '{politica}' (use {', '.join(POLITICAS)})")
+
+    with av.open(str(caminho)) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        if politica == "cena":
+            return _por_cena(container, stream, limiar, transformar)
+        duracao = _duracao(container, stream)
+        if politica == "n":
+            tempos = [(i + 0.5) * duracao / n for i in range(n)] if duracao > 0 else [0.0]
+        else:
+            tempos = [i * intervalo for i in range(max(1, math.ceil(duracao / intervalo)))]
+        return _por_tempos(container, stream, tempos, transformar)
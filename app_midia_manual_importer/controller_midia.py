@@ -1,21 +1,13 @@
 import os
-import json
-import shutil
 import time
-import msvcrt
 import subprocess
-import psutil
 from pathlib import Path
-from tkinter import Tk, filedialog
 from PIL import Image
-import av
-import cv2
-import numpy as np
-import torch
-from transformers import BlipProcessor, BlipForConditionalGeneration
-from sentence_transformers import SentenceTransformer
-from annoy import AnnoyIndex
-from sentence_transformers import util
+
+import modelos
+from app_midia_manual_importer import acervo_embeddings
+from app_midia_manual_importer.amostragem_quadros import amostrar as amostrar_quadros
+from app_midia_manual_importer.legendas_blip import descrever_lote, reduzir_quadro
 
 # Configurações
 EXTENSOES_IMAGEM = {".jpg", ".jpeg", ".png", ".webp"}
@@ -25,23 +17,13 @@ MAX_MIDIAS_POR_PASTA = 100
 RESOLUCAO_PADRAO = (1920, 1080)
 VECTOR_SIZE = 384
 
-# Modelos
-device = "cuda" if torch.cuda.is_available() else "cpu"
-blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-large")
-blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-large").to(device)
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Modelos (BLIP e embedding) vêm do registro compartilhado em modelos.py:
+# carregados no primeiro uso e uma vez só por processo.
 
 def escolher_pasta():
     return str(Path(__file__).resolve().parent.parent / "midias_temporais")
 
 
-def descansar(cpu_limite=85, pausa_segundos=3):
-    uso = psutil.cpu_percent(interval=1)
-    if uso >= cpu_limite:
-        print(f"⏳ CPU em {uso:.1f}%, aguardando {pausa_segundos}s para aliviar...")
-        time.sleep(pausa_segundos)
-
-
 def classificar_tipo(extensao):
     ext = extensao.lower()
     if ext in EXTENSOES_IMAGEM:
@@ -66,40 +48,35 @@ def gerar_subpasta(tipo):
     nova.mkdir(parents=True, exist_ok=True)
     return nova
 
-def gerar_nome(subpasta, tipo, extensao):
+def gerar_nome(subpasta, tipo, extensao, minimo=1):
+    # maior número existente + 1, não a contagem: se uma mídia do meio foi
+    # apagada (ffmpeg falhou, legenda falhou) a contagem + 1 cairia num nome
+    # já usado e todas as seguintes seriam puladas como "Já existe"
     prefixo = "img" if tipo == "imagens" else "vid"
-    existentes = list(subpasta.glob(f"{prefixo}_*.{extensao.strip('.')}"))
-    numero = len(existentes) + 1
+    numeros = [0]
+    for existente in subpasta.glob(f"{prefixo}_*.{extensao.strip('.')}"):
+        sufixo = existente.stem[len(prefixo) + 1:]
+        if sufixo.isdigit():
+            numeros.append(int(sufixo))
+    numero = max(max(numeros) + 1, minimo)
     return f"{prefixo}_{numero:04d}{extensao}"
 
-def is_similar(new_text, textos_existentes, threshold=0.85):
-    if not textos_existentes:
-        return False
-    emb_novo = embedding_model.encode(new_text, convert_to_tensor=True).to(device)
-    emb_existentes = embedding_model.encode(textos_existentes, convert_to_tensor=True).to(device)
-    scores = util.cos_sim(emb_novo, emb_existentes)
-    return any(score.item() >= threshold for score in scores[0])
-
+def remover_repetidas(legendas, threshold=0.85):
+    """Mantém, na ordem, só as legendas que não se parecem com uma já mantida (um encode só)."""
+    if len(legendas) < 2:
+        return list(legendas)
+    with modelos.usar("embedding") as embedding_model:
+        embs = embedding_model.encode(list(legendas), convert_to_numpy=True, normalize_embeddings=True)
+    similaridades = embs @ embs.T
+    mantidas = []
+    for i in range(len(legendas)):
+        if all(similaridades[i, j] < threshold for j in mantidas):
+            mantidas.append(i)
+    return [legendas[i] for i in mantidas]
 
 
 def gerar_descricao_blip_pil(imagem_pil):
-    prompt = (
-        "Describe this scene briefly. Focus on the main subject, visible objects, actions, and the setting. "
-        "Avoid unnecessary details. Respond in one short sentence."
-    )
-    inputs = blip_processor(images=imagem_pil, return_tensors="pt").to(device)
-    with torch.no_grad():
-        saida = blip_model.generate(
-            **inputs,
-            num_beams=5,
-            length_penalty=0.8,
-            max_new_tokens=30,
-            do_sample=False
-        )
-    descricao = blip_processor.decode(saida[0], skip_special_tokens=True).strip()
-    return descricao
-
-
+    return descrever_lote([imagem_pil])[0]
 
 
 def gerar_descricao_blip_path(imagem_path):
@@ -107,76 +84,44 @@ def gerar_descricao_blip_path(imagem_path):
     return gerar_descricao_blip_pil(imagem)
 
 def gerar_embedding(texto):
-    return embedding_model.encode(texto)
+    with modelos.usar("embedding") as embedding_model:
+        return embedding_model.encode(texto)
 
-def salvar_json_e_npy(path_midia, descricao):
-    json_path = path_midia.with_suffix(".json")
-    npy_path = path_midia.with_suffix(".npy")
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump({"descricao": descricao}, f, indent=4, ensure_ascii=False)
-    np.save(npy_path, gerar_embedding(descricao))
-
-def processar_imagem(origem, destino):
+def _transcodificacao_ok(destino, transcodificacao):
+    """Espera o ffmpeg do vídeo (se houver) e diz se o arquivo final ficou pronto."""
+    if transcodificacao is None:
+        return True
     try:
-        img = Image.open(origem).convert("RGB")
-        img = img.resize(RESOLUCAO_PADRAO, Image.LANCZOS)
-        destino = destino.with_suffix(".webp")
-        img.save(destino, "WEBP", quality=85)
-        descricao = gerar_descricao_blip_path(destino)
-        salvar_json_e_npy(destino, descricao)
-        print(f"🖼️ {destino.name} | {descricao}")
+        transcodificacao.result()
+        return True
     except Exception as e:
-        print(f"❌ Erro imagem {origem.name}: {e}")
+        print(f"❌ Erro ao transcodificar {destino.name}: {e}")
+        return False
 
-def processar_video(origem, destino):
+def descartar_destino(destino, transcodificacao=None):
+    """Apaga a mídia (ou a reserva vazia) que não vai para o acervo, depois do ffmpeg dela terminar."""
+    if transcodificacao is not None:
+        try:
+            transcodificacao.result()
+        except Exception:
+            pass   # quem chamou já avisou; só não pode apagar antes do os.replace do ffmpeg
     try:
-        container = av.open(str(origem))
-        stream = container.streams.video[0]
-        fps = float(stream.average_rate)
-        duracao = float(container.duration * stream.time_base)
-        intervalo = 2  # segundos
-        proximo_tempo = 0
-        frames_descricao = []
-
-        destino_temp = str(destino.with_suffix(".temp.mp4"))
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        out = cv2.VideoWriter(destino_temp, fourcc, fps, RESOLUCAO_PADRAO)
-
-        for frame in container.decode(video=0):
-            tempo_atual = frame.pts * stream.time_base
-            img = frame.to_ndarray(format="bgr24")
-            img = cv2.resize(img, RESOLUCAO_PADRAO, interpolation=cv2.INTER_AREA)
-            out.write(img)
-
-            if tempo_atual >= proximo_tempo:
-                img_pil = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-                descricao = gerar_descricao_blip_pil(img_pil)
-                frames_descricao.append(descricao)
-                proximo_tempo += intervalo
-
-        out.release()
-        shutil.move(destino_temp, destino)
-
-        if frames_descricao:
-            descricao_final = []
-            for desc in frames_descricao:
-                if not is_similar(desc, descricao_final):
-                    descricao_final.append(desc)
-            descricao_texto = " ".join(descricao_final)
-            salvar_json_e_npy(destino, descricao_texto)
-            print(f"🎥 {destino.name} | {descricao_texto}")
-
-        else:
-            print(f"⚠️ Nenhum frame útil encontrado para: {origem.name}")
-
-    except Exception as e:
-        print(f"❌ Erro vídeo {origem.name}: {e}")
-
-
-def copiar_arquivos(pasta_origem):
-    arquivos = os.listdir(pasta_origem)
-    total = 0
-    for nome in arquivos:
+        destino.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"❌ Erro ao apagar {destino.name}: {e}")
+
+# ─── Etapas do pipeline de importação (ver pipeline_importacao.py) ───
+
+def reservar_destinos(pasta_origem):
+    """
+    Descoberta: (origem, destino, tipo) de cada mídia de `pasta_origem`. O
+    destino é criado vazio na hora, reservando o nome (gerar_nome segue o
+    maior número da subpasta) até a mídia pronta ocupar o lugar. Os números
+    só sobem durante a execução: a escrita apaga as mídias que falham
+    enquanto a descoberta ainda reserva, e um nome nunca é dado duas vezes.
+    """
+    proximos = {}   # subpasta -> menor número ainda não dado nesta execução
+    for nome in os.listdir(pasta_origem):
         caminho = Path(pasta_origem) / nome
         if not caminho.is_file():
             continue
@@ -185,84 +130,108 @@ def copiar_arquivos(pasta_origem):
             continue
         subpasta = gerar_subpasta(tipo)
         extensao = ".webp" if tipo == "imagens" else ".mp4"
-        nome_final = gerar_nome(subpasta, tipo, extensao)
+        nome_final = gerar_nome(subpasta, tipo, extensao, minimo=proximos.get(subpasta, 1))
+        proximos[subpasta] = int(Path(nome_final).stem.split("_")[1]) + 1
         destino = subpasta / nome_final
         if destino.exists():
             print(f"⚠️ Já existe: {destino}")
             continue
-        if tipo == "imagens":
-            processar_imagem(caminho, destino)
-        elif tipo == "videos":
-            processar_video(caminho, destino)
-
-        descansar()  # pausa curta após cada arquivo
+        destino.touch()
+        yield caminho, destino, "imagem" if tipo == "imagens" else "video"
+
+def preparar_midia(origem, destino, tipo):
+    """
+    Preparo (processos do pipeline): grava a imagem no destino ou amostra os
+    quadros do vídeo (o ffmpeg dele já roda à parte). Retorna os quadros no
+    tamanho do BLIP, ou None se falhou.
+    """
+    try:
+        if tipo == "imagem":
+            img = Image.open(origem).convert("RGB")
+            img = img.resize(RESOLUCAO_PADRAO, Image.LANCZOS)
+            img.save(destino, "WEBP", quality=85)
+            return [reduzir_quadro(img)]
+        # quadros por seek no original, reduzidos um a um (ver amostragem_quadros.py)
+        return amostrar_quadros(origem, transformar=reduzir_quadro)
+    except Exception as e:
+        print(f"❌ Erro {'imagem' if tipo == 'imagem' else 'vídeo'} {origem.name}: {e}")
+        return None
+
+def descrever_concluidas(concluidas):
+    """
+    Modelos (processo único do pipeline): recebe da FilaLegendas
+    [((destino, tipo), legendas)] e devolve [(destino, tipo, descricao, vetor)],
+    com um encode só para o lote. descricao None = falhou, "" = sem quadros.
+    """
+    descritas = []
+    try:
+        for (destino, tipo), legendas in concluidas:
+            if legendas is None:
+                descricao = None
+            elif not legendas:
+                descricao = ""
+            else:
+                descricao = " ".join(remover_repetidas(legendas)) if tipo == "video" else legendas[0]
+            descritas.append((destino, tipo, descricao))
+        textos = [d for _, _, d in descritas if d]
+        vetores = iter([])
+        if textos:
+            with modelos.usar("embedding") as embedding_model:
+                vetores = iter(embedding_model.encode(textos, convert_to_numpy=True))
+        return [(destino, tipo, d, next(vetores) if d else None) for destino, tipo, d in descritas]
+    except Exception as e:
+        print(f"❌ Erro ao descrever {len(concluidas)} mídia(s): {e}")
+        return [(destino, tipo, None, None) for (destino, tipo), _ in concluidas]
+
+def gravar_descritas(lote, transcodificacoes):
+    """
+    Escrita (thread do processo principal): grava no acervo as mídias do
+    lote (descrição e embedding, sem sidecars). Vídeo só entra depois que o
+    ffmpeg dele terminou bem; mídia que falhou em qualquer etapa é apagada
+    do destino (senão contaria em MAX_MIDIAS_POR_PASTA sem estar no acervo).
+    Retorna os destinos que entraram no acervo.
+    """
+    itens = []
+    for destino, tipo, descricao, vetor in lote:
+        if not _transcodificacao_ok(destino, transcodificacoes.pop(destino, None)):
+            descricao = None
+        elif descricao is None:
+            print(f"❌ Erro ao descrever {destino.name}: mídia fora do acervo")
+        elif not descricao:
+            print(f"⚠️ Nenhum frame útil encontrado para: {destino.name}")
+        else:
+            itens.append((destino, tipo, descricao, vetor))
+            print(f"{'🎥' if tipo == 'video' else '🖼️'} {destino.name} | {descricao}")
+            continue
+        descartar_destino(destino)
+    try:
+        acervo_embeddings.adicionar_lote(itens)
+    except Exception as e:
+        print(f"❌ Erro ao gravar {len(itens)} mídia(s) no acervo: {e}")
+        for destino, _, _, _ in itens:
+            descartar_destino(destino)
+        return []
+    return [destino for destino, _, _, _ in itens]
 
-        if total % 10 == 0:
-            print("😮‍💨 Descanso maior de 10 segundos para resfriar CPU...")
-            time.sleep(10)
 
-        total += 1
-    print(f"\n📦 Total de mídias processadas e salvas: {total}")
+def copiar_arquivos(pasta_origem):
+    # descoberta, preparo em vários processos, BLIP/MiniLM num processo só e
+    # gravação, em paralelo e ligados por filas (ver pipeline_importacao.py);
+    # os vídeos vão para processos ffmpeg, tantos quantos o governador
+    # (governador.py) deixar pela folga de CPU/RAM/temperatura
+    from app_midia_manual_importer.pipeline_importacao import importar
+    importadas = importar(reservar_destinos(pasta_origem))
+    print(f"\n📦 Total de mídias processadas e salvas: {len(importadas)}")
+    return importadas
 
 def rodar_indexador_annoy():
-    BASE_DIR = Path("data_midia")
-    INDEX_DIR = BASE_DIR / "index_annoy"
-    INDEX_DIR.mkdir(parents=True, exist_ok=True)
-    MAP_FILE = INDEX_DIR / "index_map.json"
-    ANNOY_FILE = INDEX_DIR / "index.ann"
-
-    def salvar_index(index_map):
-        with open(MAP_FILE, "w", encoding="utf-8") as f:
-            json.dump(index_map, f, indent=4, ensure_ascii=False)
-        print(f"🗂️ Index atualizado: {MAP_FILE}")
-
-    def processar_midia(diretorio_tipo, tipo, index_map, annoy_index, proximo_id):
-        for subpasta in Path(diretorio_tipo).rglob("*"):
-            if not subpasta.is_dir():
-                continue
-            for arquivo in subpasta.iterdir():
-                if not arquivo.is_file():
-                    continue
-                if arquivo.suffix.lower() not in EXTENSOES_IMAGEM.union(EXTENSOES_VIDEO):
-                    continue
-                json_path = arquivo.with_suffix(".json")
-                npy_path = arquivo.with_suffix(".npy")
-                if not json_path.exists() or not npy_path.exists():
-                    continue
-                with open(json_path, "r", encoding="utf-8") as f:
-                    dados = json.load(f)
-                descricao = dados.get("descricao", "").strip()
-                if not descricao:
-                    continue
-                vetor = np.load(npy_path).astype("float32")
-                if vetor.ndim == 2:
-                    vetor = vetor[0]
-                annoy_index.add_item(proximo_id, vetor)
-                index_map[str(proximo_id)] = {
-                    "tipo": tipo,
-                    "caminho": str(arquivo.resolve()),
-                    "descricao": descricao
-                }
-                print(f"🔄 Adicionado ID {proximo_id}: {arquivo.name}")
-                proximo_id += 1
-        return proximo_id
-
-    print("\n🔍 Reconstruindo o índice do zero...")
-    index_map = {}  # <-- zera tudo
-    proximo_id = 0
-    annoy_index = AnnoyIndex(VECTOR_SIZE, "angular")
-    proximo_id = processar_midia(BASE_DIR / "imagens", "imagem", index_map, annoy_index, proximo_id)
-    proximo_id = processar_midia(BASE_DIR / "videos", "video", index_map, annoy_index, proximo_id)
-    if annoy_index.get_n_items() > 0:
-        annoy_index.build(10)
-        annoy_index.save(str(ANNOY_FILE))
-        print(f"✅ Index reconstruído com sucesso. Total: {annoy_index.get_n_items()} itens.")
-    else:
-        print("⚠️ Nenhum vetor foi adicionado.")
-    salvar_index(index_map)
+    # incremental: só as mídias novas entram (ver indice_midia.py)
+    from app_midia_manual_importer.indice_midia import atualizar_indice
+    atualizar_indice()
 
 def aguardar_liberacao(arquivo_path, tentativas=5, delay=2):
     """Tenta abrir o arquivo com exclusividade até conseguir ou atingir o limite."""
+    import msvcrt  # só existe no Windows
     for _ in range(tentativas):
         try:
             with open(arquivo_path, "r+b") as f:
@@ -289,14 +258,24 @@ def remover_forcado_cmd(caminho: Path):
         print(f"❌ Erro na exclusão forçada de {caminho.name}: {e}")
 
 
-def limpar_midias_temporais():
+def limpar_midias_temporais(arquivos=None):
+    """
+    Apaga de midias_temporais os `arquivos` (as origens que chegaram ao
+    acervo); o resto fica para a próxima importação. Sem lista, apaga tudo.
+    """
     pasta = Path(__file__).resolve().parent.parent / "midias_temporais"
     if not pasta.exists():
         return
+    if arquivos is None:
+        arquivos = list(pasta.iterdir())
+    else:
+        restantes = sum(1 for p in pasta.iterdir() if p.is_file()) - len(arquivos)
+        if restantes > 0:
+            print(f"⚠️ {restantes} arquivo(s) ficaram em midias_temporais (não chegaram ao acervo)")
 
     arquivos_falhados = []
 
-    for arquivo in pasta.iterdir():
+    for arquivo in arquivos:
         try:
             if arquivo.is_file():
                 arquivo.unlink()
@@ -323,9 +302,9 @@ def limpar_midias_temporais():
 def iniciar_importador():
     pasta = escolher_pasta()
     if pasta:
-        copiar_arquivos(pasta)
+        importadas = copiar_arquivos(pasta)
         rodar_indexador_annoy()
-        limpar_midias_temporais()
+        limpar_midias_temporais(importadas)
         
 if __name__ == "__main__":
     iniciar_importador()
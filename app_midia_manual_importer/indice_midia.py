@@ -0,0 +1,218 @@
+# indice_midia.py
+#
+# Índice vetorial das mídias de data_midia, atualizado aos poucos em vez de
+# reconstruído do zero a cada importação.
+#
+# Os vetores e o id -> {tipo, caminho, descricao} ficam no acervo
+# (acervo_embeddings.py: uma matriz memory-mapped + SQLite). Aqui fica só o
+# Annoy, em data_midia/index_annoy/index.ann, que cobre as linhas 0..m-1
+# do acervo; as linhas de m em diante são o "delta", ainda não mescladas.
+#
+# - atualizar_indice() traz para o acervo as mídias antigas que ainda só têm
+#   sidecars .json/.npy e, quando o delta passa de LIMITE_DELTA itens (ou não
+#   existe index.ann), dispara em segundo plano a geração de um index.ann novo
+#   (uma leitura sequencial da matriz), trocado por os.replace.
+# - Quem busca usa carregar(): ids, vetores e mapa das mídias ativas.
+# - reconstruir_indice() desativa as mídias que sumiram do disco e refaz o
+#   index.ann do zero.
+
+import os
+import json
+import time
+import threading
+import numpy as np
+from pathlib import Path
+
+from app_midia_manual_importer import acervo_embeddings as acervo
+
+BASE_DIR = Path("data_midia")
+INDEX_DIR = BASE_DIR / "index_annoy"
+ANNOY_FILE = INDEX_DIR / "index.ann"
+
+VECTOR_SIZE = acervo.VECTOR_SIZE
+N_ARVORES = 10
+LIMITE_DELTA = 2000   # linhas do acervo fora do index.ann antes de mesclar
+TAMANHO_BLOCO = 10000  # linhas da matriz lidas por vez ao montar o index.ann
+EXTENSOES_IMAGEM = {".jpg", ".jpeg", ".png", ".webp"}
+EXTENSOES_VIDEO = {".mp4", ".webm", ".mov", ".mkv"}
+PASTAS_TIPOS = (("imagens", "imagem"), ("videos", "video"))
+
+_lock = threading.Lock()
+_mesclagem = None
+
+
+# ─── Arquivos ─────────────────────────────────────────────────────
+
+def _substituir(origem, destino, tentativas=5):
+    """os.replace com novas tentativas (no Windows falha se alguém estiver lendo o arquivo)."""
+    for tentativa in range(tentativas):
+        try:
+            os.replace(origem, destino)
+            return
+        except PermissionError:
+            if tentativa + 1 == tentativas:
+                raise
+            time.sleep(0.5 * (tentativa + 1))
+
+
+def itens_no_annoy():
+    """Quantas linhas do acervo o index.ann atual cobre."""
+    if not ANNOY_FILE.exists():
+        return 0
+    from annoy import AnnoyIndex   # só aqui: a busca "exato"/"hnsw" não precisa do annoy
+    principal = AnnoyIndex(VECTOR_SIZE, "angular")
+    principal.load(str(ANNOY_FILE))
+    n = principal.get_n_items()
+    principal.unload()
+    return n
+
+
+# ─── Mídias em disco ──────────────────────────────────────────────
+
+def _midias_em_disco():
+    """(arquivo, tipo) de cada mídia em data_midia/imagens e data_midia/videos (sem abrir nada)."""
+    for pasta, tipo in PASTAS_TIPOS:
+        for subpasta in (BASE_DIR / pasta).rglob("*"):
+            if not subpasta.is_dir():
+                continue
+            for arquivo in subpasta.iterdir():
+                if arquivo.is_file() and arquivo.suffix.lower() in EXTENSOES_IMAGEM | EXTENSOES_VIDEO:
+                    yield arquivo, tipo
+
+
+def _ler_sidecars(arquivo, tipo):
+    """Sidecars .json/.npy do importador antigo: (caminho, tipo, descricao, vetor) ou None."""
+    json_path = arquivo.with_suffix(".json")
+    npy_path = arquivo.with_suffix(".npy")
+    if not json_path.exists() or not npy_path.exists():
+        return None
+    with open(json_path, "r", encoding="utf-8") as f:
+        descricao = json.load(f).get("descricao", "").strip()
+    if not descricao:
+        return None
+    vetor = np.load(npy_path).astype("float32")
+    if vetor.ndim == 2:
+        vetor = vetor[0]
+    return arquivo, tipo, descricao, vetor
+
+
+def importar_sidecars():
+    """
+    Passa para o acervo as mídias que só têm os sidecars .json/.npy antigos
+    (só lista as pastas; só abre os sidecars de quem não está no acervo).
+    Os sidecars ficam no disco e podem ser apagados depois. Retorna quantas.
+    """
+    conhecidos = acervo.caminhos_ativos()
+    itens = []
+    for arquivo, tipo in _midias_em_disco():
+        if str(arquivo.resolve()) in conhecidos:
+            continue
+        item = _ler_sidecars(arquivo, tipo)
+        if item is not None:
+            itens.append(item)
+    for i, (arquivo, *_) in zip(acervo.adicionar_lote(itens), itens):
+        print(f"🔄 Adicionado ID {i}: {arquivo.name}")
+    return len(itens)
+
+
+# ─── Atualização ──────────────────────────────────────────────────
+
+def atualizar_indice():
+    """
+    Traz os sidecars antigos para o acervo e, se o delta passou de
+    LIMITE_DELTA (ou ainda não há index.ann), dispara a mesclagem em segundo
+    plano. As mídias novas do importador já entram direto no acervo.
+    Retorna quantas mídias estão no delta.
+    """
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        if importar_sidecars() == 0:
+            print("✅ Nenhum sidecar antigo para importar.")
+        delta = acervo.total() - itens_no_annoy()
+        print(f"🗂️ {delta} mídia(s) no delta aguardando mesclagem.")
+        mesclar = delta >= LIMITE_DELTA or (delta > 0 and not ANNOY_FILE.exists())
+
+    if mesclar:
+        mesclar_em_segundo_plano()
+    return delta
+
+
+def _gerar_annoy():
+    """Gera um index.ann com todas as linhas do acervo (lidas em sequência) e troca o arquivo."""
+    matriz = acervo.matriz()
+    n = len(matriz)
+    if n == 0:
+        return 0
+    from annoy import AnnoyIndex
+    novo = AnnoyIndex(VECTOR_SIZE, "angular")
+    for inicio in range(0, n, TAMANHO_BLOCO):
+        bloco = acervo._decodificar(matriz[inicio:inicio + TAMANHO_BLOCO])
+        for deslocamento, vetor in enumerate(bloco):
+            novo.add_item(inicio + deslocamento, vetor)
+    del matriz
+    novo.build(N_ARVORES)
+    tmp = INDEX_DIR / "index.ann.tmp"
+    novo.save(str(tmp))
+    novo.unload()
+    with _lock:
+        _substituir(tmp, ANNOY_FILE)
+    return n
+
+
+def mesclar_delta():
+    """Gera um index.ann novo cobrindo o acervo inteiro, se houver delta. Retorna o tamanho do delta."""
+    delta = acervo.total() - itens_no_annoy()
+    if delta <= 0:
+        return 0
+    print(f"🛠️ Mesclando {delta} mídia(s) do delta no índice...")
+    total = _gerar_annoy()
+    print(f"✅ Índice mesclado: {total} itens no index.ann.")
+    return delta
+
+
+def _mesclar_com_log():
+    try:
+        mesclar_delta()
+    except Exception as e:
+        print(f"❌ Erro ao mesclar o delta do índice: {e}")
+
+
+def mesclar_em_segundo_plano():
+    """Dispara a mesclagem numa thread (uma por vez). Retorna a thread."""
+    global _mesclagem
+    with _lock:
+        if _mesclagem is None or not _mesclagem.is_alive():
+            # não-daemon: o processo espera a mesclagem terminar antes de sair
+            _mesclagem = threading.Thread(target=_mesclar_com_log, name="mesclar_indice")
+            _mesclagem.start()
+        return _mesclagem
+
+
+def reconstruir_indice():
+    """Desativa no acervo as mídias que sumiram do disco, importa sidecars antigos e refaz o index.ann."""
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    print("\n🔍 Reconstruindo o índice do zero...")
+    sumiram = [c for c in acervo.caminhos_ativos() if not Path(c).exists()]
+    if sumiram:
+        acervo.desativar(sumiram)
+        print(f"🧹 {len(sumiram)} mídia(s) que não existem mais saíram do acervo.")
+    importar_sidecars()
+    total = _gerar_annoy()
+    if total:
+        print(f"✅ Index reconstruído com sucesso. Total: {len(acervo.ids_ativos())} itens.")
+    else:
+        print("⚠️ Nenhum vetor foi adicionado.")
+
+
+# ─── Leitura ──────────────────────────────────────────────────────
+
+def existe():
+    return acervo.existe()
+
+
+def carregar():
+    """
+    Todos os itens pesquisáveis: (ids, vetores, index_map), direto do acervo
+    (vetores normalizados; index_map = {str(id): {tipo, caminho, descricao}}).
+    """
+    return acervo.carregar()
@@ -0,0 +1,124 @@
+# legendas_blip.py
+#
+# Legendas BLIP em lote para o importador de mídias.
+#
+# - descrever_lote(imagens): um generate() para várias imagens (o processor
+#   já redimensiona todas para o mesmo tamanho, então o lote é um tensor só).
+# - FilaLegendas junta os quadros de vários vídeos e imagens, roda o BLIP a
+#   cada lote cheio e devolve as legendas para cada mídia, na ordem dos
+#   quadros, quando a última legenda dela fica pronta.
+# - O tamanho do lote sai da memória livre (RAM, ou VRAM na GPU) na hora,
+#   limitado a LOTE_MAXIMO.
+# - Os quadros esperam na fila já no tamanho de entrada do BLIP
+#   (reduzir_quadro), não em 1920x1080.
+
+from PIL import Image
+
+import modelos
+
+NUM_BEAMS = 5
+LOTE_MINIMO = 1
+LOTE_MAXIMO = 16
+MB_POR_IMAGEM = 400      # memória de pico de uma imagem no generate com 5 beams (BLIP-large)
+FRACAO_MEMORIA = 0.5     # parte da memória livre que o lote pode ocupar
+TAMANHO_ENTRADA = (384, 384)  # o BlipImageProcessor redimensiona para isso (bicúbico)
+
+
+def reduzir_quadro(imagem):
+    """Redimensiona como o processor do BLIP faria: mesma legenda, ~40x menos memória na fila."""
+    return imagem.resize(TAMANHO_ENTRADA, Image.BICUBIC)
+
+
+def tamanho_lote():
+    """Quantas imagens cabem num generate com a memória livre agora."""
+    if modelos.dispositivo() == "cuda":
+        import torch
+        livre, _ = torch.cuda.mem_get_info()
+    else:
+        import psutil
+        livre = psutil.virtual_memory().available
+    cabem = int(livre * FRACAO_MEMORIA / (MB_POR_IMAGEM * 1024 * 1024))
+    return max(LOTE_MINIMO, min(LOTE_MAXIMO, cabem))
+
+
+def descrever_lote(imagens):
+    """Legendas (mesma ordem) de uma lista de imagens PIL, num generate só."""
+    if not imagens:
+        return []
+    import torch
+    with modelos.usar("blip") as (blip_processor, blip_model):
+        inputs = blip_processor(images=list(imagens), return_tensors="pt").to(modelos.dispositivo())
+        with torch.no_grad():
+            saida = blip_model.generate(
+                **inputs,
+                num_beams=NUM_BEAMS,
+                length_penalty=0.8,
+                max_new_tokens=30,
+                do_sample=False
+            )
+        return [texto.strip() for texto in blip_processor.batch_decode(saida, skip_special_tokens=True)]
+
+
+class FilaLegendas:
+    """
+    Quadros de várias mídias esperando legenda. Uso:
+
+        fila = FilaLegendas(ao_concluir)
+        fila.adicionar(midia, [reduzir_quadro(q) for q in ...])   # roda lotes quando enche
+        ...
+        fila.esvaziar()                                             # roda o que sobrou
+
+    ao_concluir(concluidas) recebe [(midia, [legendas na ordem dos quadros])]
+    das mídias terminadas em cada lote, para quem salva poder agrupar também.
+    Se um lote falhar, as mídias dele chegam com legendas = None.
+    """
+
+    def __init__(self, ao_concluir, lote=None):
+        self.ao_concluir = ao_concluir
+        self.lote = lote
+        self._quadros = []      # (midia, posição, imagem)
+        self._legendas = {}     # midia -> [legenda ou None por quadro]
+        self._faltam = {}       # midia -> quadros ainda sem legenda
+        self._falhas = set()
+
+    def __len__(self):
+        return len(self._quadros)
+
+    def adicionar(self, midia, quadros):
+        quadros = list(quadros)
+        if not quadros:
+            self.ao_concluir([(midia, [])])
+            return
+        self._legendas[midia] = [None] * len(quadros)
+        self._faltam[midia] = len(quadros)
+        self._quadros.extend((midia, i, quadro) for i, quadro in enumerate(quadros))
+        while len(self._quadros) >= (self.lote or tamanho_lote()):
+            self._rodar_lote()
+
+    def esvaziar(self):
+        while self._quadros:
+            self._rodar_lote()
+
+    def _rodar_lote(self):
+        tamanho = self.lote or tamanho_lote()
+        lote, self._quadros = self._quadros[:tamanho], self._quadros[tamanho:]
+        try:
+            legendas = descrever_lote([quadro for _, _, quadro in lote])
+        except Exception as e:
+            print(f"❌ Erro no lote de legendas ({len(lote)} quadros): {e}")
+            legendas = [None] * len(lote)
+            self._falhas.update(midia for midia, _, _ in lote)
+
+        concluidas = []
+        for (midia, posicao, _), legenda in zip(lote, legendas):
+            self._legendas[midia][posicao] = legenda
+            self._faltam[midia] -= 1
+            if self._faltam[midia] == 0:
+                del self._faltam[midia]
+                resultado = self._legendas.pop(midia)
+                if midia in self._falhas:
+                    self._falhas.discard(midia)
+                    resultado = None
+                concluidas.append((midia, resultado))
+        if concluidas:
+            self.ao_concluir(concluidas)
@@ -0,0 +1,166 @@
+# pipeline_importacao.py
+#
+# Importação de mídias em etapas, cada uma no seu ritmo, ligadas por filas
+# com tamanho máximo (quem produz espera quando a próxima etapa atrasa, em
+# vez de acumular quadros na memória):
+#
+#   descoberta (processo principal)
+#       lista midias_temporais, reserva o nome final de cada mídia e manda
+#       os vídeos para o PoolTranscodificacao (ffmpeg, ver transcodificacao.py)
+#   -> fila_preparo ->
+#   preparo (WORKERS_PREPARO processos)
+#       imagem: redimensiona e grava o .webp; vídeo: amostra os quadros
+#       (amostragem_quadros.py). Devolve os quadros já no tamanho do BLIP
+#   -> fila_legendas ->
+#   modelos (um processo só, o único que carrega BLIP e MiniLM)
+#       legendas em lote (legendas_blip.FilaLegendas) e embeddings
+#   -> fila_escrita ->
+#   escrita (thread no processo principal)
+#       espera o ffmpeg de cada vídeo e grava no acervo em lote
+#
+# O trabalho de cada etapa fica em controller_midia (preparar_midia,
+# descrever_concluidas, gravar_descritas); aqui só a ligação entre elas.
+#
+# Se um processo morre (crash do driver, OOM), ninguém mais lê a fila dele:
+# o processo principal só coloca nas filas com timeout, conferindo se quem
+# consome ainda está vivo, e sem o processo dos modelos encerra os de
+# preparo. As mídias que não chegaram à escrita são apagadas do destino.
+
+import os
+import queue
+import threading
+import multiprocessing
+
+from app_midia_manual_importer import controller_midia
+from app_midia_manual_importer.legendas_blip import FilaLegendas
+from app_midia_manual_importer.transcodificacao import PoolTranscodificacao
+
+WORKERS_PREPARO = max(1, (os.cpu_count() or 2) // 2)
+TAMANHO_FILA_PREPARO = 2    # tarefas esperando por worker de preparo
+TAMANHO_FILA_LEGENDAS = 8   # mídias com quadros esperando o processo dos modelos
+TAMANHO_FILA_ESCRITA = 16   # lotes descritos esperando gravação
+ESPERA_FILA = 1.0           # segundos entre conferências de processo vivo numa fila cheia
+FIM = None
+
+
+def _colocar(fila, item, vivo):
+    """fila.put que desiste (retorna False) se vivo() diz que ninguém mais vai ler a fila."""
+    while True:
+        try:
+            fila.put(item, timeout=ESPERA_FILA)
+            return True
+        except queue.Full:
+            if not vivo():
+                return False
+
+
+def _etapa_preparo(entrada, saida):
+    while True:
+        tarefa = entrada.get()
+        if tarefa is FIM:
+            saida.put(FIM)
+            return
+        origem, destino, tipo = tarefa
+        saida.put((destino, tipo, controller_midia.preparar_midia(origem, destino, tipo)))
+
+
+def _etapa_modelos(entrada, saida, produtores):
+    fila = FilaLegendas(lambda concluidas: saida.put(controller_midia.descrever_concluidas(concluidas)))
+    fins = 0
+    while fins < produtores:
+        item = entrada.get()
+        if item is FIM:
+            fins += 1
+            continue
+        destino, tipo, quadros = item
+        if quadros is None:
+            # o preparo falhou (e já avisou): passa adiante para a escrita limpar a reserva
+            saida.put(controller_midia.descrever_concluidas([((destino, tipo), None)]))
+        else:
+            fila.adicionar((destino, tipo), quadros)
+    fila.esvaziar()
+    saida.put(FIM)
+
+
+def _etapa_escrita(entrada, transcodificacoes, tratados, gravados):
+    while True:
+        lote = entrada.get()
+        if lote is FIM:
+            return
+        tratados.update(destino for destino, _, _, _ in lote)
+        try:
+            gravados.update(controller_midia.gravar_descritas(lote, transcodificacoes))
+        except Exception as e:
+            # a thread não pode morrer: o processo dos modelos travaria com a fila cheia
+            print(f"❌ Erro ao gravar {len(lote)} mídia(s): {e}")
+
+
+def importar(tarefas, workers=None):
+    """
+    Roda o pipeline sobre `tarefas` (iterável de (origem, destino, tipo),
+    destino já reservado). Retorna as origens cujas mídias chegaram ao
+    acervo (só essas podem sair de midias_temporais).
+    """
+    workers = workers or WORKERS_PREPARO
+    # spawn em todo sistema: é o único do Windows e não herda estado de CUDA
+    ctx = multiprocessing.get_context("spawn")
+    fila_preparo = ctx.Queue(maxsize=TAMANHO_FILA_PREPARO * workers)
+    fila_legendas = ctx.Queue(maxsize=TAMANHO_FILA_LEGENDAS)
+    fila_escrita = ctx.Queue(maxsize=TAMANHO_FILA_ESCRITA)
+
+    preparo = [
+        ctx.Process(target=_etapa_preparo, args=(fila_preparo, fila_legendas), name=f"preparo_{i}", daemon=True)
+        for i in range(workers)
+    ]
+    modelos_proc = ctx.Process(target=_etapa_modelos, args=(fila_legendas, fila_escrita, workers), name="modelos", daemon=True)
+    transcodificacoes = {}
+    reservados, tratados, gravados = [], set(), set()
+    escrita = threading.Thread(target=_etapa_escrita, args=(fila_escrita, transcodificacoes, tratados, gravados),
+                               name="escrita")
+
+    def preparo_consegue_entregar():
+        return modelos_proc.is_alive() and any(proc.is_alive() for proc in preparo)
+
+    for proc in preparo:
+        proc.start()
+    modelos_proc.start()
+    escrita.start()
+
+    with PoolTranscodificacao(resolucao=controller_midia.RESOLUCAO_PADRAO) as pool:
+        try:
+            for origem, destino, tipo in tarefas:
+                if tipo == "video":
+                    # registrado antes de a mídia entrar na fila: a escrita sempre acha o futuro
+                    transcodificacoes[destino] = pool.enviar(origem, destino)
+                reservados.append((origem, destino))
+                if not _colocar(fila_preparo, (origem, destino, tipo), preparo_consegue_entregar):
+                    print("❌ Pipeline parado: os processos de preparo ou dos modelos terminaram antes da hora")
+                    break
+        finally:
+            for _ in preparo:
+                if not _colocar(fila_preparo, FIM, preparo_consegue_entregar):
+                    break
+            for proc in preparo:
+                while proc.is_alive() and modelos_proc.is_alive():
+                    proc.join(ESPERA_FILA)
+                if proc.is_alive():
+                    # sem o processo dos modelos ninguém lê fila_legendas: o preparo ficaria preso no put
+                    proc.terminate()
+                    proc.join()
+                elif proc.exitcode != 0:
+                    # morreu sem mandar o FIM dele: manda no lugar para o processo dos modelos não esperar para sempre
+                    print(f"❌ Processo {proc.name} terminou com código {proc.exitcode}")
+                    _colocar(fila_legendas, FIM, modelos_proc.is_alive)
+            modelos_proc.join()
+            if modelos_proc.exitcode != 0:
+                print(f"❌ Processo dos modelos terminou com código {modelos_proc.exitcode}")
+                fila_escrita.put(FIM)
+            escrita.join()
+
+            # reservadas que não chegaram à escrita (algum processo morreu no caminho)
+            perdidos = [destino for _, destino in reservados if destino not in tratados]
+            if perdidos:
+                print(f"🧹 Apagando {len(perdidos)} mídia(s) que não chegaram ao acervo")
+            for destino in perdidos:
+                controller_midia.descartar_destino(destino, transcodificacoes.pop(destino, None))
+    return [origem for origem, destino in reservados if destino in gravados]
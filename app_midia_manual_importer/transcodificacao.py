@@ -0,0 +1,125 @@
+# transcodificacao.py
+#
+# Conversão dos vídeos importados para 1920x1080 H.264, fora do Python.
+#
+# - Cada clipe vira um processo ffmpeg (libx264, PRESET/CRF abaixo); vários
+#   rodam ao mesmo tempo num PoolTranscodificacao, enquanto o importador
+#   segue amostrando quadros e legendando. Quantos de fato rodam juntos quem
+#   decide é o governador (governador.py), pela folga de CPU/RAM/temperatura.
+# - Clipe que já está em H.264 yuv420p na resolução padrão não é
+#   recodificado: só o vídeo é copiado (-c copy, sem o áudio) para um .mp4.
+# - O ffmpeg vem do PATH ou, se não houver, do imageio-ffmpeg (já nas
+#   dependências).
+# - A saída é gravada em "<destino>.tmp" e trocada por os.replace no fim,
+#   então um destino nunca fica pela metade.
+
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import governador
+
+RESOLUCAO_PADRAO = (1920, 1080)
+CODEC_PADRAO = "h264"
+PIX_FMT_PADRAO = "yuv420p"   # 10 bits ou 4:2:2 não tocam em todo player: recodifica
+PRESET = "veryfast"
+CRF = 20
+THREADS_POR_PROCESSO = 4   # o x264 escala mal acima disso em 1080p; melhor mais processos
+
+_ffmpeg = None
+
+
+def ffmpeg_exe():
+    global _ffmpeg
+    if _ffmpeg is None:
+        _ffmpeg = shutil.which("ffmpeg")
+        if _ffmpeg is None:
+            import imageio_ffmpeg
+            _ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    return _ffmpeg
+
+
+def ja_no_padrao(origem, resolucao=RESOLUCAO_PADRAO):
+    """True se o clipe já é H.264 yuv420p na resolução pedida (lê só o cabeçalho)."""
+    import av
+    with av.open(str(origem)) as container:
+        stream = container.streams.video[0]
+        contexto = stream.codec_context
+        return (contexto.name == CODEC_PADRAO and contexto.pix_fmt == PIX_FMT_PADRAO
+                and (contexto.width, contexto.height) == tuple(resolucao))
+
+
+def _rodar_ffmpeg(argumentos):
+    proc = subprocess.run(
+        [ffmpeg_exe(), "-hide_banner", "-loglevel", "error", "-y", *argumentos],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors="replace"
+    )
+    if proc.returncode != 0:
+        erro = (proc.stderr.strip().splitlines() or [f"código {proc.returncode}"])[-1]
+        raise RuntimeError(f"ffmpeg falhou: {erro}")
+
+
+def transcodificar(origem, destino, resolucao=RESOLUCAO_PADRAO, threads=THREADS_POR_PROCESSO):
+    """
+    Grava `origem` em `destino` (.mp4, H.264, `resolucao`, sem áudio, como o
+    importador sempre gerou). Retorna "remux" ou "transcodificado".
+    """
+    temp = destino.with_name(destino.name + ".tmp")
+    try:
+        if ja_no_padrao(origem, resolucao):
+            # mesmo de .mp4 para .mp4: copiar o arquivo levaria o áudio junto
+            _rodar_ffmpeg(["-i", str(origem), "-map", "0:v:0", "-c", "copy", "-an",
+                           "-movflags", "+faststart", "-f", "mp4", str(temp)])
+            modo = "remux"
+        else:
+            largura, altura = resolucao
+            _rodar_ffmpeg([
+                "-i", str(origem), "-map", "0:v:0", "-an",
+                "-vf", f"scale={largura}:{altura},setsar=1",
+                "-c:v", "libx264", "-preset", PRESET, "-crf", str(CRF), "-pix_fmt", "yuv420p",
+                "-threads", str(threads), "-movflags", "+faststart", "-f", "mp4", str(temp)
+            ])
+            modo = "transcodificado"
+        os.replace(temp, destino)
+        return modo
+    finally:
+        if temp.exists():
+            temp.unlink()
+
+
+def _transcodificar_com_vaga(origem, destino, resolucao, threads):
+    with governador.vaga():
+        return transcodificar(origem, destino, resolucao, threads)
+
+
+class PoolTranscodificacao:
+    """
+    Processos ffmpeg em paralelo (cada um numa thread que só espera o
+    subprocess e a vaga do governador). Uso:
+
+        with PoolTranscodificacao() as pool:
+            futuro = pool.enviar(origem, destino)
+            ...
+            futuro.result()   # "remux" / "transcodificado" ou a exceção
+    """
+
+    def __init__(self, workers=None, resolucao=RESOLUCAO_PADRAO):
+        nucleos = os.cpu_count() or 1
+        # teto de processos; abaixo dele, o governador escolhe quantos rodam
+        self.workers = workers or governador.padrao().maximo
+        self.threads = min(THREADS_POR_PROCESSO, nucleos)
+        self.resolucao = resolucao
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ffmpeg")
+
+    def enviar(self, origem, destino):
+        return self._executor.submit(_transcodificar_com_vaga, origem, destino, self.resolucao, self.threads)
+
+    def fechar(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
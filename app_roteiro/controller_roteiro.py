@@ -6,107 +6,73 @@ from app_roteiro.gerador_resumo import gerar_resumo
 from app_roteiro.gerador_topicos import gerar_topicos
 from app_roteiro.gerador_introducao import gerar_introducao
 from app_roteiro.gerador_conteudos import gerar_conteudos_topicos  # ✅ NOVO
+from status_etapas import registrar_fluxo, listar_pendentes, marcar, reabrir_sem_saida, CONCLUIDA, FALHOU
 
 DATA_DIR = "data"
+FLUXO = "roteiro"
 log_callback = print
 
 def set_logger(callback):
     global log_callback
     log_callback = callback
 
-def listar_videos_para_transcricao():
+# Arquivo (em data/<canal>/<video>/control) que cada etapa produz
+SAIDAS_ETAPAS = {
+    "transcricao": "transcript_original.json",
+    "resumo": "resumo.json",
+    "topicos": "topicos.json",
+    "introducao": "introducao.txt",
+    "conteudos": "roteiros.json",
+}
+
+registrar_fluxo(FLUXO, {
+    "transcricao": [],
+    "resumo": ["transcricao"],
+    "topicos": ["transcricao", "resumo"],
+    "introducao": ["topicos"],
+    "conteudos": ["introducao", "topicos"],
+})
+
+def _saida(etapa, canal, video_id):
+    return os.path.join(DATA_DIR, canal, video_id, "control", SAIDAS_ETAPAS[etapa])
+
+def _listar_pendentes(etapa):
+    """
+    Vídeos com a etapa pendente na tabela de etapas. Os que já têm o arquivo
+    de saída (feitos antes da tabela existir) são marcados como concluídos
+    aqui mesmo, o que libera a etapa seguinte; concluídos cujo arquivo foi
+    apagado voltam a ficar pendentes (apagar a saída refaz a etapa).
+    """
+    reabrir_sem_saida(FLUXO, etapa, lambda canal, video_id: os.path.exists(_saida(etapa, canal, video_id)))
     tarefas = {}
-    for canal in os.listdir(DATA_DIR):
-        canal_path = os.path.join(DATA_DIR, canal)
-        if not os.path.isdir(canal_path):
-            continue
-        videos = []
-        for item in os.listdir(canal_path):
-            video_path = os.path.join(canal_path, item)
-            if os.path.isdir(video_path) and item.isdigit():
-                transcript_json = os.path.join(video_path, "control", "transcript_original.json")
-                if not os.path.exists(transcript_json):
-                    videos.append(item)
-        if videos:
-            tarefas[canal] = sorted(videos)
+    for canal, videos in listar_pendentes(FLUXO, etapa).items():
+        restantes = []
+        for video_id in videos:
+            if os.path.exists(_saida(etapa, canal, video_id)):
+                marcar(FLUXO, canal, video_id, etapa, CONCLUIDA)
+            else:
+                restantes.append(video_id)
+        if restantes:
+            tarefas[canal] = restantes
     return tarefas
 
+def _registrar_resultado(etapa, canal, video_id, sucesso):
+    marcar(FLUXO, canal, video_id, etapa, CONCLUIDA if sucesso else FALHOU)
+
+def listar_videos_para_transcricao():
+    return _listar_pendentes("transcricao")
+
 def listar_videos_para_resumo():
-    tarefas = {}
-    for canal in os.listdir(DATA_DIR):
-        canal_path = os.path.join(DATA_DIR, canal)
-        if not os.path.isdir(canal_path):
-            continue
-        videos = []
-        for item in os.listdir(canal_path):
-            video_path = os.path.join(canal_path, item)
-            if os.path.isdir(video_path) and item.isdigit():
-                transcript_json = os.path.join(video_path, "control", "transcript_original.json")
-                resumo_json = os.path.join(video_path, "control", "resumo.json")
-                if os.path.exists(transcript_json) and not os.path.exists(resumo_json):
-                    videos.append(item)
-        if videos:
-            tarefas[canal] = sorted(videos)
-    return tarefas
+    return _listar_pendentes("resumo")
 
 def listar_videos_para_topicos():
-    tarefas = {}
-    for canal in os.listdir(DATA_DIR):
-        canal_path = os.path.join(DATA_DIR, canal)
-        if not os.path.isdir(canal_path):
-            continue
-        videos = []
-        for item in os.listdir(canal_path):
-            video_path = os.path.join(canal_path, item)
-            if os.path.isdir(video_path) and item.isdigit():
-                control_path = os.path.join(video_path, "control")
-                transcript_json = os.path.join(control_path, "transcript_original.json")
-                resumo_json = os.path.join(control_path, "resumo.json")
-                topicos_json = os.path.join(control_path, "topicos.json")
-                if os.path.exists(transcript_json) and os.path.exists(resumo_json) and not os.path.exists(topicos_json):
-                    videos.append(item)
-        if videos:
-            tarefas[canal] = sorted(videos)
-    return tarefas
+    return _listar_pendentes("topicos")
 
 def listar_videos_para_introducao():
-    tarefas = {}
-    for canal in os.listdir(DATA_DIR):
-        canal_path = os.path.join(DATA_DIR, canal)
-        if not os.path.isdir(canal_path):
-            continue
-        videos = []
-        for item in os.listdir(canal_path):
-            video_path = os.path.join(canal_path, item)
-            if os.path.isdir(video_path) and item.isdigit():
-                control_path = os.path.join(video_path, "control")
-                topicos_json = os.path.join(control_path, "topicos.json")
-                introducao_txt = os.path.join(control_path, "introducao.txt")
-                if os.path.exists(topicos_json) and not os.path.exists(introducao_txt):
-                    videos.append(item)
-        if videos:
-            tarefas[canal] = sorted(videos)
-    return tarefas
+    return _listar_pendentes("introducao")
 
 def listar_videos_para_conteudos():
-    tarefas = {}
-    for canal in os.listdir(DATA_DIR):
-        canal_path = os.path.join(DATA_DIR, canal)
-        if not os.path.isdir(canal_path):
-            continue
-        videos = []
-        for item in os.listdir(canal_path):
-            video_path = os.path.join(canal_path, item)
-            if os.path.isdir(video_path) and item.isdigit():
-                control_path = os.path.join(video_path, "control")
-                introducao_txt = os.path.join(control_path, "introducao.txt")
-                topicos_json = os.path.join(control_path, "topicos.json")
-                roteiros_json = os.path.join(control_path, "roteiros.json")
-                if os.path.exists(introducao_txt) and os.path.exists(topicos_json) and not os.path.exists(roteiros_json):
-                    videos.append(item)
-        if videos:
-            tarefas[canal] = sorted(videos)
-    return tarefas
+    return _listar_pendentes("conteudos")
 
 def processar_roteiros():
     # Fase 1 - Transcrição
@@ -118,6 +84,7 @@ def processar_roteiros():
             for video_id in videos:
                 log_callback(f"\n🎙️ Transcrevendo {canal}/{video_id}...")
                 sucesso = gerar_transcricao(canal, video_id, log_callback)
+                _registrar_resultado("transcricao", canal, video_id, sucesso)
                 if not sucesso:
                     log_callback(f"⛔ Erro ao transcrever {canal}/{video_id}")
     else:
@@ -132,6 +99,7 @@ def processar_roteiros():
             for video_id in videos:
                 log_callback(f"\n📚 Gerando resumo para {canal}/{video_id}...")
                 sucesso = gerar_resumo(canal, video_id, log_callback)
+                _registrar_resultado("resumo", canal, video_id, sucesso)
                 if not sucesso:
                     log_callback(f"⚠️ Erro ao gerar resumo para {canal}/{video_id}")
     else:
@@ -146,6 +114,7 @@ def processar_roteiros():
             for video_id in videos:
                 log_callback(f"\n📝 Gerando tópicos para {canal}/{video_id}...")
                 sucesso = gerar_topicos(canal, video_id, log_callback)
+                _registrar_resultado("topicos", canal, video_id, sucesso)
                 if not sucesso:
                     log_callback(f"⚠️ Erro ao gerar tópicos para {canal}/{video_id}")
     else:
@@ -160,6 +129,7 @@ def processar_roteiros():
             for video_id in videos:
                 log_callback(f"\n🎬 Gerando introdução para {canal}/{video_id}...")
                 sucesso = gerar_introducao(canal, video_id, log_callback)
+                _registrar_resultado("introducao", canal, video_id, sucesso)
                 if not sucesso:
                     log_callback(f"⚠️ Erro ao gerar introdução para {canal}/{video_id}")
     else:
@@ -174,6 +144,7 @@ def processar_roteiros():
             for video_id in videos:
                 log_callback(f"\n🧾 Gerando conteúdos para {canal}/{video_id}...")
                 sucesso = gerar_conteudos_topicos(canal, video_id, log_callback)
+                _registrar_resultado("conteudos", canal, video_id, sucesso)
                 if not sucesso:
                     log_callback(f"⚠️ Erro ao gerar conteúdos para {canal}/{video_id}")
     else:
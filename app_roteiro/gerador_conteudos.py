@@ -1,18 +1,8 @@
-import os
 import json
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
+from cliente_openai import completar
 from app_roteiro.modulo_idioma import obter_instrucao_idioma
 
-# Carrega API KEY
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("❌ OPENAI_API_KEY não encontrada no .env")
-
-client = OpenAI(api_key=api_key)
-
 def gerar_conteudos_topicos(canal, video_id, log=print):
     log(f"📝 Iniciando geração de conteúdos dos tópicos para {canal}/{video_id}...")
 
@@ -131,13 +121,7 @@ Resumo do Próximo Tópico (para transição emocional natural, se aplicável):
 """
 
         try:
-            resposta = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.6,
-            )
-
-            conteudo_gerado = resposta.choices[0].message.content.strip()
+            conteudo_gerado = completar(prompt, model="gpt-4o", temperature=0.6).strip()
             base_anterior = conteudo_gerado
 
             roteiros_gerados.append({
@@ -1,18 +1,8 @@
-import os
 import json
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
+from cliente_openai import completar
 from app_roteiro.modulo_idioma import obter_instrucao_idioma
 
-# Carregar API_KEY do arquivo .env
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("❌ OPENAI_API_KEY não encontrada no .env")
-
-client = OpenAI(api_key=api_key)
-
 def gerar_introducao(canal, video_id, log=print):
     log(f"🎬 Gerando introdução para {canal}/{video_id}...")
 
@@ -84,13 +74,7 @@ Tópicos do Vídeo:
 
 
     try:
-        resposta = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.8,
-        )
-
-        introducao_gerada = resposta.choices[0].message.content.strip()
+        introducao_gerada = completar(prompt, model="gpt-4o", temperature=0.8).strip()
 
         with open(introducao_path, "w", encoding="utf-8") as f:
             f.write(introducao_gerada)
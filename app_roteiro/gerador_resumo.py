@@ -1,17 +1,6 @@
-import os
 import json
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Carrega a chave da OpenAI do .env
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-
-if not api_key:
-    raise RuntimeError("❌ OPENAI_API_KEY não encontrada no .env")
-
-client = OpenAI(api_key=api_key)
+from cliente_openai import completar
 
 def gerar_resumo(canal, video_id, log=print):
     log(f"🧠 Gerando resumo para {canal}/{video_id}...")
@@ -56,12 +45,7 @@ def gerar_resumo(canal, video_id, log=print):
 
 
     try:
-        resposta = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-        )
-        resumo = resposta.choices[0].message.content.strip()
+        resumo = completar(prompt, model="gpt-4o-mini", temperature=0.7).strip()
 
         with open(resumo_path, "w", encoding="utf-8") as f:
             json.dump({"resumo": resumo}, f, indent=4, ensure_ascii=False)
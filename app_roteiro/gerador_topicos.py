@@ -1,19 +1,9 @@
-import os
 import re
 import json
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
+from cliente_openai import completar
 from app_roteiro.modulo_idioma import obter_instrucao_idioma
 
-# Carregar API_KEY do .env
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("❌ OPENAI_API_KEY não encontrada no .env")
-
-client = OpenAI(api_key=api_key)
-
 def gerar_topicos(canal, video_id, log=print):
     log(f"🗂️ Gerando tópicos para {canal}/{video_id}...")
 
@@ -77,13 +67,7 @@ RESUMO: "Uma descrição detalhada e clara sobre o conteúdo específico do Tóp
 """
 
     try:
-        resposta = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt_final}],
-            temperature=0.4,
-        )
-
-        texto_topicos = resposta.choices[0].message.content.strip()
+        texto_topicos = completar(prompt_final, model="gpt-4o", temperature=0.4).strip()
 
         # Expressão para capturar número, título e resumo
         padrao = r'Topico\s*(\d+):\s*"([^"]+)"\s*RESUMO:\s*"([^"]+)"'
@@ -0,0 +1,98 @@
+# __main__.py
+#
+# VideoForge sem interface gráfica (servidores sem display, cron, systemd):
+#
+#   python -m app_videoforge todos --workers 8
+#   python -m app_videoforge canal MeuCanal
+#   python -m app_videoforge video MeuCanal 001
+#   python -m app_videoforge lote --canal MeuCanal
+#   python -m app_videoforge todos --vigiar --intervalo 300   # fica procurando trabalho novo
+#   python -m app_videoforge todos --fila                     # usa a fila com lease (vf_fila.py)
+#
+# Só o argparse é importado antes de saber o modo; Tk/ttkbootstrap nunca
+# são carregados e o resto vem sob demanda (o lote não carrega o grafo etc.).
+
+import time
+import argparse
+import traceback
+
+INTERVALO_VIGIA = 300   # segundos entre rodadas no modo --vigiar
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(
+        prog="python -m app_videoforge",
+        description="Roda o fluxo do VideoForge (roteiro, áudio...) sem a interface gráfica.",
+    )
+    modos = parser.add_subparsers(dest="modo", required=True)
+
+    video = modos.add_parser("video", help="um vídeo")
+    video.add_argument("canal")
+    video.add_argument("video_id")
+
+    canal = modos.add_parser("canal", help="todos os vídeos válidos de um canal")
+    canal.add_argument("canal")
+
+    todos = modos.add_parser("todos", help="todos os vídeos válidos de todos os canais")
+
+    lote = modos.add_parser("lote", help="resumo/tópicos/introdução pela Batch API")
+    lote.add_argument("--canal", help="só este canal")
+
+    for sub in (video, canal, todos, lote):
+        sub.add_argument("--vigiar", action="store_true",
+                         help="repete a cada --intervalo segundos procurando trabalho novo")
+        sub.add_argument("--intervalo", type=float, default=INTERVALO_VIGIA,
+                         help=f"segundos entre rodadas com --vigiar (padrão {INTERVALO_VIGIA})")
+    for sub in (video, canal, todos):
+        sub.add_argument("--workers", type=int, default=None, help="etapas simultâneas no pool")
+        sub.add_argument("--fila", action="store_true",
+                         help="enfileira e consome pela fila com lease (vários processos/máquinas juntos)")
+    return parser.parse_args()
+
+
+def _rodada(args):
+    """Uma passada completa pelo trabalho pendente do modo escolhido."""
+    canal = getattr(args, "canal", None)
+    if args.modo == "lote":
+        from app_videoforge.vf_lote import executar_lote
+        executar_lote(canais=[canal] if canal else None)
+    elif args.fila:
+        from app_videoforge import vf_fila
+        from app_videoforge.vf_worker import enfileirar_videos, executar_worker
+        if args.modo == "video":
+            from app_videoforge.controller import GRAFO_ETAPAS, videos_habilitados
+            vf_fila.enfileirar(GRAFO_ETAPAS, videos_habilitados([(canal, args.video_id)]))
+        else:
+            enfileirar_videos(canal)
+        executar_worker(args.workers)
+    else:
+        from app_videoforge.controller import iniciar_fluxo_videoforge
+        iniciar_fluxo_videoforge(args.modo, canal=canal, video_id=getattr(args, "video_id", None),
+                                 workers=args.workers)
+
+
+def main():
+    args = _argumentos()
+
+    from db_manager import inicializar_bancos_de_dados
+    inicializar_bancos_de_dados()
+
+    try:
+        while True:
+            if not args.vigiar:
+                _rodada(args)
+                break
+            try:
+                _rodada(args)
+            except Exception as e:
+                # no modo vigia um erro passageiro (rede, OpenAI) não derruba o processo
+                traceback.print_exc()
+                print(f"❌ Rodada falhou: {type(e).__name__}: {e}")
+            print(f"⏳ Próxima rodada em {args.intervalo:.0f}s (Ctrl+C para sair)...")
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        print("⛔ VideoForge interrompido.")
+
+
+if __name__ == "__main__":
+    main()
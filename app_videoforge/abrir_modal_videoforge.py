@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as tb
-import sqlite3
 from pathlib import Path
 import threading
+from db_manager import conectar
 
 
 DB_CHANNELS = Path("data/channels.db")
@@ -12,7 +12,7 @@ DB_VIDEOS = Path("data/videos.db")
 def abrir_modal_videoforge(janela_pai, callback_executar_controller):
     modal = tb.Toplevel(janela_pai)
     modal.title("Executar VideoForge")
-    modal.geometry("500x400")
+    modal.geometry("500x460")
     modal.grab_set()
 
     modo_var = tk.StringVar()
@@ -24,7 +24,7 @@ def abrir_modal_videoforge(janela_pai, callback_executar_controller):
 
     def carregar_canais():
         nonlocal canais
-        with sqlite3.connect(DB_CHANNELS) as conn:
+        with conectar(DB_CHANNELS) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT nome FROM canais")
             canais = [row[0] for row in cursor.fetchall()]
@@ -33,7 +33,7 @@ def abrir_modal_videoforge(janela_pai, callback_executar_controller):
 
     def carregar_videos(event):
         canal_selecionado = canal_var.get()
-        with sqlite3.connect(DB_VIDEOS) as conn:
+        with conectar(DB_VIDEOS) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT video_id FROM videos WHERE canal = ?", (canal_selecionado,))
             resultado = cursor.fetchall()
@@ -62,6 +62,9 @@ def abrir_modal_videoforge(janela_pai, callback_executar_controller):
     # Opção: Todos os canais
     ttk.Radiobutton(frame, text="Rodar todos os canais", variable=modo_var, value="todos").pack(anchor="w", pady=(0, 20))
 
+    # Opção: Lote (Batch API, roteiros de todos os canais de madrugada)
+    ttk.Radiobutton(frame, text="Gerar roteiros em lote (Batch API)", variable=modo_var, value="lote").pack(anchor="w", pady=(0, 20))
+
     # Botão iniciar
     def iniciar():
         modo = modo_var.get()
@@ -90,6 +93,11 @@ def abrir_modal_videoforge(janela_pai, callback_executar_controller):
                 "modo": "todos"
             }).start()
 
+        elif modo == "lote":
+            threading.Thread(target=callback_executar_controller, kwargs={
+                "modo": "lote"
+            }).start()
+
         else:
             messagebox.showerror("Erro", "Selecione uma opção de execução.")
             return
@@ -1,8 +1,13 @@
 import re
-import sqlite3
 import json
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+import cache_llm
+from db_manager import conectar
+from status_etapas import registrar_fluxo, marcar as marcar_etapa
+from app_videoforge.vf_etapas import executar_grafo, CONCLUIDA, AGUARDANDO, FALHOU
 from app_videoforge.vf_roteiro import gerar_resumo, gerar_topicos, gerar_introducao, gerar_conteudos_topicos, baixar_legenda_yt, set_logger as set_roteiro_logger
 from app_videoforge.vf_tts import gerar_audio_piper, gerar_audio_elevenlabs
 
@@ -23,14 +28,56 @@ ESTADOS = {
 }
 STATUS_OK_MAP = {0: "Não feito", 1: "OK", 2: "Ignorado"}
 
-log_callback = print
+# ─── Execução concorrente (grafo de etapas, ver vf_etapas.py) ─────
+# Quantas etapas rodam ao mesmo tempo no pool.
+MAX_WORKERS = 8
+
+# Quantas etapas de cada recurso podem rodar ao mesmo tempo.
+# Etapas presas em I/O (yt-dlp, OpenAI) aguentam bem mais que as pesadas.
+CONCORRENCIA_ETAPAS = {
+    "transcricao": 4,   # yt-dlp
+    "roteiro": 8,       # chamadas OpenAI
+    "audio": 2,         # TTS
+    "video": 2,         # render / indexação de mídias
+}
 
-def set_logger(callback):
-    global log_callback
-    log_callback = callback
-    set_roteiro_logger(log_callback)  
+_contexto = threading.local()
+
+_log_destino = print
+
+def log_callback(msg):
+    """Envia a mensagem ao logger, prefixando com canal/vídeo quando em pool."""
+    prefixo = getattr(_contexto, "prefixo", "")
+    _log_destino(f"{prefixo}{msg}" if prefixo else msg)
 
-def iniciar_fluxo_videoforge(modo, canal=None, video_id=None):
+def set_logger(callback):
+    global _log_destino
+    _log_destino = callback
+    set_roteiro_logger(log_callback)
+
+set_roteiro_logger(log_callback)
+
+def configurar_concorrencia(max_workers=None, **limites_etapas):
+    """
+    Ajusta o tamanho do pool e/ou o limite por etapa.
+    Ex.: configurar_concorrencia(max_workers=10, roteiro=8, video=2)
+    """
+    global MAX_WORKERS
+    if max_workers:
+        MAX_WORKERS = max(1, int(max_workers))
+    for etapa, limite in limites_etapas.items():
+        CONCORRENCIA_ETAPAS[etapa] = max(1, int(limite))
+
+@contextmanager
+def _contexto_video(canal, video_id):
+    """Prefixa os logs da thread atual com canal/vídeo."""
+    _contexto.prefixo = f"[{canal}/{video_id}] "
+    try:
+        yield
+    finally:
+        _contexto.prefixo = ""
+
+def iniciar_fluxo_videoforge(modo, canal=None, video_id=None, workers=None):
     if modo == "video":
         if canal and video_id:
             log_callback(f"\n🚀 Iniciando fluxo para VÍDEO: Canal '{canal}', Vídeo ID '{video_id}'")
@@ -44,8 +91,7 @@ def iniciar_fluxo_videoforge(modo, canal=None, video_id=None):
             if not videos:
                 log_callback("⚠ Nenhum vídeo válido encontrado (todos já postados ou erro).")
                 return
-            for vid_id in videos:
-                processar_video(canal, vid_id)
+            processar_videos_em_paralelo([(canal, vid_id) for vid_id in videos], workers)
         else:
             log_callback("❌ Canal não especificado para modo canal.")
     elif modo == "todos":
@@ -54,29 +100,86 @@ def iniciar_fluxo_videoforge(modo, canal=None, video_id=None):
         if not canais:
             log_callback("⚠ Nenhum canal encontrado no banco de dados.")
             return
+        tarefas = []
         for canal_nome in canais:
-            videos = listar_videos_validos(canal_nome)
-            if not videos:
-                continue
-            for vid_id in videos:
-                processar_video(canal_nome, vid_id)
+            tarefas.extend((canal_nome, vid_id) for vid_id in listar_videos_validos(canal_nome))
+        if not tarefas:
+            log_callback("⚠ Nenhum vídeo válido encontrado (todos já postados ou erro).")
+            return
+        processar_videos_em_paralelo(tarefas, workers)
+    elif modo == "lote":
+        # Batch API: resumo/tópicos/introdução de todos os vídeos pendentes (ou do canal)
+        from app_videoforge.vf_lote import executar_lote
+        log_callback(f"\n🚀 Iniciando modo LOTE para {'CANAL: ' + canal if canal else 'TODOS OS CANAIS'}")
+        executar_lote(canais=[canal] if canal else None)
     else:
-        log_callback("❌ Modo inválido. Use: 'video', 'canal' ou 'todos'.")
+        log_callback("❌ Modo inválido. Use: 'video', 'canal', 'todos' ou 'lote'.")
+
+def videos_habilitados(tarefas):
+    """Filtra os (canal, video_id) com gerar_roteiro ligado nas configs do vídeo."""
+    habilitados = []
+    for canal, vid_id in tarefas:
+        configs = carregar_configs_video(canal, vid_id)
+        if not configs.get("gerar_roteiro", False):
+            log_callback(f"  ⏭ [{canal}/{vid_id}] Roteiro ignorado. ")
+            continue
+        habilitados.append((canal, vid_id))
+    return habilitados
+
+def processar_videos_em_paralelo(tarefas, workers=None):
+    """
+    Roda o GRAFO_ETAPAS para todos os (canal, video_id) de uma vez: qualquer
+    etapa com as dependências prontas entra no pool, respeitando os limites
+    de CONCORRENCIA_ETAPAS. O que já foi feito é derivado do banco/disco.
+    """
+    habilitados = videos_habilitados(tarefas)
+    if not habilitados:
+        return {}
+
+    workers = max(1, int(workers or MAX_WORKERS))
+    log_callback(f"⚙️ Grafo de etapas: {len(habilitados)} vídeo(s), {workers} workers. Limites: {CONCORRENCIA_ETAPAS}")
+
+    situacoes = executar_grafo(
+        GRAFO_ETAPAS, habilitados, CONCORRENCIA_ETAPAS,
+        max_workers=workers, log=log_callback, contexto=_contexto_video,
+        ao_terminar=_registrar_etapa
+    )
+
+    for (canal, vid_id), sit in situacoes.items():
+        falhas = [nome for nome, st in sit.items() if st == FALHOU]
+        aguardando = [nome for nome, st in sit.items() if st == AGUARDANDO]
+        if falhas:
+            log_callback(f"  ⚠️ [{canal}/{vid_id}] Parou na etapa: {', '.join(falhas)}")
+        elif aguardando:
+            log_callback(f"  ⏭ [{canal}/{vid_id}] Aguardando: {', '.join(aguardando)}")
+        elif all(st == CONCLUIDA for st in sit.values()):
+            log_callback(f"  🏁 [{canal}/{vid_id}] Todas as etapas concluídas.")
+
+    if cache_llm.ativo():
+        est = cache_llm.estatisticas()
+        log_callback(f"🗃️ Cache LLM: {est['hits']} hits / {est['misses']} misses "
+                     f"({est['taxa_acerto']:.0%}), {est['entradas']} entradas, {est['tamanho_mb']} MB")
+    return situacoes
+
+def _registrar_etapa(canal, video_id, etapa, situacao):
+    # Só registra: a verdade do VideoForge continua sendo o banco/metadados
+    # (o usuário força regeneração editando-os), a tabela é o histórico/consulta.
+    marcar_etapa(FLUXO_ETAPAS, canal, video_id, etapa, situacao)
 
 def listar_canais():
-    with sqlite3.connect(CHANNELS_DB_PATH) as conn:
+    with conectar(CHANNELS_DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT nome FROM canais")
         return [row[0] for row in cursor.fetchall()]
 
 def listar_videos_validos(canal):
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT video_id FROM videos WHERE canal = ? AND estado != 7", (canal,))
         return [row[0] for row in cursor.fetchall()]
 
 def carregar_configs_video(canal, video_id):
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT configs FROM videos WHERE canal = ? AND video_id = ?", (canal, video_id))
         resultado = cursor.fetchone()
@@ -90,7 +193,7 @@ def carregar_configs_video(canal, video_id):
 def atualizar_estado_video(canal, video_id, estado_codigo):
     if estado_codigo not in ESTADOS:
         return
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE videos SET estado = ? WHERE canal = ? AND video_id = ?",
                        (estado_codigo, canal, video_id))
@@ -98,7 +201,7 @@ def atualizar_estado_video(canal, video_id, estado_codigo):
 
 def marcar_roteiro_concluido(canal: str, video_id: str):
     """Seta roteiro_ok=1 e estado=1 na tabela videos para este vídeo."""
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cur = conn.cursor()
         cur.execute(
             "UPDATE videos SET roteiro_ok = 1, estado = 1 WHERE canal = ? AND video_id = ?",
@@ -108,7 +211,7 @@ def marcar_roteiro_concluido(canal: str, video_id: str):
 
 def obter_status_roteiro(canal: str, video_id: str) -> int:
     """Retorna o valor da coluna roteiro_ok para este vídeo."""
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cur = conn.cursor()
         cur.execute(
             "SELECT roteiro_ok FROM videos WHERE canal = ? AND video_id = ?",
@@ -119,7 +222,7 @@ def obter_status_roteiro(canal: str, video_id: str) -> int:
 
 def obter_status_audio(canal: str, video_id: str) -> int:
     """Retorna o valor de audio_ok no banco (0=pendente,1=OK,2=ignorado)."""
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cur = conn.cursor()
         cur.execute(
             "SELECT audio_ok FROM videos WHERE canal = ? AND video_id = ?",
@@ -128,9 +231,20 @@ def obter_status_audio(canal: str, video_id: str) -> int:
         row = cur.fetchone()
     return row[0] if row else 0
 
+def obter_estado_video(canal: str, video_id: str) -> int:
+    """Retorna o valor da coluna estado para este vídeo."""
+    with conectar(VIDEOS_DB_PATH) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT estado FROM videos WHERE canal = ? AND video_id = ?",
+            (canal, video_id)
+        )
+        row = cur.fetchone()
+    return row[0] if row and row[0] is not None else 0
+
 def marcar_audio_concluido(canal: str, video_id: str):
     """Seta audio_ok=1 e estado=2 na tabela videos."""
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cur = conn.cursor()
         cur.execute(
             "UPDATE videos SET audio_ok = 1, estado = 2 WHERE canal = ? AND video_id = ?",
@@ -140,162 +254,218 @@ def marcar_audio_concluido(canal: str, video_id: str):
 
 def processar_video(canal, video_id):
     log_callback(f"\n📌 Processando Vídeo {video_id} do Canal {canal}...")
-    configs = carregar_configs_video(canal, video_id)
-
-
-    # ─── ROTEIRO ───────────────────────────────────────────
-    if not configs.get("gerar_roteiro", False):
-        log_callback("  ⏭ Roteiro ignorado. ")
-        return
-    
-    if obter_status_roteiro(canal, video_id) == 1:
-        log_callback("  ⏭ Roteiro já finalizado.")
-        
+    processar_videos_em_paralelo([(canal, video_id)])
+
+def etapa_transcricao(canal, video_id) -> bool:
+    """Etapa 1: garante transcript_original.json com transcricao_limpa (yt-dlp)."""
+    control_dir = Path(f"data/{canal}/{video_id}/control")
+    metadados_path = control_dir / "metadados.json"
+    if not metadados_path.exists():
+        log_callback("  ❌ metadados.json não encontrado.")
+        return False
+    link = json.loads(metadados_path.read_text(encoding="utf-8")).get("link")
+    if not link:
+        log_callback("  ❌ Link ausente em metadados.json.")
+        return False
+
+    transcript_path = control_dir / "transcript_original.json"
+    refazendo = False
+    if transcript_path.exists():
+        try:
+            dados = json.loads(transcript_path.read_text(encoding="utf-8"))
+            if dados.get("transcricao_limpa", "").strip():
+                log_callback(f"  ✅ Transcrição já existente em {transcript_path}. Pulando etapa.")
+                return True
+            raise ValueError("transcricao_limpa vazia")
+        except Exception as e:
+            log_callback(f"  ⚠️ Transcript inválido ({e}), refazendo...")
+            refazendo = True
+
+    trans, idi = baixar_legenda_yt(link, ['en','es','pt'], str(control_dir))
+    if not trans or not trans.strip():
+        transcript_path.write_text(
+            json.dumps({"erro":"Falha ao obter transcrição automática.","idioma": idi},
+                    ensure_ascii=False, indent=4),
+            encoding="utf-8"
+        )
+        log_callback(f"  ⚠️ Erro salvo em {transcript_path}")
+        return False
+    transcript_path.write_text(
+        json.dumps({"transcricao_limpa": trans, "idioma": idi},
+                ensure_ascii=False, indent=4),
+        encoding="utf-8"
+    )
+    if refazendo:
+        log_callback(f"  ✅ Transcrição refeita e salva em {transcript_path} (idioma: {idi})")
     else:
-        control_dir = Path(f"data/{canal}/{video_id}/control")
-        metadados_path = control_dir / "metadados.json"
-        if not metadados_path.exists():
-            log_callback("  ❌ metadados.json não encontrado.")
-            return
-        link = json.loads(metadados_path.read_text(encoding="utf-8")).get("link")
-        if not link:
-            log_callback("  ❌ Link ausente em metadados.json.")
-            return
-
-        # ─── Etapa 1: Transcrição ─────────────────────────────────────────
-        transcript_path = control_dir / "transcript_original.json"
-        if transcript_path.exists():
-            try:
-                dados = json.loads(transcript_path.read_text(encoding="utf-8"))
-                if dados.get("transcricao_limpa", "").strip():
-                    log_callback(f"  ✅ Transcrição já existente em {transcript_path}. Pulando etapa.")
-                else:
-                    raise ValueError("transcricao_limpa vazia")
-            except Exception as e:
-                log_callback(f"  ⚠️ Transcript inválido ({e}), refazendo...")
-                trans, idi = baixar_legenda_yt(link, ['en','es','pt'], str(control_dir))
-                if not trans or not trans.strip():
-                    transcript_path.write_text(
-                        json.dumps({"erro":"Falha ao obter transcrição automática.","idioma": idi},
-                                ensure_ascii=False, indent=4),
-                        encoding="utf-8"
-                    )
-                    log_callback(f"  ⚠️ Erro salvo em {transcript_path}")
-                    return
-                transcript_path.write_text(
-                    json.dumps({"transcricao_limpa": trans, "idioma": idi},
-                            ensure_ascii=False, indent=4),
-                    encoding="utf-8"
-                )
-                log_callback(f"  ✅ Transcrição refeita e salva em {transcript_path} (idioma: {idi})")
-        else:
-            trans, idi = baixar_legenda_yt(link, ['en','es','pt'], str(control_dir))
-            if not trans or not trans.strip():
-                transcript_path.write_text(
-                    json.dumps({"erro":"Falha ao obter transcrição automática.","idioma": idi},
-                            ensure_ascii=False, indent=4),
-                    encoding="utf-8"
-                )
-                log_callback(f"  ⚠️ Erro salvo em {transcript_path}")
-                return
-            transcript_path.write_text(
-                json.dumps({"transcricao_limpa": trans, "idioma": idi},
-                        ensure_ascii=False, indent=4),
-                encoding="utf-8"
-            )
-            log_callback(f"  ✅ Transcrição salva em {transcript_path} (idioma: {idi})")
-
-        # ─── Etapa 2: Resumo ──────────────────────────────────────────────
-        meta = json.loads(metadados_path.read_text(encoding="utf-8"))
-        if meta.get("resumo"):
-            log_callback("  ✅ Resumo já existe em metadados.json. Pulando.")
-        else:
-            sucesso = gerar_resumo(canal, video_id)
-            if not sucesso:
-                log_callback(f"  ⚠️ Falha ao gerar resumo.")
-                return
-
-        # ─── Etapa 3: Tópicos ──────────────────────────────────────────────
-
-        # carrega metadados para ver se já tem tópicos
-        meta = json.loads(metadados_path.read_text(encoding="utf-8"))
-        if meta.get("topicos"):
-            log_callback("  ✅ Tópicos já existem em metadados.json. Pulando.")
-        else:
-            sucesso = gerar_topicos(canal, video_id)
-            if not sucesso:
-                log_callback("  ⚠️ Falha ao gerar tópicos.")
-                return
-            log_callback("  ✅ Tópicos salvos em metadados.json")
-
-        # ─── Etapa 4: Introdução ────────────────────────────────────────────
-        if not gerar_introducao(canal, video_id):
-            log_callback("  ⚠️ Falha ao gerar introdução.")
-            return
-
-        # ─── Etapa 5: Conteúdos ────────────────────────────────────────────
-        if not gerar_conteudos_topicos(canal, video_id):
-            log_callback("  ⚠️ Falha ao gerar conteúdos dos tópicos.")
-            return
-
-        # ─── Marcando roteiro como concluído ────────────────────────────────
-        marcar_roteiro_concluido(canal, video_id)
-        log_callback(f"  ✅ Vídeo {video_id} marcado como roteiro OK e estado atualizado para Concluido.")
+        log_callback(f"  ✅ Transcrição salva em {transcript_path} (idioma: {idi})")
+    return True
+
+def _ler_metadados(canal, video_id) -> dict:
+    meta_path = Path(f"data/{canal}/{video_id}/control") / "metadados.json"
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def _transcricao_ok(canal, video_id) -> bool:
+    transcript_path = Path(f"data/{canal}/{video_id}/control") / "transcript_original.json"
+    try:
+        dados = json.loads(transcript_path.read_text(encoding="utf-8"))
+        return bool(dados.get("transcricao_limpa", "").strip())
+    except Exception:
+        return False
+
+def _campo_roteiro_ok(campo):
+    """Etapa do roteiro concluída: roteiro_ok=1 ou campo presente no metadados.json."""
+    def concluida(canal, video_id):
+        return obter_status_roteiro(canal, video_id) == 1 or bool(_ler_metadados(canal, video_id).get(campo))
+    return concluida
+
+def _etapa_gerador(gerador, descricao):
+    def executar(canal, video_id):
+        if not gerador(canal, video_id):
+            log_callback(f"  ⚠️ Falha ao gerar {descricao}.")
+            return False
+        return True
+    return executar
+
+def etapa_marcar_roteiro(canal, video_id) -> bool:
+    marcar_roteiro_concluido(canal, video_id)
+    log_callback(f"  ✅ Vídeo {video_id} marcado como roteiro OK e estado atualizado para Concluido.")
+    return True
+
+def etapa_video(canal, video_id) -> bool:
+    # Só entra aqui se áudio estiver OK (1) ou IGNORADO (2)
+    log_callback("  (Placeholder) ✅ Editando vídeo...")
+    # ─── Demais etapas (Legendas, Metadados, Thumb, etc) ──────────────
 
+    log_callback("  (Placeholder) 🏁 Pronto! Vídeo concluído.")
+    # atualizar_estado_video(canal, video_id, 3)
+    return True
 
-        # ─── ÁUDIO ────────────────────────────────────────────
+def etapa_audio(canal, video_id) -> bool:
+    """Gera (ou ignora) o áudio. Retorna False quando o fluxo deve parar aqui."""
     log_callback("  🎤 Iniciando geração de áudio...")
+    configs = carregar_configs_video(canal, video_id)
     gerar_audio  = configs.get("gerar_audio", False)    # Piper (local)
     audio_manual = configs.get("audio_manual", False)   # ElevenLabs (remoto)
 
     # nenhum dos dois? ignora mas NÃO retorna
     if not gerar_audio and not audio_manual:
         log_callback("  ⏭ Áudio desativado. Marcando como ignorado e seguindo para vídeo.")
-        with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+        with conectar(VIDEOS_DB_PATH) as conn:
             conn.execute(
                 "UPDATE videos SET audio_ok = 2 WHERE canal = ? AND video_id = ?",
                 (canal, video_id)
             )
             conn.commit()
+        return True
+
+    # não podem ser ambos True
+    if gerar_audio and audio_manual:
+        log_callback("  ⚠️ Configuração inválida: gerar_audio e audio_manual ambos True. Abortando.")
+        return False
+
+    status_audio = obter_status_audio(canal, video_id)
+    if status_audio == 1:
+        log_callback("  ⏭ Áudio já OK. Pulando geração.")
+        return True
+
+    # fluxo de Piper vs ElevenLabs
+    if gerar_audio:
+        log_callback("  🎙️ Gerando áudio local com Piper...")
+        sucesso_audio = gerar_audio_piper(canal, video_id)
+        check_tts = False  # como Piper ainda não implementado, não marca
     else:
-        # não podem ser ambos True
-        if gerar_audio and audio_manual:
-            log_callback("  ⚠️ Configuração inválida: gerar_audio e audio_manual ambos True. Abortando.")
-            return
-
-        status_audio = obter_status_audio(canal, video_id)
-        if status_audio == 1:
-            log_callback("  ⏭ Áudio já OK. Pulando geração.")
-        else:
-            # fluxo de Piper vs ElevenLabs
-            if gerar_audio:
-                log_callback("  🎙️ Gerando áudio local com Piper...")
-                sucesso_audio = gerar_audio_piper(canal, video_id)
-                check_tts = False  # como Piper ainda não implementado, não marca
-            else:
-                log_callback("  🎙️ Gerando áudio remoto com ElevenLabs...")
-                sucesso_audio = gerar_audio_elevenlabs(canal, video_id)
-                # só consideramos “feito” se houver .mp3 na pasta tts/
-                tts_dir = Path("data")/canal/video_id/"control"/"tts"
-                mp3s = list(tts_dir.glob("*.mp3")) if tts_dir.exists() else []
-                check_tts = bool(mp3s)
-
-            if not sucesso_audio:
-                log_callback("  ⚠️ Falha ao gerar áudio. Abortando.")
-                return
-
-            if check_tts:
-                marcar_audio_concluido(canal, video_id)
-                log_callback("  ✅ Áudio OK (audio_ok=1, estado=2).")
-            else:
-                log_callback("  ⏭ Áudio não concluído — aguardando arquivos .mp3 em tts/.")
-
-
-
-    # ─── VÍDEO ─────────────────────────────────────────────
-    # Só entra aqui se áudio estiver OK (1) ou IGNORADO (2)
-    log_callback("  (Placeholder) ✅ Editando vídeo...")
-    # ─── Demais etapas (Áudio, Vídeo, etc) ──────────────────────────
+        log_callback("  🎙️ Gerando áudio remoto com ElevenLabs...")
+        sucesso_audio = gerar_audio_elevenlabs(canal, video_id)
+        # só consideramos “feito” se houver .mp3 na pasta tts/
+        tts_dir = Path("data")/canal/video_id/"control"/"tts"
+        mp3s = list(tts_dir.glob("*.mp3")) if tts_dir.exists() else []
+        check_tts = bool(mp3s)
+
+    if not sucesso_audio:
+        log_callback("  ⚠️ Falha ao gerar áudio. Abortando.")
+        return False
+
+    if check_tts:
+        marcar_audio_concluido(canal, video_id)
+        log_callback("  ✅ Áudio OK (audio_ok=1, estado=2).")
+    else:
+        log_callback("  ⏭ Áudio não concluído — aguardando arquivos .mp3 em tts/.")
+    return True
+
+
+# ─── Grafo declarativo das etapas de um vídeo ──────────────────────
+# "concluida" só olha o que já está no banco (roteiro_ok/audio_ok/estado)
+# ou no disco, então nada que já foi feito é recalculado.
+GRAFO_ETAPAS = {
+    "transcricao": {
+        "depende": [],
+        "recurso": "transcricao",
+        "entradas": ["metadados.json:link"],
+        "saidas": ["transcript_original.json:transcricao_limpa"],
+        "concluida": lambda c, v: obter_status_roteiro(c, v) == 1 or _transcricao_ok(c, v),
+        "executar": etapa_transcricao,
+    },
+    "resumo": {
+        "depende": ["transcricao"],
+        "recurso": "roteiro",
+        "entradas": ["transcript_original.json:transcricao_limpa"],
+        "saidas": ["metadados.json:resumo"],
+        "concluida": _campo_roteiro_ok("resumo"),
+        "executar": _etapa_gerador(gerar_resumo, "resumo"),
+    },
+    "topicos": {
+        "depende": ["transcricao"],
+        "recurso": "roteiro",
+        "entradas": ["transcript_original.json:transcricao_limpa", "prompts.json:prompt_topicos"],
+        "saidas": ["metadados.json:topicos"],
+        "concluida": _campo_roteiro_ok("topicos"),
+        "executar": _etapa_gerador(gerar_topicos, "tópicos"),
+    },
+    "introducao": {
+        "depende": ["topicos"],
+        "recurso": "roteiro",
+        "entradas": ["metadados.json:topicos"],
+        "saidas": ["metadados.json:introducao"],
+        "concluida": _campo_roteiro_ok("introducao"),
+        "executar": _etapa_gerador(gerar_introducao, "introdução"),
+    },
+    "conteudos": {
+        "depende": ["resumo", "topicos", "introducao"],
+        "recurso": "roteiro",
+        "entradas": ["metadados.json:resumo", "metadados.json:topicos", "metadados.json:introducao", "prompts.json:prompt_roteiro"],
+        "saidas": ["metadados.json:conteudos"],
+        "concluida": _campo_roteiro_ok("conteudos"),
+        "executar": _etapa_gerador(gerar_conteudos_topicos, "conteúdos dos tópicos"),
+    },
+    "roteiro": {
+        "depende": ["conteudos"],
+        "recurso": "roteiro",
+        "entradas": ["metadados.json:conteudos"],
+        "saidas": ["videos.roteiro_ok = 1", "videos.estado = 1"],
+        "concluida": lambda c, v: obter_status_roteiro(c, v) == 1,
+        "executar": etapa_marcar_roteiro,
+    },
+    "audio": {
+        "depende": ["roteiro"],
+        "recurso": "audio",
+        "entradas": ["metadados.json:conteudos", "tts/*.mp3"],
+        "saidas": ["videos.audio_ok in (1, 2)"],
+        "concluida": lambda c, v: obter_status_audio(c, v) in (1, 2),
+        "executar": etapa_audio,
+    },
+    "video": {
+        "depende": ["audio"],
+        "recurso": "video",
+        "entradas": ["videos.audio_ok in (1, 2)"],
+        "saidas": ["videos.estado >= 3"],
+        "concluida": lambda c, v: obter_estado_video(c, v) >= 3,
+        "executar": etapa_video,
+    },
+}
 
-    log_callback("  (Placeholder) 🏁 Pronto! Vídeo concluído.")
-    # atualizar_estado_video(canal, video_id, 1)
+FLUXO_ETAPAS = "videoforge"
+registrar_fluxo(FLUXO_ETAPAS, {nome: etapa["depende"] for nome, etapa in GRAFO_ETAPAS.items()})
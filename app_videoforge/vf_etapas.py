@@ -0,0 +1,154 @@
+# vf_etapas.py
+#
+# Agendador genérico de etapas em grafo (DAG).
+#
+# Cada etapa é declarada num dicionário:
+#
+#   GRAFO = {
+#       "resumo": {
+#           "depende":   ["transcricao"],          # etapas que precisam estar concluídas
+#           "recurso":   "roteiro",                # chave do limite de concorrência
+#           "entradas":  ["transcript_original.json:transcricao_limpa"],
+#           "saidas":    ["metadados.json:resumo"],
+#           "concluida": lambda canal, video_id: bool,   # lê disco/DB, nunca recalcula
+#           "executar":  lambda canal, video_id: bool,
+#       },
+#       ...
+#   }
+#
+# O agendador roda, para TODOS os vídeos ao mesmo tempo, qualquer etapa cujas
+# dependências já estejam concluídas, respeitando o limite de cada recurso.
+# Assim a introdução do vídeo A pode rodar enquanto o vídeo B baixa legenda.
+# Dentro de um mesmo vídeo só roda UMA etapa por vez, porque várias delas
+# escrevem no mesmo metadados.json.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+
+# Situação de cada (vídeo, etapa) durante a execução
+PENDENTE = "pendente"
+RODANDO = "rodando"
+CONCLUIDA = "concluida"
+AGUARDANDO = "aguardando"   # rodou sem erro, mas a saída ainda não existe (ex.: mp3 manual)
+FALHOU = "falhou"
+
+
+def ordem_topologica(grafo):
+    """Retorna os nomes das etapas em ordem topológica (erro se houver ciclo)."""
+    ordem, visitando, visitadas = [], set(), set()
+
+    def visitar(nome):
+        if nome in visitadas:
+            return
+        if nome in visitando:
+            raise ValueError(f"Ciclo no grafo de etapas envolvendo '{nome}'")
+        if nome not in grafo:
+            raise ValueError(f"Etapa desconhecida: '{nome}'")
+        visitando.add(nome)
+        for dep in grafo[nome].get("depende", []):
+            visitar(dep)
+        visitando.discard(nome)
+        visitadas.add(nome)
+        ordem.append(nome)
+
+    for nome in grafo:
+        visitar(nome)
+    return ordem
+
+
+def situacao_inicial(grafo, canal, video_id, ordem=None):
+    """Deriva do disco/DB o que já está pronto para um vídeo."""
+    ordem = ordem or ordem_topologica(grafo)
+    return {
+        nome: CONCLUIDA if grafo[nome]["concluida"](canal, video_id) else PENDENTE
+        for nome in ordem
+    }
+
+
+def executar_grafo(grafo, videos, limites, max_workers=8, log=print, contexto=None, ao_terminar=None):
+    """
+    Executa o grafo para a lista de (canal, video_id).
+
+    limites:  {recurso: máximo de etapas simultâneas}
+    contexto: fábrica opcional (canal, video_id) -> context manager, usada
+              em volta de cada etapa (ex.: prefixar logs com o vídeo).
+    ao_terminar: callback opcional (canal, video_id, etapa, situacao) chamado
+              quando cada etapa termina (ex.: gravar em status_etapas).
+
+    Retorna {(canal, video_id): {etapa: situacao}}.
+    """
+    ordem = ordem_topologica(grafo)
+    situacoes = {}
+    for canal, video_id in videos:
+        try:
+            situacoes[(canal, video_id)] = situacao_inicial(grafo, canal, video_id, ordem)
+        except Exception as e:
+            log(f"❌ Erro ao ler situação de {canal}/{video_id}: {e}")
+
+    em_uso = {}
+    ocupados = set()   # vídeos com alguma etapa rodando
+    lock = threading.Lock()
+
+    def _pronta(sit, nome):
+        if sit[nome] != PENDENTE:
+            return False
+        return all(sit[dep] == CONCLUIDA for dep in grafo[nome].get("depende", []))
+
+    def _proximas():
+        """Escolhe as etapas prontas que cabem nos limites agora."""
+        escolhidas = []
+        for chave, sit in situacoes.items():
+            if chave in ocupados:
+                continue
+            for nome in ordem:
+                if not _pronta(sit, nome):
+                    continue
+                recurso = grafo[nome].get("recurso", nome)
+                if em_uso.get(recurso, 0) >= limites.get(recurso, 1):
+                    continue
+                em_uso[recurso] = em_uso.get(recurso, 0) + 1
+                sit[nome] = RODANDO
+                ocupados.add(chave)
+                escolhidas.append((chave, nome))
+                break
+        return escolhidas
+
+    def _rodar(chave, nome):
+        canal, video_id = chave
+        ctx = contexto(canal, video_id) if contexto else nullcontext()
+        with ctx:
+            ok = grafo[nome]["executar"](canal, video_id)
+            if not ok:
+                return FALHOU
+            return CONCLUIDA if grafo[nome]["concluida"](canal, video_id) else AGUARDANDO
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="vf_etapa") as pool:
+        futuros = {}
+        while True:
+            with lock:
+                for chave, nome in _proximas():
+                    futuros[pool.submit(_rodar, chave, nome)] = (chave, nome)
+            if not futuros:
+                break
+
+            feitos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            with lock:
+                for futuro in feitos:
+                    chave, nome = futuros.pop(futuro)
+                    try:
+                        resultado = futuro.result()
+                    except Exception as e:
+                        log(f"❌ Erro inesperado na etapa '{nome}' de {chave[0]}/{chave[1]}: {e}")
+                        resultado = FALHOU
+                    situacoes[chave][nome] = resultado
+                    if ao_terminar:
+                        try:
+                            ao_terminar(chave[0], chave[1], nome, resultado)
+                        except Exception as e:
+                            log(f"⚠️ Erro ao registrar a etapa '{nome}' de {chave[0]}/{chave[1]}: {e}")
+                    recurso = grafo[nome].get("recurso", nome)
+                    em_uso[recurso] -= 1
+                    ocupados.discard(chave)
+
+    return situacoes
@@ -0,0 +1,194 @@
+# vf_fila.py
+#
+# Fila de trabalho persistente do VideoForge (tabela "fila" do videos.db,
+# migração 4 do db_manager), para rodar o grafo de etapas em vários
+# processos — ou várias máquinas que compartilham a pasta data/.
+#
+# - Cada linha é uma (vídeo, etapa). Só entram na fila como "pendente" as
+#   etapas com as dependências concluídas; ao concluir uma etapa as seguintes
+#   são liberadas (mesma ideia do status_etapas.py).
+# - Um worker reserva uma etapa com lease: dono + expira_em, dentro de um
+#   BEGIN IMMEDIATE, então dois workers nunca pegam a mesma linha. Enquanto
+#   roda, o worker renova o lease; se o processo morrer, o lease vence e a
+#   etapa volta para "pendente" (até MAX_TENTATIVAS reservas).
+# - Os limites de CONCORRENCIA_ETAPAS valem para a fila inteira (todas as
+#   máquinas), e cada vídeo continua rodando uma etapa por vez.
+#
+# Em várias máquinas: o videos.db precisa estar num sistema de arquivos com
+# lock funcionando, e os relógios sincronizados (os leases usam time.time()).
+
+import os
+import time
+import socket
+from contextlib import contextmanager
+
+from db_manager import conectar, VIDEOS_DB_PATH
+from app_videoforge.vf_etapas import ordem_topologica, situacao_inicial
+
+PENDENTE = "pendente"
+RODANDO = "rodando"
+CONCLUIDA = "concluida"
+AGUARDANDO = "aguardando"
+FALHOU = "falhou"
+
+LEASE_SEGUNDOS = 300
+MAX_TENTATIVAS = 3
+
+
+def identificador():
+    """Dono padrão dos leases deste processo."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@contextmanager
+def _transacao():
+    """Transação com o lock de escrita já no início (reserva atômica)."""
+    conn = conectar(VIDEOS_DB_PATH)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _liberar(conn, canal, video_id, etapa, agora, recurso, reiniciar=False):
+    """Põe a etapa como pendente, sem mexer numa que esteja rodando ou concluída."""
+    situacoes = (FALHOU, AGUARDANDO) if not reiniciar else (FALHOU, AGUARDANDO, CONCLUIDA, PENDENTE)
+    conn.execute(
+        "INSERT INTO fila (canal, video_id, etapa, recurso, situacao, atualizado_em) VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(canal, video_id, etapa) DO UPDATE SET situacao = excluded.situacao, "
+        "dono = NULL, expira_em = NULL, tentativas = 0, erro = NULL, atualizado_em = excluded.atualizado_em "
+        f"WHERE fila.situacao IN ({', '.join('?' * len(situacoes))})",
+        (canal, video_id, etapa, recurso, PENDENTE, agora, *situacoes)
+    )
+
+
+def enfileirar(grafo, videos, log=print):
+    """
+    Sincroniza a fila com o disco/DB para a lista de (canal, video_id):
+    o que já está pronto vira "concluida", o que tem as dependências prontas
+    vira "pendente" (falhas e esperas anteriores ganham nova chance) e etapas
+    rodando em algum worker não são tocadas. Retorna quantas ficaram pendentes.
+    """
+    ordem = ordem_topologica(grafo)
+    agora = time.time()
+    pendentes = 0
+    for canal, video_id in videos:
+        try:
+            sit = situacao_inicial(grafo, canal, video_id, ordem)
+        except Exception as e:
+            log(f"❌ Erro ao ler situação de {canal}/{video_id}: {e}")
+            continue
+        with _transacao() as conn:
+            for nome in ordem:
+                recurso = grafo[nome].get("recurso", nome)
+                if sit[nome] == CONCLUIDA:
+                    conn.execute(
+                        "INSERT INTO fila (canal, video_id, etapa, recurso, situacao, atualizado_em) VALUES (?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(canal, video_id, etapa) DO UPDATE SET situacao = excluded.situacao, "
+                        "dono = NULL, expira_em = NULL, erro = NULL, atualizado_em = excluded.atualizado_em "
+                        "WHERE fila.situacao != ?",
+                        (canal, video_id, nome, recurso, CONCLUIDA, agora, RODANDO)
+                    )
+                elif all(sit[dep] == CONCLUIDA for dep in grafo[nome].get("depende", [])):
+                    # reiniciar: o disco diz que falta (ex.: usuário apagou para refazer)
+                    _liberar(conn, canal, video_id, nome, agora, recurso, reiniciar=True)
+                    pendentes += 1
+                else:
+                    conn.execute(
+                        "DELETE FROM fila WHERE canal = ? AND video_id = ? AND etapa = ? AND situacao != ?",
+                        (canal, video_id, nome, RODANDO)
+                    )
+    return pendentes
+
+
+def _recuperar_expiradas(conn, agora):
+    """Leases vencidos (worker caiu ou travou) voltam para a fila ou falham de vez."""
+    conn.execute(
+        "UPDATE fila SET situacao = CASE WHEN tentativas >= ? THEN ? ELSE ? END, "
+        "dono = NULL, expira_em = NULL, erro = 'lease expirado (' || dono || ')', atualizado_em = ? "
+        "WHERE situacao = ? AND expira_em < ?",
+        (MAX_TENTATIVAS, FALHOU, PENDENTE, agora, RODANDO, agora)
+    )
+
+
+def reservar(dono, limites):
+    """
+    Reserva a próxima etapa pendente que caiba nos limites por recurso.
+    Retorna (canal, video_id, etapa) ou None se não houver nada agora.
+    """
+    agora = time.time()
+    with _transacao() as conn:
+        _recuperar_expiradas(conn, agora)
+        em_uso = dict(conn.execute(
+            "SELECT recurso, COUNT(*) FROM fila WHERE situacao = ? GROUP BY recurso", (RODANDO,)
+        ).fetchall())
+        candidatas = conn.execute(
+            "SELECT canal, video_id, etapa, recurso FROM fila AS f WHERE situacao = ? "
+            "AND NOT EXISTS (SELECT 1 FROM fila AS o WHERE o.canal = f.canal AND o.video_id = f.video_id "
+            "AND o.situacao = ?) ORDER BY atualizado_em, canal, video_id",
+            (PENDENTE, RODANDO)
+        )
+        for canal, video_id, etapa, recurso in candidatas:
+            if em_uso.get(recurso, 0) >= limites.get(recurso, 1):
+                continue
+            conn.execute(
+                "UPDATE fila SET situacao = ?, dono = ?, expira_em = ?, tentativas = tentativas + 1, "
+                "atualizado_em = ? WHERE canal = ? AND video_id = ? AND etapa = ?",
+                (RODANDO, dono, agora + LEASE_SEGUNDOS, agora, canal, video_id, etapa)
+            )
+            return canal, video_id, etapa
+    return None
+
+
+def renovar(dono):
+    """Estende os leases de tudo que `dono` está rodando. Retorna quantos."""
+    with conectar(VIDEOS_DB_PATH) as conn:
+        cur = conn.execute(
+            "UPDATE fila SET expira_em = ? WHERE dono = ? AND situacao = ?",
+            (time.time() + LEASE_SEGUNDOS, dono, RODANDO)
+        )
+        return cur.rowcount
+
+
+def finalizar(grafo, dono, canal, video_id, etapa, situacao, erro=None):
+    """
+    Grava o resultado de uma etapa reservada por `dono` e, se concluída,
+    libera as etapas seguintes. Retorna False se o lease já tinha sido
+    perdido (outro worker pode ter reservado a etapa de novo).
+    """
+    agora = time.time()
+    with _transacao() as conn:
+        cur = conn.execute(
+            "UPDATE fila SET situacao = ?, dono = NULL, expira_em = NULL, erro = ?, atualizado_em = ? "
+            "WHERE canal = ? AND video_id = ? AND etapa = ? AND dono = ? AND situacao = ?",
+            (situacao, erro, agora, canal, video_id, etapa, dono, RODANDO)
+        )
+        if cur.rowcount == 0:
+            return False
+        if situacao == CONCLUIDA:
+            concluidas = {
+                row[0] for row in conn.execute(
+                    "SELECT etapa FROM fila WHERE canal = ? AND video_id = ? AND situacao = ?",
+                    (canal, video_id, CONCLUIDA)
+                )
+            }
+            for nome, cfg in grafo.items():
+                deps = cfg.get("depende", [])
+                if etapa in deps and all(d in concluidas for d in deps):
+                    _liberar(conn, canal, video_id, nome, agora, cfg.get("recurso", nome))
+    return True
+
+
+def contar(dono=None):
+    """{situacao: quantidade} da fila inteira, ou só do que `dono` está rodando."""
+    with conectar(VIDEOS_DB_PATH) as conn:
+        if dono is None:
+            linhas = conn.execute("SELECT situacao, COUNT(*) FROM fila GROUP BY situacao").fetchall()
+        else:
+            linhas = conn.execute(
+                "SELECT situacao, COUNT(*) FROM fila WHERE dono = ? GROUP BY situacao", (dono,)
+            ).fetchall()
+    return dict(linhas)
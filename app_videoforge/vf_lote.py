@@ -0,0 +1,349 @@
+# vf_lote.py
+#
+# Modo lote (backfill de madrugada): junta TODOS os prompts pendentes de
+# resumo, tópicos e introdução dos vídeos válidos (os mesmos que o modo
+# "todos" processaria) num arquivo JSONL, envia para um endpoint de lote
+# (Batch API da OpenAI: mais barato, sem disputar RPM/TPM com o modo normal,
+# resposta em até 24h), acompanha até terminar e grava cada resposta no
+# metadados.json do vídeo.
+#
+# - Rodadas: a introdução depende dos tópicos, então quando uma rodada traz
+#   tópicos novos a próxima já pede as introduções.
+# - O estado de cada lote enviado fica em data/lotes/{nome}.json; se o
+#   processo cair, executar_lote() volta a acompanhar os lotes pendentes.
+# - As respostas também vão para o cache_llm com a mesma chave do modo
+#   normal, então rodar o VideoForge depois não paga o mesmo prompt de novo.
+# - Transcrições longas (resumo em partes) ficam para o modo normal.
+# - BackendArquivos troca a OpenAI por uma pasta (entrada/ → saida/),
+#   respondida por servir_pasta_local(). Ver teste_lote_local.py.
+
+import os
+import json
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import cache_llm
+from cliente_openai import completar_varios, estimar_tokens
+from app_videoforge.controller import (
+    listar_canais, listar_videos_validos, carregar_configs_video,
+    obter_status_roteiro, log_callback
+)
+from app_videoforge.vf_roteiro import (
+    _carregar_idioma_canal, _carregar_prompt_topicos, _prompt_resumo, _prompt_topicos,
+    _prompt_introducao, _extrair_topicos, _atualizar_meta, obter_instrucao_idioma,
+    RESUMO_LIMITE_TOKENS
+)
+
+DATA_DIR = Path("data")           # relativo à pasta atual, como os bancos do controller
+LOTES_DIR = DATA_DIR / "lotes"
+LOTE_MAX_PEDIDOS = 50000      # limite de pedidos por arquivo da Batch API
+INTERVALO_CONSULTA = 60       # segundos entre consultas ao endpoint
+MAX_RODADAS = 3               # resumo+tópicos → introdução → sobras
+
+
+# ------------------------------------------------------------------
+# Coleta dos pedidos pendentes
+# ------------------------------------------------------------------
+
+def _ler_json(caminho: Path) -> dict:
+    try:
+        dados = json.loads(caminho.read_text(encoding="utf-8"))
+        return dados if isinstance(dados, dict) else {}
+    except Exception:
+        return {}
+
+def _pedido(canal, video_id, etapa, model, temperature, prompt):
+    return {
+        "canal": canal, "video_id": video_id, "etapa": etapa,
+        "model": model, "temperature": temperature,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+def _pedidos_do_video(canal, video_id):
+    """Mesmos prompts que gerar_resumo / gerar_topicos / gerar_introducao montariam."""
+    control_dir = DATA_DIR / canal / video_id / "control"
+    meta = _ler_json(control_dir / "metadados.json")
+    if not meta:
+        return []
+    txt = _ler_json(control_dir / "transcript_original.json").get("transcricao_limpa", "")
+    cfg = carregar_configs_video(canal, video_id)
+    pedidos = []
+
+    if txt.strip() and not meta.get("resumo") and estimar_tokens(txt) <= RESUMO_LIMITE_TOKENS:
+        pedidos.append(_pedido(canal, video_id, "resumo", "gpt-4o-mini", 0.7, _prompt_resumo(txt)))
+
+    if txt.strip() and not meta.get("topicos"):
+        prompt_top = _carregar_prompt_topicos(canal, cfg)
+        if prompt_top:
+            inst_id = obter_instrucao_idioma((cfg.get("idioma", "") or "").lower())
+            pedidos.append(_pedido(canal, video_id, "topicos", "gpt-4o", 0.4,
+                                   _prompt_topicos(prompt_top, txt, inst_id)))
+
+    topicos = meta.get("topicos")
+    if topicos and isinstance(topicos, list) and not meta.get("introducao"):
+        lista_markdown = "".join(f"- {t['titulo']}: {t['resumo']}\n" for t in topicos)
+        idioma = (cfg.get("idioma") or "").lower() or _carregar_idioma_canal(canal).lower() or "pt"
+        pedidos.append(_pedido(canal, video_id, "introducao", "gpt-4o", 0.8,
+                               _prompt_introducao(canal, lista_markdown, obter_instrucao_idioma(idioma))))
+    return pedidos
+
+def coletar_pedidos(canais=None):
+    """Pedidos pendentes de todos os vídeos válidos (ou só dos canais informados)."""
+    pedidos = []
+    for canal in canais or listar_canais():
+        for video_id in listar_videos_validos(canal):
+            if not carregar_configs_video(canal, video_id).get("gerar_roteiro", False):
+                continue
+            if obter_status_roteiro(canal, video_id) == 1:
+                continue
+            pedidos.extend(_pedidos_do_video(canal, video_id))
+    return pedidos
+
+
+# ------------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------------
+
+class BackendOpenAI:
+    """Batch API da OpenAI (/v1/batches)."""
+
+    nome = "openai"
+
+    def __init__(self):
+        self._cliente = None
+
+    def _obter_cliente(self):
+        if self._cliente is None:
+            from openai import OpenAI
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise RuntimeError("❌ OPENAI_API_KEY não encontrada no .env")
+            self._cliente = OpenAI(api_key=api_key, base_url=os.getenv("OPENAI_BASE_URL") or None)
+        return self._cliente
+
+    def enviar(self, arquivo: Path) -> str:
+        cliente = self._obter_cliente()
+        with open(arquivo, "rb") as f:
+            enviado = cliente.files.create(file=f, purpose="batch")
+        lote = cliente.batches.create(
+            input_file_id=enviado.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        return lote.id
+
+    def consultar(self, lote_id: str):
+        """Retorna (terminou, situacao)."""
+        lote = self._obter_cliente().batches.retrieve(lote_id)
+        return lote.status in ("completed", "failed", "expired", "cancelled"), lote.status
+
+    def baixar(self, lote_id: str) -> list:
+        cliente = self._obter_cliente()
+        lote = cliente.batches.retrieve(lote_id)
+        linhas = []
+        # lote expirado/cancelado ainda traz o que ficou pronto
+        for arquivo_id in (lote.output_file_id, lote.error_file_id):
+            if arquivo_id:
+                linhas.extend(cliente.files.content(arquivo_id).text.splitlines())
+        return [json.loads(l) for l in linhas if l.strip()]
+
+
+class BackendArquivos:
+    """
+    Substituto local da Batch API: o lote é copiado para {pasta}/entrada e
+    está pronto quando aparece {pasta}/saida com o mesmo nome (mesmo formato
+    de saída da OpenAI). Quem responde é servir_pasta_local().
+    """
+
+    nome = "arquivos"
+
+    def __init__(self, pasta=LOTES_DIR / "local"):
+        self.pasta = Path(pasta)
+
+    def enviar(self, arquivo: Path) -> str:
+        lote_id = f"local-{uuid.uuid4().hex[:12]}"
+        entrada = self.pasta / "entrada" / f"{lote_id}.jsonl"
+        entrada.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entrada.with_suffix(".tmp")
+        tmp.write_bytes(Path(arquivo).read_bytes())
+        os.replace(tmp, entrada)
+        return lote_id
+
+    def consultar(self, lote_id: str):
+        if (self.pasta / "saida" / f"{lote_id}.jsonl").exists():
+            return True, "completed"
+        return False, "in_progress"
+
+    def baixar(self, lote_id: str) -> list:
+        texto = (self.pasta / "saida" / f"{lote_id}.jsonl").read_text(encoding="utf-8")
+        return [json.loads(l) for l in texto.splitlines() if l.strip()]
+
+
+def _responder_com_cliente(corpos):
+    """Resposta padrão do servidor local: o próprio cliente_openai (modo normal)."""
+    return completar_varios([
+        {"model": c["model"], "temperature": c.get("temperature"), "messages": c["messages"]}
+        for c in corpos
+    ])
+
+def servir_pasta_local(pasta=LOTES_DIR / "local", responder=_responder_com_cliente,
+                       intervalo=1.0, parar=None):
+    """
+    Servidor de lotes baseado em arquivos: para cada {pasta}/entrada/*.jsonl
+    sem saída, chama responder(lista de bodies) -> lista de textos (ou
+    exceções) e grava {pasta}/saida/{id}.jsonl. Roda até parar() ser True.
+    """
+    pasta = Path(pasta)
+    (pasta / "entrada").mkdir(parents=True, exist_ok=True)
+    (pasta / "saida").mkdir(parents=True, exist_ok=True)
+    while not (parar and parar()):
+        for entrada in sorted((pasta / "entrada").glob("*.jsonl")):
+            saida = pasta / "saida" / entrada.name
+            if saida.exists():
+                continue
+            linhas = [json.loads(l) for l in entrada.read_text(encoding="utf-8").splitlines() if l.strip()]
+            respostas = responder([l["body"] for l in linhas])
+            tmp = saida.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for linha, resposta in zip(linhas, respostas):
+                    f.write(json.dumps(_linha_saida(linha, resposta), ensure_ascii=False) + "\n")
+            os.replace(tmp, saida)
+        time.sleep(intervalo)
+
+def _linha_saida(linha, resposta):
+    if isinstance(resposta, Exception):
+        return {"id": f"req-{uuid.uuid4().hex[:12]}", "custom_id": linha["custom_id"], "response": None,
+                "error": {"code": type(resposta).__name__, "message": str(resposta)}}
+    return {
+        "id": f"req-{uuid.uuid4().hex[:12]}",
+        "custom_id": linha["custom_id"],
+        "response": {"status_code": 200, "body": {
+            "object": "chat.completion",
+            "model": linha["body"]["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": resposta}}],
+        }},
+        "error": None,
+    }
+
+
+# ------------------------------------------------------------------
+# Envio, acompanhamento e aplicação das respostas
+# ------------------------------------------------------------------
+
+def _salvar_estado(estado):
+    caminho = LOTES_DIR / f"{estado['nome']}.json"
+    tmp = caminho.with_suffix(".tmp")
+    tmp.write_text(json.dumps(estado, ensure_ascii=False, indent=4), encoding="utf-8")
+    os.replace(tmp, caminho)
+
+def enviar_lotes(backend, pedidos):
+    """Grava os JSONL (até LOTE_MAX_PEDIDOS cada), envia e salva o estado. Retorna os estados."""
+    LOTES_DIR.mkdir(parents=True, exist_ok=True)
+    estados = []
+    for inicio in range(0, len(pedidos), LOTE_MAX_PEDIDOS):
+        parte = pedidos[inicio:inicio + LOTE_MAX_PEDIDOS]
+        nome = datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        arquivo = LOTES_DIR / f"{nome}.jsonl"
+        registro = {}
+        with open(arquivo, "w", encoding="utf-8") as f:
+            for n, p in enumerate(parte):
+                custom_id = f"{p['etapa']}-{n:06d}"
+                corpo = {"model": p["model"], "temperature": p["temperature"], "messages": p["messages"]}
+                f.write(json.dumps({"custom_id": custom_id, "method": "POST",
+                                    "url": "/v1/chat/completions", "body": corpo}, ensure_ascii=False) + "\n")
+                registro[custom_id] = {
+                    "canal": p["canal"], "video_id": p["video_id"], "etapa": p["etapa"], "model": p["model"],
+                    "chave": cache_llm.gerar_chave(p["model"], p["temperature"], p["messages"]),
+                }
+        lote_id = backend.enviar(arquivo)
+        estado = {
+            "nome": nome, "backend": backend.nome, "lote_id": lote_id, "situacao": "enviado",
+            "criado_em": datetime.now().isoformat(), "arquivo": str(arquivo), "pedidos": registro,
+        }
+        _salvar_estado(estado)
+        log_callback(f"📤 Lote {nome} enviado ({len(parte)} pedidos, id {lote_id}).")
+        estados.append(estado)
+    return estados
+
+def _lotes_pendentes(backend):
+    if not LOTES_DIR.exists():
+        return []
+    estados = [_ler_json(c) for c in sorted(LOTES_DIR.glob("*.json"))]
+    return [e for e in estados if e.get("situacao") == "enviado" and e.get("backend") == backend.nome]
+
+def _aplicar_resposta(info, texto):
+    meta_path = DATA_DIR / info["canal"] / info["video_id"] / "control" / "metadados.json"
+    if not meta_path.exists():
+        return False
+    etapa = info["etapa"]
+    if etapa == "topicos":
+        valor = _extrair_topicos(texto)
+        if not valor:
+            return False
+    else:
+        valor = texto.strip()
+    _atualizar_meta(meta_path, **{etapa: valor})
+    return True
+
+def acompanhar_lotes(backend, estados, intervalo=INTERVALO_CONSULTA):
+    """Espera os lotes terminarem e grava as respostas. Retorna quantas foram aplicadas."""
+    aplicadas = 0
+    pendentes = list(estados)
+    while pendentes:
+        for estado in list(pendentes):
+            terminou, situacao = backend.consultar(estado["lote_id"])
+            if not terminou:
+                continue
+            pendentes.remove(estado)
+            ok = falhas = 0
+            for linha in backend.baixar(estado["lote_id"]):
+                info = estado["pedidos"].get(linha.get("custom_id"))
+                resposta = linha.get("response") or {}
+                if not info or linha.get("error") or resposta.get("status_code") != 200:
+                    falhas += 1
+                    continue
+                texto = resposta["body"]["choices"][0]["message"]["content"] or ""
+                if texto and cache_llm.ativo():
+                    cache_llm.guardar(info["chave"], info["model"], texto)
+                if texto and _aplicar_resposta(info, texto):
+                    ok += 1
+                else:
+                    falhas += 1
+            estado["situacao"] = "aplicado"
+            estado["resultado"] = {"status": situacao, "ok": ok, "falhas": falhas}
+            _salvar_estado(estado)
+            aplicadas += ok
+            log_callback(f"📥 Lote {estado['nome']} ({situacao}): {ok} respostas gravadas, {falhas} falhas.")
+        if pendentes:
+            time.sleep(intervalo)
+    return aplicadas
+
+def executar_lote(backend=None, canais=None, intervalo=INTERVALO_CONSULTA, max_rodadas=MAX_RODADAS):
+    """
+    Fluxo completo do modo lote. Falhas e transcrições longas ficam para o
+    modo normal (o grafo de etapas só faz o que ainda faltar).
+    """
+    backend = backend or BackendOpenAI()
+
+    pendentes = _lotes_pendentes(backend)
+    if pendentes:
+        log_callback(f"⏳ Retomando {len(pendentes)} lote(s) enviados anteriormente...")
+        acompanhar_lotes(backend, pendentes, intervalo)
+
+    for rodada in range(1, max_rodadas + 1):
+        pedidos = coletar_pedidos(canais)
+        if not pedidos:
+            log_callback("✅ Nenhum prompt pendente para o modo lote.")
+            break
+        contagem = {}
+        for p in pedidos:
+            contagem[p["etapa"]] = contagem.get(p["etapa"], 0) + 1
+        log_callback(f"\n📦 Rodada {rodada}: {len(pedidos)} pedidos {contagem}")
+        aplicadas = acompanhar_lotes(backend, enviar_lotes(backend, pedidos), intervalo)
+        if not aplicadas:
+            log_callback("⚠️ Nenhuma resposta aproveitada nesta rodada; parando.")
+            break
@@ -2,15 +2,15 @@
 import re
 import os
 import json, re
-import sqlite3
+import zlib
+import hashlib
 from pathlib import Path
+from db_manager import conectar
 
-# Importante para o baixar_legenda_yt
-import yt_dlp
-
-# Importante para usar o chat gpt
-from dotenv import load_dotenv
-from openai import OpenAI
+# Importante para usar o chat gpt (cliente compartilhado com rate limit)
+from cliente_openai import (
+    completar, completar_varios, completar_stream, estimar_tokens, StreamInterrompido
+)
 
 
 # ------------------------------------------------------------------
@@ -22,7 +22,7 @@ CHANNELS_DB_PATH = Path("data/channels.db")
 
 def _carregar_configs(canal: str, video_id: str) -> dict:
     """Busca configs JSON diretamente na tabela videos."""
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cur = conn.cursor()
         cur.execute(
             "SELECT configs FROM videos WHERE canal = ? AND video_id = ?",
@@ -42,7 +42,7 @@ def _carregar_idioma_canal(canal: str) -> str:
     Retorna o código do idioma (ex: 'pt', 'es', 'en', ...), ou '' se não encontrar.
     """
     try:
-        with sqlite3.connect(CHANNELS_DB_PATH) as conn:
+        with conectar(CHANNELS_DB_PATH) as conn:
             cur = conn.cursor()
             cur.execute("SELECT idioma FROM canais WHERE nome = ?", (canal,))
             row = cur.fetchone()
@@ -55,14 +55,8 @@ def obter_instrucao_idioma(codigo_idioma):
     return IDIOMAS_SUPORTADOS.get(codigo_idioma.lower(), {}).get("instrucao", "")
 
 # ------------------------------------------------------------------
-# 2) Inicialização do cliente OpenAI
+# 2) Logger (o cliente OpenAI vive em cliente_openai.py)
 # ------------------------------------------------------------------
-load_dotenv()
-_api_key = os.getenv("OPENAI_API_KEY")
-if not _api_key:
-    raise RuntimeError("❌ OPENAI_API_KEY não encontrada no .env")
-_client = OpenAI(api_key=_api_key)
-
 log_callback = print  # Você pode sobrescrever via set_logger, se quiser
 
 def set_logger(callback):
@@ -80,6 +74,9 @@ def baixar_legenda_yt(url, prioridade_idiomas=None, pasta_destino="."):
     Retorna: (transcricao_texto, idioma_utilizado) ou (None, None).
     Remove todos os .vtt depois de usar.
     """
+    # importado aqui: o yt_dlp é pesado e só esta etapa usa
+    import yt_dlp
+
     Path(pasta_destino).mkdir(parents=True, exist_ok=True)
     if prioridade_idiomas is None:
         prioridade_idiomas = ['en', 'es', 'pt']
@@ -157,15 +154,255 @@ def baixar_legenda_yt(url, prioridade_idiomas=None, pasta_destino="."):
     return transcricao, idioma
 
 
+# ------------------------------------------------------------------
+# Progresso parcial (respostas em stream)
+# ------------------------------------------------------------------
+
+# Quantas vezes retomar um stream que caiu antes de desistir nesta execução.
+# O progresso fica salvo no metadados.json ("resumo_parcial" /
+# "conteudos_parciais"), então a próxima execução continua de onde parou.
+STREAM_RETOMADAS = 3
+
+_PEDIDO_CONTINUACAO = (
+    "A resposta acima foi interrompida. Continue exatamente de onde ela parou, "
+    "no mesmo formato, sem repetir nada do que já foi escrito e sem comentários."
+)
+
+def _assinatura(texto: str) -> str:
+    """Identifica o pedido original; progresso salvo de outro pedido é descartado."""
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+def _gravar_meta(meta_path: Path, meta: dict):
+    """Grava o metadados.json de forma atômica (um crash no meio não corrompe o arquivo)."""
+    tmp = meta_path.with_name(meta_path.name + ".tmp")
+    tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=4), encoding="utf-8")
+    os.replace(tmp, meta_path)
+
+def _salvar_progresso(meta_path: Path, **campos):
+    """_atualizar_meta para progresso parcial: se falhar (arquivo preso por outro processo), só avisa."""
+    try:
+        _atualizar_meta(meta_path, **campos)
+    except OSError as e:
+        log_callback(f"  ⚠️ Progresso parcial não salvo em {meta_path.name}: {e}")
+
+def _atualizar_meta(meta_path: Path, **campos) -> dict:
+    """Relê o metadados.json, aplica os campos (None remove a chave) e grava."""
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    for chave, valor in campos.items():
+        if valor is None:
+            meta.pop(chave, None)
+        else:
+            meta[chave] = valor
+    _gravar_meta(meta_path, meta)
+    return meta
+
+
 # ------------------------------------------------------------------
 # 4) Gerar resumo e injetar em metadados.json
 # ------------------------------------------------------------------
 
-def gerar_resumo(canal: str, video_id: str) -> bool:
+# Acima disso a transcrição é resumida em partes (map-reduce)
+RESUMO_LIMITE_TOKENS = 12000
+# Tamanho dos trechos: o corte cai entre MIN e MAX, num ponto definido pelo
+# próprio texto (hash das palavras), então editar um trecho não desloca os
+# cortes dos outros e os resumos parciais continuam batendo no cache_llm.
+# Os limites viram contagens fixas de palavras (RESUMO_TOKENS_POR_PALAVRA é
+# constante, não medido no texto) e o contexto do trecho anterior fica fora
+# da chave do cache: só o próprio trecho decide se o resumo parcial é refeito.
+RESUMO_TRECHO_MIN_TOKENS = 2000
+RESUMO_TRECHO_MAX_TOKENS = 4000
+RESUMO_CORTE_DIVISOR = 64          # ~1 corte possível a cada 64 palavras
+RESUMO_SOBREPOSICAO_TOKENS = 200   # contexto repetido do trecho anterior
+RESUMO_TOKENS_POR_PALAVRA = 1.4    # média do o200k em português
+
+_INSTRUCOES_RESUMO = (
+    "⚙️ **Instruções específicas:**\n"
+    "1. Leia todo o conteúdo cuidadosamente.\n"
+    "2. Identifique e liste os principais tópicos abordados, com subtítulos claros se necessário.\n"
+    "3. Para cada tópico, explique o que foi dito com detalhes, destacando as ideias principais, exemplos utilizados, dados mencionados ou histórias relatadas.\n"
+    "4. Se houver momentos de opinião, crítica, humor, instrução ou ensinamento, destaque-os separadamente.\n"
+    "5. Use linguagem clara, profissional e fluída, como se estivesse explicando o conteúdo a um leitor que precisa entender tudo sem ver o vídeo.\n"
+    "6. Mantenha a organização lógica e sequencial do vídeo, respeitando a ordem dos acontecimentos.\n\n"
+)
+
+def _prompt_resumo(txt: str) -> str:
+    return (
+        "Você é um assistente especialista em análise de conteúdo de vídeos do YouTube, com foco em compreensão profunda, segmentação de tópicos e extração de ideias centrais. "
+        "Abaixo está a transcrição completa de um vídeo. Sua tarefa é gerar um resumo avançado e estruturado, como se fosse uma apresentação escrita para um briefing editorial.\n\n"
+        
+        + _INSTRUCOES_RESUMO +
+        
+        f"🎙️ **Transcrição original do vídeo:**\n{txt}\n\n"
+        "✍️ **Gere agora o resumo completo e detalhado conforme solicitado acima:**"
+    )
+
+def _prompt_resumo_trecho(contexto: str, trecho: str) -> str:
+    # Sem "trecho X de N" no texto: assim o prompt (e a chave do cache)
+    # só muda se o conteúdo do trecho mudar.
+    prompt = (
+        "Você é um assistente especialista em análise de conteúdo de vídeos do YouTube. "
+        "Abaixo está UM TRECHO da transcrição de um vídeo longo. Resuma somente este trecho, "
+        "de forma detalhada e em ordem, preservando ideias principais, exemplos, dados, histórias, "
+        "opiniões e ensinamentos. Não invente nada que não esteja no trecho e não escreva introdução nem conclusão.\n\n"
+    )
+    if contexto:
+        prompt += f"📎 **Final do trecho anterior (apenas contexto, não resuma):**\n{contexto}\n\n"
+    prompt += f"🎙️ **Trecho da transcrição:**\n{trecho}\n\n✍️ **Resumo detalhado do trecho:**"
+    return prompt
+
+def _prompt_resumo_reduzir(partes: list) -> str:
+    blocos = "\n\n".join(f"--- Parte {i:02d} ---\n{p}" for i, p in enumerate(partes, 1))
+    return (
+        "Você é um assistente especialista em análise de conteúdo de vídeos do YouTube, com foco em compreensão profunda, segmentação de tópicos e extração de ideias centrais. "
+        "Abaixo estão resumos parciais, em ordem, de partes consecutivas de um vídeo longo. Sua tarefa é uni-los num único resumo avançado e estruturado, "
+        "como se fosse uma apresentação escrita para um briefing editorial, sem repetir o que aparece em duas partes seguidas.\n\n"
+        
+        + _INSTRUCOES_RESUMO +
+        
+        f"🧩 **Resumos parciais do vídeo:**\n{blocos}\n\n"
+        "✍️ **Gere agora o resumo completo e detalhado conforme solicitado acima:**"
+    )
+
+def dividir_transcricao(txt: str) -> list:
+    """
+    Divide a transcrição em trechos de ~RESUMO_TRECHO_MIN..MAX tokens (em
+    palavras, pelo fator fixo RESUMO_TOKENS_POR_PALAVRA), cortando onde o
+    hash das 3 últimas palavras for múltiplo de RESUMO_CORTE_DIVISOR.
+    Retorna [(contexto_anterior, trecho), ...].
+    """
+    palavras = txt.split()
+    if not palavras:
+        return []
+    minimo = int(RESUMO_TRECHO_MIN_TOKENS / RESUMO_TOKENS_POR_PALAVRA)
+    maximo = int(RESUMO_TRECHO_MAX_TOKENS / RESUMO_TOKENS_POR_PALAVRA)
+    sobreposicao = int(RESUMO_SOBREPOSICAO_TOKENS / RESUMO_TOKENS_POR_PALAVRA)
+
+    trechos, inicio = [], 0
+    for i in range(len(palavras)):
+        tamanho = i + 1 - inicio
+        if tamanho < minimo:
+            continue
+        janela = " ".join(palavras[max(0, i - 2):i + 1]).lower()
+        if tamanho >= maximo or zlib.crc32(janela.encode("utf-8")) % RESUMO_CORTE_DIVISOR == 0:
+            trechos.append((inicio, i + 1))
+            inicio = i + 1
+    if inicio < len(palavras):
+        # sobra pequena junta no último trecho
+        if trechos and len(palavras) - inicio < minimo // 2:
+            trechos[-1] = (trechos[-1][0], len(palavras))
+        else:
+            trechos.append((inicio, len(palavras)))
+
+    return [
+        (" ".join(palavras[max(0, a - sobreposicao):a]), " ".join(palavras[a:b]))
+        for a, b in trechos
+    ]
+
+def _resumir_em_partes(txt: str, regenerar: bool = False) -> list:
+    """
+    Map: resume os trechos em paralelo. Reduce: junta em níveis até os
+    resumos parciais caberem num único prompt (_prompt_resumo_reduzir).
+    """
+    trechos = dividir_transcricao(txt)
+    log_callback(f"  🧩 Transcrição longa: resumindo {len(trechos)} trechos em paralelo...")
+    respostas = completar_varios([
+        {"prompt": _prompt_resumo_trecho(ctx, trecho), "model": "gpt-4o-mini",
+         "temperature": 0.3, "regenerar": regenerar,
+         # a chave é só do trecho: editar o fim do anterior não refaz este
+         "chave_cache": _prompt_resumo_trecho("", trecho)}
+        for ctx, trecho in trechos
+    ])
+    erros = [r for r in respostas if isinstance(r, Exception)]
+    if erros:
+        raise RuntimeError(f"{len(erros)} trecho(s) falharam: {erros[0]}")
+    partes = [r.strip() for r in respostas]
+
+    # se nem os resumos parciais cabem juntos, reduz em grupos até caber
+    while len(partes) > 1 and estimar_tokens("\n\n".join(partes)) > RESUMO_LIMITE_TOKENS:
+        grupos, atual, tokens_atual = [], [], 0
+        for p in partes:
+            t = estimar_tokens(p)
+            if atual and tokens_atual + t > RESUMO_LIMITE_TOKENS:
+                grupos.append(atual)
+                atual, tokens_atual = [], 0
+            atual.append(p)
+            tokens_atual += t
+        grupos.append(atual)
+        if len(grupos) == len(partes):
+            break
+        log_callback(f"  🧩 Reduzindo {len(partes)} resumos parciais em {len(grupos)} grupos...")
+        respostas = completar_varios([
+            {"prompt": _prompt_resumo_reduzir(g), "model": "gpt-4o-mini",
+             "temperature": 0.3, "regenerar": regenerar}
+            for g in grupos
+        ])
+        erros = [r for r in respostas if isinstance(r, Exception)]
+        if erros:
+            raise RuntimeError(f"{len(erros)} grupo(s) falharam: {erros[0]}")
+        partes = [r.strip() for r in respostas]
+
+    return partes
+
+def _resumo_em_stream(prompt: str, meta_path: Path, regenerar: bool = False) -> str:
+    """
+    Chamada final do resumo em stream. Cada parágrafo completo vai para
+    "resumo_parcial" no metadados.json; se a conexão cair, pede só a
+    continuação do que faltou (nesta execução ou na próxima).
+    """
+    assinatura = _assinatura(prompt)
+    salvo = json.loads(meta_path.read_text(encoding="utf-8")).get("resumo_parcial") or {}
+    parcial = "" if regenerar or salvo.get("assinatura") != assinatura else salvo.get("texto", "")
+
+    for _ in range(STREAM_RETOMADAS + 1):
+        base = parcial
+        if base:
+            log_callback(f"  ↩️ Retomando resumo após {len(base)} caracteres já recebidos...")
+            kwargs = {"messages": [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": base},
+                {"role": "user", "content": _PEDIDO_CONTINUACAO},
+            ]}
+        else:
+            kwargs = {"prompt": prompt}
+
+        # parágrafos completos desta tentativa e a linha que ainda está chegando
+        completos, linha = [], ""
+
+        def ao_receber(pedaco):
+            nonlocal parcial, linha
+            linha += pedaco
+            if "\n" not in pedaco:
+                return
+            corte = linha.rfind("\n") + 1
+            completos.append(linha[:corte])
+            linha = linha[corte:]
+            # o texto inteiro só é montado aqui, no ponto de gravação
+            texto = base + "".join(completos)
+            if len(texto) > len(parcial):
+                parcial = texto
+                _salvar_progresso(meta_path, resumo_parcial={"assinatura": assinatura, "texto": parcial})
+
+        try:
+            resto = completar_stream(model="gpt-4o-mini", temperature=0.7, regenerar=regenerar,
+                                     ao_receber=ao_receber, **kwargs)
+        except StreamInterrompido as e:
+            log_callback(f"  ⚠️ {e}")
+            continue
+
+        _atualizar_meta(meta_path, resumo_parcial=None)
+        return (base + resto).strip()
+
+    raise RuntimeError(f"stream caiu {STREAM_RETOMADAS + 1} vezes; progresso salvo em resumo_parcial")
+
+def gerar_resumo(canal: str, video_id: str, regenerar: bool = False, em_partes: bool = None,
+                 streaming: bool = True) -> bool:
     """
     Gera um resumo a partir de data/{canal}/{video_id}/control/transcript_original.json
     e injeta esse resumo dentro de data/{canal}/{video_id}/control/metadados.json
     na chave "resumo". Retorna True se sucesso.
+    regenerar=True ignora o cache de respostas (cache_llm).
+    em_partes=None decide pelo tamanho (RESUMO_LIMITE_TOKENS); True/False força o modo.
+    streaming=True salva o resumo em andamento e retoma se a conexão cair.
     """
     cp = Path("data") / canal / video_id / "control"
     transcript = cp / "transcript_original.json"
@@ -185,37 +422,24 @@ def gerar_resumo(canal: str, video_id: str) -> bool:
         log_callback("  ⚠️ Transcrição vazia.")
         return False
 
-    prompt = (
-        "Você é um assistente especialista em análise de conteúdo de vídeos do YouTube, com foco em compreensão profunda, segmentação de tópicos e extração de ideias centrais. "
-        "Abaixo está a transcrição completa de um vídeo. Sua tarefa é gerar um resumo avançado e estruturado, como se fosse uma apresentação escrita para um briefing editorial.\n\n"
-        
-        "⚙️ **Instruções específicas:**\n"
-        "1. Leia todo o conteúdo cuidadosamente.\n"
-        "2. Identifique e liste os principais tópicos abordados, com subtítulos claros se necessário.\n"
-        "3. Para cada tópico, explique o que foi dito com detalhes, destacando as ideias principais, exemplos utilizados, dados mencionados ou histórias relatadas.\n"
-        "4. Se houver momentos de opinião, crítica, humor, instrução ou ensinamento, destaque-os separadamente.\n"
-        "5. Use linguagem clara, profissional e fluída, como se estivesse explicando o conteúdo a um leitor que precisa entender tudo sem ver o vídeo.\n"
-        "6. Mantenha a organização lógica e sequencial do vídeo, respeitando a ordem dos acontecimentos.\n\n"
-        
-        f"🎙️ **Transcrição original do vídeo:**\n{txt}\n\n"
-        "✍️ **Gere agora o resumo completo e detalhado conforme solicitado acima:**"
-    )
+    if em_partes is None:
+        em_partes = estimar_tokens(txt) > RESUMO_LIMITE_TOKENS
 
     try:
-        resp = _client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role":"user","content":prompt}],
-            temperature=0.7
-        )
-        resumo_text = resp.choices[0].message.content.strip()
+        if em_partes:
+            prompt_final = _prompt_resumo_reduzir(_resumir_em_partes(txt, regenerar=regenerar))
+        else:
+            prompt_final = _prompt_resumo(txt)
+
+        if streaming:
+            resumo_text = _resumo_em_stream(prompt_final, meta_path, regenerar=regenerar)
+        else:
+            resumo_text = completar(prompt_final, model="gpt-4o-mini", temperature=0.7, regenerar=regenerar).strip()
 
         # agora abrimos o metadados.json, injetamos o resumo e salvamos
         meta = json.loads(meta_path.read_text(encoding="utf-8"))
         meta["resumo"] = resumo_text
-        meta_path.write_text(
-            json.dumps(meta, ensure_ascii=False, indent=4),
-            encoding="utf-8"
-        )
+        _gravar_meta(meta_path, meta)
 
         log_callback(f"  ✅ Resumo salvo em {meta_path}")
         return True
@@ -228,44 +452,8 @@ def gerar_resumo(canal: str, video_id: str) -> bool:
 # ------------------------------------------------------------------
 # 5) Gerar tópicos 
 # ------------------------------------------------------------------
-def gerar_topicos(canal: str, video_id: str) -> bool:
-    control_dir    = Path("data") / canal / video_id / "control"
-    metadados_path = control_dir / "metadados.json"
-    transcript_p    = control_dir / "transcript_original.json"
-
-    # 1) já gerado?
-    meta = json.loads(metadados_path.read_text(encoding="utf-8"))
-    if meta.get("topicos"):
-        log_callback("  ✅ Tópicos já existem em metadados.json. Pulando.")
-        return True
-
-    # 2) transcript ok?
-    if not transcript_p.exists():
-        log_callback("  ⚠️ Transcrição não encontrada. Não foi possível gerar tópicos.")
-        return False
-    dados = json.loads(transcript_p.read_text(encoding="utf-8"))
-    txt   = dados.get("transcricao_limpa", "") if isinstance(dados, dict) else ""
-    if not txt.strip():
-        log_callback("  ⚠️ Transcrição vazia. Não foi possível gerar tópicos.")
-        return False
-
-    # 3) carrega prompt_topicos (DB ou prompts.json)
-    cfg        = _carregar_configs(canal, video_id)
-    prompt_top = cfg.get("prompt_topicos", "").strip()
-    if not prompt_top:
-        prompts_file = Path("data") / canal / "prompts.json"
-        if prompts_file.exists():
-            j = json.loads(prompts_file.read_text(encoding="utf-8"))
-            prompt_top = j.get("prompt_topicos", "").strip()
-    if not prompt_top:
-        log_callback("  ⚠️ prompt_topicos não definido. Não foi possível gerar tópicos.")
-        return False
-
-    # 4) monta prompt final
-    idioma  = (cfg.get("idioma", "") or "").lower()
-    inst_id = obter_instrucao_idioma(idioma)
-
-    prompt_final = f"""{prompt_top}
+def _prompt_topicos(prompt_top: str, txt: str, inst_id: str) -> str:
+    return f"""{prompt_top}
 
 Transcrição para referência:
 {txt}
@@ -295,25 +483,66 @@ RESUMO: "Descrição clara e detalhada do que esse tópico aborda."
 … (Continue exatamente nesse formato até completar o número exato de tópicos solicitados)
 """
 
-    # 5) chama OpenAI e extrai via regex
-    resp = _client.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role":"user","content":prompt_final}],
-        temperature=0.4
-    )
-    out = resp.choices[0].message.content.strip()
+def _carregar_prompt_topicos(canal: str, cfg: dict) -> str:
+    """prompt_topicos das configs do vídeo, senão de data/{canal}/prompts.json."""
+    prompt_top = cfg.get("prompt_topicos", "").strip()
+    if not prompt_top:
+        prompts_file = Path("data") / canal / "prompts.json"
+        if prompts_file.exists():
+            j = json.loads(prompts_file.read_text(encoding="utf-8"))
+            prompt_top = j.get("prompt_topicos", "").strip()
+    return prompt_top
 
+def _extrair_topicos(out: str) -> list:
     pad   = r'[Tt][oó]pico\s*(\d+):\s*"([^"]+)"\s*RESUMO:\s*"([^"]+)"'
     found = re.findall(pad, out, re.IGNORECASE)
-    if not found:
-        log_callback("  ⚠️ Nenhum tópico detectado pela regex.")
-        return False
-
-    lista = [
+    return [
         {"numero": int(n), "titulo": t.strip(), "resumo": r.strip()}
         for n, t, r in found
     ]
 
+def gerar_topicos(canal: str, video_id: str, regenerar: bool = False) -> bool:
+    control_dir    = Path("data") / canal / video_id / "control"
+    metadados_path = control_dir / "metadados.json"
+    transcript_p    = control_dir / "transcript_original.json"
+
+    # 1) já gerado?
+    meta = json.loads(metadados_path.read_text(encoding="utf-8"))
+    if meta.get("topicos"):
+        log_callback("  ✅ Tópicos já existem em metadados.json. Pulando.")
+        return True
+
+    # 2) transcript ok?
+    if not transcript_p.exists():
+        log_callback("  ⚠️ Transcrição não encontrada. Não foi possível gerar tópicos.")
+        return False
+    dados = json.loads(transcript_p.read_text(encoding="utf-8"))
+    txt   = dados.get("transcricao_limpa", "") if isinstance(dados, dict) else ""
+    if not txt.strip():
+        log_callback("  ⚠️ Transcrição vazia. Não foi possível gerar tópicos.")
+        return False
+
+    # 3) carrega prompt_topicos (DB ou prompts.json)
+    cfg        = _carregar_configs(canal, video_id)
+    prompt_top = _carregar_prompt_topicos(canal, cfg)
+    if not prompt_top:
+        log_callback("  ⚠️ prompt_topicos não definido. Não foi possível gerar tópicos.")
+        return False
+
+    # 4) monta prompt final
+    idioma  = (cfg.get("idioma", "") or "").lower()
+    inst_id = obter_instrucao_idioma(idioma)
+
+    prompt_final = _prompt_topicos(prompt_top, txt, inst_id)
+
+    # 5) chama OpenAI e extrai via regex
+    out = completar(prompt_final, model="gpt-4o", temperature=0.4, regenerar=regenerar).strip()
+
+    lista = _extrair_topicos(out)
+    if not lista:
+        log_callback("  ⚠️ Nenhum tópico detectado pela regex.")
+        return False
+
     # 6) injeta em metadados.json
     meta["topicos"] = lista
     metadados_path.write_text(
@@ -326,7 +555,40 @@ RESUMO: "Descrição clara e detalhada do que esse tópico aborda."
 # ------------------------------------------------------------------
 # 6) Gerar introdução e injetar em metadados.json
 # ------------------------------------------------------------------
-def gerar_introducao(canal: str, video_id: str) -> bool:
+def _prompt_introducao(canal: str, lista_markdown: str, inst_id: str) -> str:
+    return f"""
+Você é um especialista em criação de introduções altamente persuasivas e emocionalmente impactantes para vídeos de YouTube. Seu trabalho é capturar imediatamente a atenção do público e gerar um forte desejo de continuar assistindo, usando frases que toquem nas dores reais, nos desejos ocultos e nas promessas transformadoras que o vídeo pode entregar.
+
+Sua missão é criar uma introdução curta (máximo 150 palavras) para o canal "{canal}", baseada nos tópicos abaixo, respeitando as diretrizes obrigatórias:
+
+⚡ Diretrizes obrigatórias:
+- A primeira frase deve **impactar diretamente o emocional ou o racional do espectador em menos de 5 segundos**, com uma dor, desejo ou pergunta instigante.
+- A introdução deve criar uma **conexão real com o público**, fazendo com que ele se sinta compreendido em sua dor, ansiedade, dúvida ou busca pessoal.
+- Em seguida, apresente **uma promessa concreta**, uma transformação que será abordada no vídeo — **sem soar como técnica de marketing**, mas com **autoridade natural** e tom de revelação importante.
+- Finalize com uma **frase fluida e emocional**, sem dar fechamento ou comandos explícitos — apenas mantendo a tensão emocional viva, como um gancho natural que conduz ao próximo conteúdo.
+
+📌 Linguagem:
+- Escreva com frases fortes, curtas, emocionalmente vívidas e específicas.
+- Fale com **clareza**, **urgência emocional**, **sem abstrações**, **sem metáforas místicas** e **sem floreios poéticos genéricos**.
+- Parece uma conversa sincera com alguém que realmente precisa ouvir isso — e **não** uma abertura formal de vídeo.
+
+🚫 Proibições obrigatórias:
+- **NÃO** use frases como: “Neste vídeo você verá…”, “Hoje falaremos sobre…”, “Em um rincón do universo…”, “Prepare-se para…”, “Acompanhe até o final…”.
+- **NÃO** mencione técnicas, métodos, sistemas, estratégias, marketing, nem qualquer termo metalinguístico.
+- **NÃO** escreva de forma genérica, mística, vaga, motivacional de autoajuda ou fantasiosa.
+- **NÃO** finalize o texto com frases de encerramento. A introdução deve ser como um “gancho emocional” que leva direto para o primeiro tópico do vídeo.
+
+Use os tópicos abaixo como referência **sem copiá-los literalmente**, para construir uma introdução intensa e altamente persuasiva:
+
+📋 **Tópicos do Vídeo (não copie literalmente, use como base):**
+{lista_markdown}
+
+{inst_id}
+
+📝 Crie agora a introdução: curta, impactante, emocionalmente envolvente, com promessa clara, sem encerramento explícito e com um gancho natural que leve ao primeiro conteúdo.
+"""
+
+def gerar_introducao(canal: str, video_id: str, regenerar: bool = False) -> bool:
     """
     Gera uma introdução curta e impactante a partir dos tópicos em metadados.json
     e injeta esse texto na chave "introducao" dentro de data/{canal}/{video_id}/control/metadados.json.
@@ -360,46 +622,11 @@ def gerar_introducao(canal: str, video_id: str) -> bool:
     inst_id       = obter_instrucao_idioma(idioma)
 
     # 4) monta o prompt
-    prompt = f"""
-Você é um especialista em criação de introduções altamente persuasivas e emocionalmente impactantes para vídeos de YouTube. Seu trabalho é capturar imediatamente a atenção do público e gerar um forte desejo de continuar assistindo, usando frases que toquem nas dores reais, nos desejos ocultos e nas promessas transformadoras que o vídeo pode entregar.
-
-Sua missão é criar uma introdução curta (máximo 150 palavras) para o canal "{canal}", baseada nos tópicos abaixo, respeitando as diretrizes obrigatórias:
-
-⚡ Diretrizes obrigatórias:
-- A primeira frase deve **impactar diretamente o emocional ou o racional do espectador em menos de 5 segundos**, com uma dor, desejo ou pergunta instigante.
-- A introdução deve criar uma **conexão real com o público**, fazendo com que ele se sinta compreendido em sua dor, ansiedade, dúvida ou busca pessoal.
-- Em seguida, apresente **uma promessa concreta**, uma transformação que será abordada no vídeo — **sem soar como técnica de marketing**, mas com **autoridade natural** e tom de revelação importante.
-- Finalize com uma **frase fluida e emocional**, sem dar fechamento ou comandos explícitos — apenas mantendo a tensão emocional viva, como um gancho natural que conduz ao próximo conteúdo.
-
-📌 Linguagem:
-- Escreva com frases fortes, curtas, emocionalmente vívidas e específicas.
-- Fale com **clareza**, **urgência emocional**, **sem abstrações**, **sem metáforas místicas** e **sem floreios poéticos genéricos**.
-- Parece uma conversa sincera com alguém que realmente precisa ouvir isso — e **não** uma abertura formal de vídeo.
-
-🚫 Proibições obrigatórias:
-- **NÃO** use frases como: “Neste vídeo você verá…”, “Hoje falaremos sobre…”, “Em um rincón do universo…”, “Prepare-se para…”, “Acompanhe até o final…”.
-- **NÃO** mencione técnicas, métodos, sistemas, estratégias, marketing, nem qualquer termo metalinguístico.
-- **NÃO** escreva de forma genérica, mística, vaga, motivacional de autoajuda ou fantasiosa.
-- **NÃO** finalize o texto com frases de encerramento. A introdução deve ser como um “gancho emocional” que leva direto para o primeiro tópico do vídeo.
-
-Use os tópicos abaixo como referência **sem copiá-los literalmente**, para construir uma introdução intensa e altamente persuasiva:
-
-📋 **Tópicos do Vídeo (não copie literalmente, use como base):**
-{lista_markdown}
-
-{inst_id}
-
-📝 Crie agora a introdução: curta, impactante, emocionalmente envolvente, com promessa clara, sem encerramento explícito e com um gancho natural que leve ao primeiro conteúdo.
-"""
+    prompt = _prompt_introducao(canal, lista_markdown, inst_id)
 
     # 5) chama a API
     try:
-        resp = _client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.8,
-        )
-        introducao = resp.choices[0].message.content.strip()
+        introducao = completar(prompt, model="gpt-4o", temperature=0.8, regenerar=regenerar).strip()
 
         # 6) injeta e salva
         meta["introducao"] = introducao
@@ -420,10 +647,201 @@ Use os tópicos abaixo como referência **sem copiá-los literalmente**, para co
 # ------------------------------------------------------------------
 # 6) Gerar conteúdos dos tópicos e injetar em metadados.json
 # ------------------------------------------------------------------
-def gerar_conteudos_topicos(canal: str, video_id: str) -> bool:
+
+# Blocos "Tópico N: título" + conteúdo na resposta do modo "bloco"
+_PADRAO_BLOCO_TOPICO = re.compile(
+    r'''(?m)                       # modo multilinha
+    ^\s*                           # início da linha, espaços
+    (?:[Tt][óo]pico)\s*(\d+)[\s:\-–]+   # “Tópico N:” ou “Tópico N-”
+    (.+?)\r?\n                     # título até quebra de linha
+    ([\s\S]*?)(?=                  # bloco até
+        ^\s*(?:[Tt][óo]pico)\s*\d+ # próximo tópico
+        |\Z                        # ou fim do texto
+    )''', re.IGNORECASE|re.VERBOSE
+)
+
+# Modos de gerar_conteudos_topicos
+#   "bloco"    → uma única chamada com todos os tópicos (padrão)
+#   "paralelo" → uma chamada por tópico, todas ao mesmo tempo, com o mesmo
+#                prefixo (idioma + prompt_roteiro + resumo + introdução +
+#                lista de tópicos) para aproveitar o cache de prompt da OpenAI.
+#                Ligado pelo switch "conteudos_paralelos" das configs; o switch
+#                "costurar_conteudos" adiciona uma passada barata que escreve
+#                a transição entre um tópico e o seguinte.
+MODO_CONTEUDOS_PADRAO = "bloco"
+
+def _prefixo_conteudos(nome_idioma, inst_idioma, prompt_base, resumo, introducao, topicos):
+    """Parte comum a TODAS as chamadas do modo paralelo (não pode variar por tópico)."""
+    lista = "".join(f"- Tópico {t['numero']}: {t['titulo']}\n" for t in topicos)
+    return (
+        f"⚠️ **ATENÇÃO**: Todo o texto abaixo deve ser redigido **exclusivamente em {nome_idioma}**.\n\n"
+        f"{inst_idioma}\n\n"
+        f"{prompt_base}\n\n"
+        f"Contexto geral do vídeo:\n\"{resumo}\"\n\n"
+        f"Introdução:\n\"{introducao}\"\n\n"
+        f"Estrutura completa do vídeo (todos os tópicos, em ordem):\n{lista}\n"
+    )
+
+def _prompt_conteudo_topico(prefixo, topico):
+    return prefixo + (
+        "---\n"
+        f"Agora gere SOMENTE o conteúdo narrativo do Tópico {topico['numero']}: {topico['titulo']}\n"
+        f"Contexto do tópico: {topico['resumo']}\n\n"
+        "⚠️ IMPORTANTE: Responda apenas com o texto narrativo deste tópico, sem repetir o título, "
+        "sem bullets, sem encerrar o raciocínio e mantendo a fluidez emocional, como parte de um vídeo contínuo."
+    )
+
+def _prompt_conteudos_bloco(nome_idioma, inst_idioma, prompt_base, resumo, introducao, topicos, anterior=None):
+    """
+    Prompt do modo "bloco". `anterior` (último conteúdo já salvo) só é usado ao
+    retomar um stream interrompido, pedindo apenas os tópicos restantes.
+    """
+    prompt = (
+        f"⚠️ **ATENÇÃO**: Todo o texto abaixo deve ser redigido **exclusivamente em {nome_idioma}**.\n\n"
+        f"{inst_idioma}\n\n"
+        f"{prompt_base}\n\n"
+        f"Contexto geral do vídeo:\n\"{resumo}\"\n\n"
+        f"Introdução:\n\"{introducao}\"\n\n"
+    )
+    if anterior:
+        prompt += (
+            "Os tópicos anteriores a estes já foram escritos. O último terminou assim:\n"
+            f"\"{_ultimas_frases(anterior['conteudo'])}\"\n"
+            "Continue a partir dali, sem repetir o que já foi dito.\n\n"
+        )
+    prompt += (
+        "Agora, para cada um dos tópicos abaixo, gere o conteúdo narrativo específico, "
+        "sem encerrar o raciocínio e mantendo a fluidez emocional:\n\n"
+    )
+    for t in topicos:
+        prompt += (
+            f"---\n"
+            f"Tópico {t['numero']}: {t['titulo']}\n"
+            f"Contexto do tópico: {t['resumo']}\n\n"
+        )
+    prompt += (
+        "📝 Gere agora o roteiro completo, parte a parte:\n"
+        "⚠️ IMPORTANTE: Cada bloco deve começar numa nova linha exatamente como “Tópico XX: Título do tópico” "
+        "e, no parágrafo seguinte, vir o conteúdo. Não use bullets, numeração alternativa nem variações de hífen."
+    )
+    return prompt
+
+def _blocos_novos(matches, prontos):
+    """Converte os matches da regex, ignorando tópicos que já estão em `prontos`."""
+    feitos = {c["numero"] for c in prontos}
+    novos = []
+    for num, titulo, texto in matches:
+        if int(num) in feitos:
+            continue
+        feitos.add(int(num))
+        novos.append({"numero": int(num), "titulo": titulo.strip(), "conteudo": texto.strip()})
+    return novos
+
+def _conteudos_em_stream(montar_prompt, topicos, meta_path, regenerar=False):
+    """
+    Modo "bloco" em stream. Cada "Tópico XX" completo (quando o próximo começa)
+    é salvo em "conteudos_parciais" no metadados.json. Se a conexão cair,
+    pede só os tópicos que faltam, nesta execução ou na próxima.
+    montar_prompt(topicos, anterior) -> prompt.
+    """
+    assinatura = _assinatura(montar_prompt(topicos, None))
+    salvo = json.loads(meta_path.read_text(encoding="utf-8")).get("conteudos_parciais") or {}
+    prontos = [] if regenerar or salvo.get("assinatura") != assinatura else list(salvo.get("blocos", []))
+
+    for _ in range(STREAM_RETOMADAS + 1):
+        feitos = {c["numero"] for c in prontos}
+        restantes = [t for t in topicos if int(t["numero"]) not in feitos]
+        if not restantes:
+            return prontos
+        if prontos:
+            log_callback(f"  ↩️ Retomando conteúdos: {len(prontos)} tópico(s) já salvos, faltam {len(restantes)}.")
+
+        # texto desde o início do último bloco ainda incompleto: só ele é relido
+        cauda = ""
+
+        def ao_receber(pedaco):
+            nonlocal cauda
+            cauda += pedaco
+            if "\n" not in pedaco:
+                return
+            achados = list(_PADRAO_BLOCO_TOPICO.finditer(cauda))
+            if len(achados) < 2:
+                return
+            # o último bloco encontrado ainda pode estar chegando
+            novos = _blocos_novos([m.groups() for m in achados[:-1]], prontos)
+            cauda = cauda[achados[-1].start():]
+            if novos:
+                prontos.extend(novos)
+                _salvar_progresso(meta_path, conteudos_parciais={"assinatura": assinatura, "blocos": prontos})
+                log_callback(f"  💾 Tópico {novos[-1]['numero']} salvo ({len(prontos)}/{len(topicos)}).")
+
+        try:
+            out = completar_stream(montar_prompt(restantes, prontos[-1] if prontos else None),
+                                   model="gpt-4o", temperature=0.6, regenerar=regenerar,
+                                   ao_receber=ao_receber)
+        except StreamInterrompido as e:
+            log_callback(f"  ⚠️ {e}")
+            continue
+
+        prontos.extend(_blocos_novos(_PADRAO_BLOCO_TOPICO.findall(out.strip()), prontos))
+        return prontos
+
+    raise RuntimeError(f"stream caiu {STREAM_RETOMADAS + 1} vezes; progresso salvo em conteudos_parciais")
+
+def _ultimas_frases(texto, n=3):
+    frases = re.split(r'(?<=[.!?…])\s+', texto.strip())
+    return " ".join(frases[-n:])
+
+def _primeiras_frases(texto, n=3):
+    frases = re.split(r'(?<=[.!?…])\s+', texto.strip())
+    return " ".join(frases[:n])
+
+def _conteudos_em_paralelo(prefixo, topicos, nome_idioma, costurar=False, regenerar=False):
+    """Uma chamada por tópico, todas juntas. Retorna a lista de conteúdos ou levanta erro."""
+    log_callback(f"  ✍️ Gerando {len(topicos)} tópicos em paralelo...")
+    respostas = completar_varios([
+        {"prompt": _prompt_conteudo_topico(prefixo, t), "model": "gpt-4o",
+         "temperature": 0.6, "regenerar": regenerar}
+        for t in topicos
+    ])
+    erros = [(t["numero"], r) for t, r in zip(topicos, respostas) if isinstance(r, Exception)]
+    if erros:
+        raise RuntimeError(f"Tópico {erros[0][0]} falhou: {erros[0][1]}")
+
+    conteudos = [
+        {"numero": int(t["numero"]), "titulo": t["titulo"].strip(), "conteudo": r.strip()}
+        for t, r in zip(topicos, respostas)
+    ]
+
+    if costurar and len(conteudos) > 1:
+        log_callback(f"  🧵 Costurando {len(conteudos) - 1} transições...")
+        transicoes = completar_varios([
+            {"prompt": (
+                f"Escreva exclusivamente em {nome_idioma}. Abaixo estão o final de um trecho de roteiro "
+                "e o começo do trecho seguinte, escritos separadamente. Escreva UMA ou DUAS frases curtas "
+                "que liguem os dois de forma natural e emocional, sem anunciar 'o próximo tópico' e sem "
+                "repetir o que já foi dito. Responda só com as frases.\n\n"
+                f"Final do trecho anterior:\n\"{_ultimas_frases(ant['conteudo'])}\"\n\n"
+                f"Começo do trecho seguinte:\n\"{_primeiras_frases(atual['conteudo'])}\""
+             ), "model": "gpt-4o-mini", "temperature": 0.5, "max_tokens": 120, "regenerar": regenerar}
+            for ant, atual in zip(conteudos, conteudos[1:])
+        ])
+        for atual, ponte in zip(conteudos[1:], transicoes):
+            if isinstance(ponte, Exception) or not ponte.strip():
+                log_callback(f"  ⚠️ Transição para o Tópico {atual['numero']} falhou; mantendo sem costura.")
+                continue
+            atual["conteudo"] = f"{ponte.strip()} {atual['conteudo']}"
+
+    return conteudos
+
+def gerar_conteudos_topicos(canal: str, video_id: str, regenerar: bool = False, modo: str = None,
+                            streaming: bool = True) -> bool:
     """
     Para cada tópico em metadados.json gera o bloco narrativo correspondente
     e injeta tudo na chave "conteudos" dentro de data/{canal}/{video_id}/control/metadados.json.
+    modo: "bloco" ou "paralelo" (padrão: switch "conteudos_paralelos" das configs).
+    streaming=True (modo "bloco") salva cada tópico assim que chega e retoma do
+    último tópico salvo se a conexão cair.
     """
     control_dir = Path("data") / canal / video_id / "control"
     meta_path   = control_dir / "metadados.json"
@@ -472,70 +890,49 @@ def gerar_conteudos_topicos(canal: str, video_id: str) -> bool:
     inst_idioma  = obter_instrucao_idioma(idioma)
     nome_idioma  = IDIOMAS_SUPORTADOS.get(idioma, {}).get("nome", "Português Brasileiro")
 
+    if modo is None:
+        modo = "paralelo" if cfg.get("conteudos_paralelos") else MODO_CONTEUDOS_PADRAO
+    modo = modo.lower()
+    if modo == "paralelo":
+        prefixo = _prefixo_conteudos(nome_idioma, inst_idioma, prompt_base, resumo, introducao, topicos)
+        try:
+            conteudos = _conteudos_em_paralelo(
+                prefixo, topicos, nome_idioma,
+                costurar=bool(cfg.get("costurar_conteudos", False)), regenerar=regenerar
+            )
+        except Exception as e:
+            log_callback(f"  ⚠️ Erro ao chamar OpenAI para conteúdos: {e}")
+            return False
+        return _salvar_conteudos(meta_path, meta, conteudos)
+
     # 6) monta o prompt completo, reforçando uso do idioma do canal
-    prompt = (
-        f"⚠️ **ATENÇÃO**: Todo o texto abaixo deve ser redigido **exclusivamente em {nome_idioma}**.\n\n"
-        f"{inst_idioma}\n\n"
-        f"{prompt_base}\n\n"
-        f"Contexto geral do vídeo:\n\"{resumo}\"\n\n"
-        f"Introdução:\n\"{introducao}\"\n\n"
-        "Agora, para cada um dos tópicos abaixo, gere o conteúdo narrativo específico, "
-        "sem encerrar o raciocínio e mantendo a fluidez emocional:\n\n"
-    )
-    for t in topicos:
-        prompt += (
-            f"---\n"
-            f"Tópico {t['numero']}: {t['titulo']}\n"
-            f"Contexto do tópico: {t['resumo']}\n\n"
-        )
-    prompt += (
-        "📝 Gere agora o roteiro completo, parte a parte:\n"
-        "⚠️ IMPORTANTE: Cada bloco deve começar numa nova linha exatamente como “Tópico XX: Título do tópico” "
-        "e, no parágrafo seguinte, vir o conteúdo. Não use bullets, numeração alternativa nem variações de hífen."
-    )
+    def montar_prompt(lista, anterior=None):
+        return _prompt_conteudos_bloco(nome_idioma, inst_idioma, prompt_base,
+                                       resumo, introducao, lista, anterior)
 
     # 7) chama a API
     try:
-        resp = _client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.6,
-        )
-        out = resp.choices[0].message.content.strip()
+        if streaming:
+            conteudos = _conteudos_em_stream(montar_prompt, topicos, meta_path, regenerar=regenerar)
+        else:
+            out = completar(montar_prompt(topicos), model="gpt-4o", temperature=0.6, regenerar=regenerar).strip()
+            # 8) extrai blocos via regex
+            conteudos = _blocos_novos(_PADRAO_BLOCO_TOPICO.findall(out), [])
     except Exception as e:
         log_callback(f"  ⚠️ Erro ao chamar OpenAI para conteúdos: {e}")
         return False
 
-    # 8) extrai blocos via regex
-    pattern = re.compile(
-        r'''(?m)                       # modo multilinha
-        ^\s*                           # início da linha, espaços
-        (?:[Tt][óo]pico)\s*(\d+)[\s:\-–]+   # “Tópico N:” ou “Tópico N-”
-        (.+?)\r?\n                     # título até quebra de linha
-        ([\s\S]*?)(?=                  # bloco até
-            ^\s*(?:[Tt][óo]pico)\s*\d+ # próximo tópico
-            |\Z                        # ou fim do texto
-        )''', re.IGNORECASE|re.VERBOSE
-    )
-    matches = pattern.findall(out)
-    if not matches:
+    # 9) salva
+    if not conteudos:
         log_callback("  ⚠️ Nenhum bloco de conteúdo detectado pela regex.")
         return False
 
-    # 9) formata e salva
-    conteudos = []
-    for num, titulo, texto in matches:
-        conteudos.append({
-            "numero": int(num),
-            "titulo": titulo.strip(),
-            "conteudo": texto.strip()
-        })
+    return _salvar_conteudos(meta_path, meta, conteudos)
 
+def _salvar_conteudos(meta_path, meta, conteudos) -> bool:
     meta["conteudos"] = conteudos
-    meta_path.write_text(
-        json.dumps(meta, ensure_ascii=False, indent=4),
-        encoding="utf-8"
-    )
+    meta.pop("conteudos_parciais", None)
+    _gravar_meta(meta_path, meta)
 
     log_callback("  ✅ Conteúdos salvos em metadados.json.")
     return True
@@ -0,0 +1,121 @@
+# vf_worker.py
+#
+# Worker sem interface que consome a fila do VideoForge (vf_fila.py).
+# Rode quantos processos quiser, na mesma máquina ou em outras que
+# compartilham a pasta data/:
+#
+#   python -m app_videoforge.vf_worker --enfileirar          # todos os canais
+#   python -m app_videoforge.vf_worker --enfileirar --canal MeuCanal
+#   python -m app_videoforge.vf_worker --workers 4 --continuo
+#
+# Cada thread reserva uma etapa por vez; uma thread à parte renova os leases
+# do processo. Sem --continuo o worker sai quando não há mais nada pendente.
+
+import argparse
+import threading
+
+from db_manager import inicializar_bancos_de_dados
+from app_videoforge import vf_fila
+from app_videoforge.controller import (
+    GRAFO_ETAPAS, CONCORRENCIA_ETAPAS, MAX_WORKERS, log_callback, _contexto_video, _registrar_etapa,
+    listar_canais, listar_videos_validos, videos_habilitados,
+)
+
+INTERVALO_CONSULTA = 30   # segundos entre consultas com a fila vazia (--continuo)
+ESPERA_OCUPADA = 2        # segundos quando há trabalho, mas nada cabe nos limites agora
+
+
+def enfileirar_videos(canal=None):
+    """Põe na fila os vídeos válidos do canal (ou de todos) com roteiro habilitado."""
+    canais = [canal] if canal else listar_canais()
+    tarefas = [(nome, vid_id) for nome in canais for vid_id in listar_videos_validos(nome)]
+    pendentes = vf_fila.enfileirar(GRAFO_ETAPAS, videos_habilitados(tarefas), log=log_callback)
+    log_callback(f"📥 Fila: {pendentes} etapa(s) pendente(s) em {len(tarefas)} vídeo(s).")
+    return pendentes
+
+
+def _rodar_etapa(dono, canal, video_id, etapa):
+    erro = None
+    with _contexto_video(canal, video_id):
+        log_callback(f"▶️ Etapa '{etapa}' reservada por {dono}")
+        try:
+            if not GRAFO_ETAPAS[etapa]["executar"](canal, video_id):
+                resultado = vf_fila.FALHOU
+            elif GRAFO_ETAPAS[etapa]["concluida"](canal, video_id):
+                resultado = vf_fila.CONCLUIDA
+            else:
+                resultado = vf_fila.AGUARDANDO
+        except Exception as e:
+            log_callback(f"❌ Erro inesperado na etapa '{etapa}': {e}")
+            resultado, erro = vf_fila.FALHOU, str(e)
+        if not vf_fila.finalizar(GRAFO_ETAPAS, dono, canal, video_id, etapa, resultado, erro):
+            log_callback(f"⚠️ Lease da etapa '{etapa}' perdido; resultado não gravado na fila.")
+    _registrar_etapa(canal, video_id, etapa, resultado)
+
+
+def _consumir(dono, continuo, intervalo, parar):
+    while not parar.is_set():
+        reserva = vf_fila.reservar(dono, CONCORRENCIA_ETAPAS)
+        if reserva is not None:
+            _rodar_etapa(dono, *reserva)
+            continue
+        em_andamento = vf_fila.contar().get(vf_fila.PENDENTE) or vf_fila.contar(dono).get(vf_fila.RODANDO)
+        if not em_andamento and not continuo:
+            return
+        parar.wait(ESPERA_OCUPADA if em_andamento else intervalo)
+
+
+def _renovar_leases(dono, parar):
+    while not parar.wait(vf_fila.LEASE_SEGUNDOS / 3):
+        try:
+            vf_fila.renovar(dono)
+        except Exception as e:
+            log_callback(f"⚠️ Falha ao renovar leases: {e}")
+
+
+def executar_worker(workers=None, continuo=False, intervalo=INTERVALO_CONSULTA, dono=None, parar=None):
+    """Consome a fila com `workers` threads até esvaziar (ou até `parar`, com continuo=True)."""
+    dono = dono or vf_fila.identificador()
+    parar = parar or threading.Event()
+    workers = max(1, int(workers or MAX_WORKERS))
+    log_callback(f"👷 Worker {dono}: {workers} thread(s). Limites: {CONCORRENCIA_ETAPAS}")
+
+    parar_renovacao = threading.Event()
+    threading.Thread(target=_renovar_leases, args=(dono, parar_renovacao), daemon=True).start()
+    threads = [
+        threading.Thread(target=_consumir, args=(dono, continuo, intervalo, parar), name=f"vf_worker_{i}")
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        log_callback("⛔ Worker interrompido: terminando as etapas em andamento...")
+        parar.set()
+        for t in threads:
+            t.join()
+    finally:
+        parar_renovacao.set()
+    log_callback(f"🏁 Worker {dono} terminou. Fila: {vf_fila.contar()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker da fila do VideoForge")
+    parser.add_argument("--enfileirar", action="store_true", help="sincroniza a fila com o banco antes de consumir")
+    parser.add_argument("--canal", help="com --enfileirar, só este canal")
+    parser.add_argument("--workers", type=int, default=None, help=f"threads (padrão {MAX_WORKERS})")
+    parser.add_argument("--continuo", action="store_true", help="não sai com a fila vazia; consulta de tempos em tempos")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_CONSULTA, help="segundos entre consultas (--continuo)")
+    parser.add_argument("--dono", help="nome deste worker nos leases (padrão host:pid)")
+    args = parser.parse_args()
+
+    inicializar_bancos_de_dados()
+    if args.enfileirar:
+        enfileirar_videos(args.canal)
+    executar_worker(args.workers, args.continuo, args.intervalo, args.dono)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# cache_llm.py
+#
+# Cache persistente (SQLite) das respostas do LLM, endereçado pelo conteúdo:
+# a chave é sha256(modelo, temperatura, mensagens, demais parâmetros).
+# Rodar de novo gerar_resumo / gerar_topicos / ... depois de um crash ou de
+# editar o metadados.json não paga pelo mesmo prompt outra vez.
+#
+# - Expira entradas mais velhas que IDADE_MAXIMA_DIAS.
+# - Mantém o banco abaixo de TAMANHO_MAXIMO_MB removendo as menos acessadas.
+# - Contadores de hit/miss por processo em estatisticas().
+# - Para regenerar de propósito use completar(..., regenerar=True) ou
+#   desligue tudo com LLM_CACHE=0 no .env / configurar(ativo=False).
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+from db_manager import conectar, ativar_wal
+
+CACHE_DB_PATH = Path("data/llm_cache.db")
+IDADE_MAXIMA_DIAS = 90
+TAMANHO_MAXIMO_MB = 256
+LIMPAR_A_CADA = 200   # gravações entre duas limpezas automáticas
+
+_config = {"ativo": None}
+_contadores = {"hits": 0, "misses": 0, "gravacoes": 0}
+_lock = threading.Lock()
+_inicializado = False
+
+
+def configurar(ativo=None, caminho=None):
+    global CACHE_DB_PATH, _inicializado
+    if ativo is not None:
+        _config["ativo"] = bool(ativo)
+    if caminho is not None:
+        CACHE_DB_PATH = Path(caminho)
+        _inicializado = False
+
+
+def ativo():
+    if _config["ativo"] is not None:
+        return _config["ativo"]
+    return os.getenv("LLM_CACHE", "1").strip().lower() not in ("0", "false", "nao", "não")
+
+
+def _conectar():
+    global _inicializado
+    if not _inicializado:
+        CACHE_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        ativar_wal(CACHE_DB_PATH)
+        with conectar(CACHE_DB_PATH) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS respostas (
+                    chave TEXT PRIMARY KEY,
+                    modelo TEXT,
+                    resposta TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_respostas_acessado ON respostas(acessado_em)")
+        _inicializado = True
+    return conectar(CACHE_DB_PATH)
+
+
+def gerar_chave(model, temperature, messages, **params):
+    """Hash estável do pedido inteiro (modelo, temperatura, mensagens e extras)."""
+    bruto = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages, "params": params},
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+
+def obter(chave):
+    """Retorna a resposta guardada ou None. Atualiza os contadores."""
+    agora = time.time()
+    limite = agora - IDADE_MAXIMA_DIAS * 86400
+    with _conectar() as conn:
+        row = conn.execute(
+            "SELECT resposta, criado_em FROM respostas WHERE chave = ?", (chave,)
+        ).fetchone()
+        if row and row[1] >= limite:
+            conn.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+        else:
+            row = None
+    with _lock:
+        _contadores["hits" if row else "misses"] += 1
+    return row[0] if row else None
+
+
+def guardar(chave, model, resposta):
+    agora = time.time()
+    with _conectar() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO respostas (chave, modelo, resposta, tamanho, criado_em, acessado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (chave, model, resposta, len(resposta.encode("utf-8")), agora, agora)
+        )
+    with _lock:
+        _contadores["gravacoes"] += 1
+        limpar_agora = _contadores["gravacoes"] % LIMPAR_A_CADA == 0
+    if limpar_agora:
+        limpar()
+
+
+def limpar(idade_maxima_dias=None, tamanho_maximo_mb=None):
+    """Remove entradas velhas e, se passar do limite de tamanho, as menos acessadas."""
+    idade = IDADE_MAXIMA_DIAS if idade_maxima_dias is None else idade_maxima_dias
+    maximo = int((TAMANHO_MAXIMO_MB if tamanho_maximo_mb is None else tamanho_maximo_mb) * 1024 * 1024)
+    removidas = 0
+    with _conectar() as conn:
+        cur = conn.execute("DELETE FROM respostas WHERE criado_em < ?", (time.time() - idade * 86400,))
+        removidas += cur.rowcount
+        total = conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        if total > maximo:
+            excesso = total - maximo
+            apagar, acumulado = [], 0
+            for chave, tamanho in conn.execute("SELECT chave, tamanho FROM respostas ORDER BY acessado_em ASC"):
+                if acumulado >= excesso:
+                    break
+                apagar.append((chave,))
+                acumulado += tamanho
+            conn.executemany("DELETE FROM respostas WHERE chave = ?", apagar)
+            removidas += len(apagar)
+    return removidas
+
+
+def estatisticas():
+    """Hits/misses deste processo + tamanho atual do cache."""
+    with _conectar() as conn:
+        entradas, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas"
+        ).fetchone()
+    with _lock:
+        dados = dict(_contadores)
+    consultas = dados["hits"] + dados["misses"]
+    dados["taxa_acerto"] = dados["hits"] / consultas if consultas else 0.0
+    dados["entradas"] = entradas
+    dados["tamanho_mb"] = round(total / (1024 * 1024), 2)
+    return dados
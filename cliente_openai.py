@@ -0,0 +1,345 @@
+# cliente_openai.py
+#
+# Cliente OpenAI compartilhado por todos os geradores (vf_roteiro, app_roteiro,
+# gerador_descricao_chave...).
+#
+# - Um único AsyncOpenAI rodando num event loop em thread própria, então o
+#   código síncrono (threads do VideoForge, Tk) chama `completar(...)` normalmente.
+# - Dois baldes globais: requisições/minuto e tokens/minuto.
+# - Concorrência máxima limitada por semáforo.
+# - Retry com backoff exponencial + jitter em 429, 5xx e erros de conexão,
+#   respeitando o header Retry-After quando a API mandar.
+#
+# - Respostas passam pelo cache_llm (SQLite, consultado numa thread à parte
+#   para não travar o loop); regenerar=True ignora o cache.
+# - completar_stream(...) recebe a resposta aos pedaços (ao_receber) para quem
+#   quer salvar o progresso; se a conexão cair no meio levanta
+#   StreamInterrompido com o texto que já chegou.
+#
+# Para testar contra um servidor falso local basta apontar OPENAI_BASE_URL
+# (ou configurar(base_url=...)) para ele. Ver teste_cliente_openai.py.
+
+import os
+import time
+import queue
+import random
+import asyncio
+import threading
+
+import cache_llm
+
+# Limites padrão (sobrescritos por OPENAI_RPM / OPENAI_TPM / OPENAI_CONCORRENCIA no .env)
+RPM_PADRAO = 500
+TPM_PADRAO = 200000
+CONCORRENCIA_PADRAO = 16
+
+MAX_TENTATIVAS = 6
+BACKOFF_BASE = 1.0      # segundos
+BACKOFF_MAXIMO = 60.0   # segundos
+SAIDA_ESTIMADA = 1000   # tokens reservados p/ resposta quando não há max_tokens
+
+_config = {
+    "rpm": None,
+    "tpm": None,
+    "concorrencia": None,
+    "base_url": None,
+    "api_key": None,
+}
+
+_loop = None
+_loop_lock = threading.Lock()
+_estado = {}   # cliente, baldes e semáforo (vivem dentro do _loop)
+
+
+class BaldeDeTokens:
+    """
+    Token bucket assíncrono: enche `por_minuto` unidades por minuto até a
+    capacidade. `consumir(n)` espera até haver saldo.
+    """
+
+    def __init__(self, por_minuto):
+        self.capacidade = float(por_minuto)
+        self.taxa = float(por_minuto) / 60.0
+        self.saldo = float(por_minuto)
+        self.atualizado = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _reabastecer(self):
+        agora = time.monotonic()
+        self.saldo = min(self.capacidade, self.saldo + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+
+    async def consumir(self, quantidade):
+        # pedidos maiores que o balde inteiro passam quando ele estiver cheio
+        quantidade = min(float(quantidade), self.capacidade)
+        async with self._lock:
+            while True:
+                self._reabastecer()
+                if self.saldo >= quantidade:
+                    self.saldo -= quantidade
+                    return
+                await asyncio.sleep((quantidade - self.saldo) / self.taxa)
+
+    def ajustar(self, diferenca):
+        """Corrige o saldo depois que o uso real é conhecido (pode ficar negativo)."""
+        self._reabastecer()
+        self.saldo = min(self.capacidade, self.saldo - diferenca)
+
+
+def configurar(rpm=None, tpm=None, concorrencia=None, base_url=None, api_key=None):
+    """Altera limites/endpoint. Vale para as próximas chamadas."""
+    for chave, valor in (("rpm", rpm), ("tpm", tpm), ("concorrencia", concorrencia),
+                         ("base_url", base_url), ("api_key", api_key)):
+        if valor is not None:
+            _config[chave] = valor
+    if _loop is not None:
+        asyncio.run_coroutine_threadsafe(_resetar_estado(), _loop).result()
+
+
+async def _resetar_estado():
+    cliente = _estado.pop("cliente", None)
+    _estado.clear()
+    if cliente is not None:
+        await cliente.close()
+
+
+class StreamInterrompido(Exception):
+    """O stream caiu depois de já ter recebido texto; `parcial` guarda esse texto."""
+
+    def __init__(self, erro, parcial):
+        super().__init__(f"{erro} (stream interrompido após {len(parcial)} caracteres)")
+        self.erro = erro
+        self.parcial = parcial
+
+
+def _obter_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="cliente_openai", daemon=True).start()
+    return _loop
+
+
+def _obter_estado():
+    """Cria cliente, baldes e semáforo na primeira chamada (sempre dentro do loop)."""
+    if not _estado:
+        from openai import AsyncOpenAI
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = _config["api_key"] or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("❌ OPENAI_API_KEY não encontrada no .env")
+        base_url = _config["base_url"] or os.getenv("OPENAI_BASE_URL") or None
+        rpm = _config["rpm"] or int(os.getenv("OPENAI_RPM", RPM_PADRAO))
+        tpm = _config["tpm"] or int(os.getenv("OPENAI_TPM", TPM_PADRAO))
+        concorrencia = _config["concorrencia"] or int(os.getenv("OPENAI_CONCORRENCIA", CONCORRENCIA_PADRAO))
+
+        _estado["cliente"] = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        _estado["rpm"] = BaldeDeTokens(rpm)
+        _estado["tpm"] = BaldeDeTokens(tpm)
+        _estado["semaforo"] = asyncio.Semaphore(int(concorrencia))
+    return _estado
+
+
+_codificador = None
+
+def estimar_tokens(texto):
+    """Conta tokens com tiktoken se disponível; senão ~4 caracteres por token."""
+    global _codificador
+    if _codificador is None:
+        try:
+            import tiktoken
+            _codificador = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _codificador = False
+    if _codificador:
+        return len(_codificador.encode(texto, disallowed_special=()))
+    return len(texto) // 4 + 1
+
+
+def _espera_retry(erro, tentativa):
+    """Usa Retry-After quando existir; senão backoff exponencial com jitter total."""
+    resposta = getattr(erro, "response", None)
+    if resposta is not None:
+        valor = resposta.headers.get("retry-after")
+        try:
+            if valor is not None:
+                return float(valor) + random.uniform(0, BACKOFF_BASE)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAXIMO, BACKOFF_BASE * (2 ** tentativa)))
+
+
+def _pode_repetir(erro):
+    import openai
+
+    if isinstance(erro, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+                         ConnectionError)):
+        return True
+    if isinstance(erro, openai.APIStatusError):
+        return erro.status_code == 429 or erro.status_code >= 500
+    return False
+
+
+async def completar_async(prompt=None, *, model, temperature=None, messages=None,
+                          usar_cache=True, regenerar=False, chave_cache=None, **kwargs):
+    """
+    Uma chamada de chat.completions, com limites globais e retry. Retorna o texto.
+    usar_cache=False não lê nem grava no cache; regenerar=True ignora o que
+    estiver guardado mas grava a resposta nova. chave_cache entra no lugar
+    das mensagens no cálculo da chave (para prompts com um pedaço que não
+    deve invalidar a resposta guardada, como o contexto de outro trecho).
+    """
+    if messages is None:
+        messages = [{"role": "user", "content": prompt}]
+
+    chave = None
+    if usar_cache and cache_llm.ativo():
+        chave = cache_llm.gerar_chave(model, temperature, messages if chave_cache is None else chave_cache, **kwargs)
+        if not regenerar:
+            # SQLite fora da thread do loop: um lock de escrita de outro
+            # processo (busy timeout) não pode parar os outros pedidos
+            guardada = await asyncio.to_thread(cache_llm.obter, chave)
+            if guardada is not None:
+                return guardada
+
+    estado = _obter_estado()
+    estimado = sum(estimar_tokens(m.get("content") or "") for m in messages)
+    estimado += kwargs.get("max_tokens") or SAIDA_ESTIMADA
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+
+    tentativa = 0
+    while True:
+        await estado["rpm"].consumir(1)
+        await estado["tpm"].consumir(estimado)
+        try:
+            async with estado["semaforo"]:
+                resp = await estado["cliente"].chat.completions.create(
+                    model=model, messages=messages, **kwargs
+                )
+        except Exception as e:
+            if not _pode_repetir(e) or tentativa + 1 >= MAX_TENTATIVAS:
+                raise
+            await asyncio.sleep(_espera_retry(e, tentativa))
+            tentativa += 1
+            continue
+
+        uso = getattr(resp, "usage", None)
+        if uso is not None and getattr(uso, "total_tokens", None):
+            estado["tpm"].ajustar(uso.total_tokens - estimado)
+        texto = resp.choices[0].message.content or ""
+        if chave and texto:
+            await asyncio.to_thread(cache_llm.guardar, chave, model, texto)
+        return texto
+
+
+async def completar_stream_async(prompt=None, *, model, temperature=None, messages=None,
+                                 ao_receber=None, usar_cache=True, regenerar=False, **kwargs):
+    """
+    Igual a completar_async, mas com stream=True. `ao_receber(pedaco)`
+    é chamado a cada pedaço, só com o texto novo (quem precisa do acumulado
+    guarda o seu; roda na thread do loop: precisa ser rápido).
+    Antes do primeiro pedaço os erros temporários são repetidos normalmente;
+    depois dele levanta StreamInterrompido (quem chamou decide como retomar).
+    A chave do cache é a mesma de completar_async para o mesmo pedido.
+    """
+    if messages is None:
+        messages = [{"role": "user", "content": prompt}]
+
+    chave = None
+    if usar_cache and cache_llm.ativo():
+        chave = cache_llm.gerar_chave(model, temperature, messages, **kwargs)
+        if not regenerar:
+            guardada = await asyncio.to_thread(cache_llm.obter, chave)
+            if guardada is not None:
+                if ao_receber:
+                    ao_receber(guardada)
+                return guardada
+
+    estado = _obter_estado()
+    estimado = sum(estimar_tokens(m.get("content") or "") for m in messages)
+    estimado += kwargs.get("max_tokens") or SAIDA_ESTIMADA
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+
+    tentativa = 0
+    while True:
+        await estado["rpm"].consumir(1)
+        await estado["tpm"].consumir(estimado)
+        partes, uso, fim = [], None, None
+        try:
+            async with estado["semaforo"]:
+                stream = await estado["cliente"].chat.completions.create(
+                    model=model, messages=messages, stream=True,
+                    stream_options={"include_usage": True}, **kwargs
+                )
+                async for pedaco in stream:
+                    if getattr(pedaco, "usage", None):
+                        uso = pedaco.usage
+                    if not pedaco.choices:
+                        continue
+                    fim = pedaco.choices[0].finish_reason or fim
+                    delta = pedaco.choices[0].delta.content
+                    if delta:
+                        partes.append(delta)
+                        if ao_receber:
+                            ao_receber(delta)
+            if fim is None:
+                # conexão fechada sem o pedaço final: a resposta está incompleta
+                raise ConnectionError("stream terminou antes do fim da resposta")
+        except Exception as e:
+            if partes:
+                raise StreamInterrompido(e, "".join(partes)) from e
+            if not _pode_repetir(e) or tentativa + 1 >= MAX_TENTATIVAS:
+                raise
+            await asyncio.sleep(_espera_retry(e, tentativa))
+            tentativa += 1
+            continue
+
+        if uso is not None and getattr(uso, "total_tokens", None):
+            estado["tpm"].ajustar(uso.total_tokens - estimado)
+        texto = "".join(partes)
+        if chave and texto:
+            await asyncio.to_thread(cache_llm.guardar, chave, model, texto)
+        return texto
+
+
+def completar(prompt=None, *, model, temperature=None, messages=None, **kwargs):
+    """Versão síncrona de completar_async (pode ser chamada de qualquer thread)."""
+    coro = completar_async(prompt, model=model, temperature=temperature, messages=messages, **kwargs)
+    return asyncio.run_coroutine_threadsafe(coro, _obter_loop()).result()
+
+
+def completar_stream(prompt=None, *, model, temperature=None, messages=None, ao_receber=None, **kwargs):
+    """
+    Versão síncrona de completar_stream_async. Aqui `ao_receber` roda na
+    thread de quem chamou (pode gravar arquivo, logar...): na thread do loop
+    os pedaços só entram numa fila, sem atrasar os outros pedidos.
+    """
+    fila = queue.Queue()
+    coro = completar_stream_async(prompt, model=model, temperature=temperature, messages=messages,
+                                  ao_receber=fila.put if ao_receber else None,
+                                  **kwargs)
+    futuro = asyncio.run_coroutine_threadsafe(coro, _obter_loop())
+    if ao_receber:
+        fim = object()
+        # roda depois do último put: todo pedaço recebido é entregue antes do resultado (ou do erro)
+        futuro.add_done_callback(lambda _: fila.put(fim))
+        for pedaco in iter(fila.get, fim):
+            ao_receber(pedaco)
+    return futuro.result()
+
+
+def completar_varios(chamadas):
+    """
+    Dispara várias chamadas ao mesmo tempo (cada item é um dict de kwargs de
+    completar). Retorna a lista na mesma ordem; falhas vêm como a exceção.
+    """
+    async def _todas():
+        return await asyncio.gather(
+            *(completar_async(**c) for c in chamadas), return_exceptions=True
+        )
+    return asyncio.run_coroutine_threadsafe(_todas(), _obter_loop()).result()
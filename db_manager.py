@@ -1,11 +1,218 @@
 # db_manager.py
 
 import sqlite3
+import threading
 from pathlib import Path
 
 # Define os caminhos para os bancos de dados
 VIDEOS_DB_PATH = Path("data/videos.db")
 CHANNELS_DB_PATH = Path("data/channels.db")
+MIDIAS_DB_PATH = Path("data_midia/midias.db")
+
+# Quanto uma escrita espera por outra antes de dar "database is locked"
+TIMEOUT_OCUPADO_MS = 30000
+# Statements preparados guardados por conexão (o sqlite3 reaproveita pelo texto do SQL)
+STATEMENTS_EM_CACHE = 256
+
+_pool = threading.local()
+
+
+def conectar(caminho):
+    """
+    Conexão da thread atual para o banco em `caminho`, aberta uma única vez
+    por thread e reaproveitada (junto com os statements já preparados).
+    Use como antes: `with conectar(VIDEOS_DB_PATH) as conn:` faz commit ou
+    rollback no fim do bloco, mas NÃO fecha a conexão.
+    """
+    conexoes = getattr(_pool, "conexoes", None)
+    if conexoes is None:
+        conexoes = _pool.conexoes = {}
+    chave = str(caminho)
+    conn = conexoes.get(chave)
+    if conn is None:
+        conn = sqlite3.connect(chave, timeout=TIMEOUT_OCUPADO_MS / 1000,
+                               cached_statements=STATEMENTS_EM_CACHE)
+        conn.execute(f"PRAGMA busy_timeout = {TIMEOUT_OCUPADO_MS}")
+        # com WAL, NORMAL só perde a última transação se o SO cair (não corrompe)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conexoes[chave] = conn
+    return conn
+
+
+def fechar_conexoes():
+    """Fecha as conexões abertas pela thread atual."""
+    for conn in getattr(_pool, "conexoes", {}).values():
+        conn.close()
+    _pool.conexoes = {}
+
+
+def ativar_wal(caminho):
+    """
+    Liga o modo WAL (fica gravado no arquivo do banco): leitores não bloqueiam
+    o escritor e vice-versa, então os workers do VideoForge e a interface
+    podem usar o banco ao mesmo tempo.
+    """
+    with conectar(caminho) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+
+
+# ─── Migrações ────────────────────────────────────────────────────
+# Cada banco guarda a sua versão em PRAGMA user_version. A migração N (o
+# N-ésimo item da lista) leva o banco da versão N-1 para N. Para mudar o
+# esquema, acrescente um item no FIM da lista; nunca edite um que já rodou.
+# A versão 1 é o esquema original (CREATE TABLE IF NOT EXISTS), então
+# bancos antigos, sem versão, passam por ela sem perder nada.
+
+MIGRACOES_CANAIS = [
+    # 1: esquema original (o UNIQUE de nome já cria o índice usado nas buscas por nome)
+    ["""
+        CREATE TABLE IF NOT EXISTS canais (
+            id TEXT PRIMARY KEY,
+            nome TEXT NOT NULL UNIQUE,
+            idioma TEXT,
+            marca_dagua TEXT,
+            ativo INTEGER DEFAULT 1,
+            caminho_videos TEXT,
+            roteiros_gerados INTEGER DEFAULT 0,
+            data_criacao TEXT,
+            configs TEXT
+        )
+    """],
+]
+
+MIGRACOES_VIDEOS = [
+    # 1: esquema original (UNIQUE(canal, video_id) cobre as buscas por vídeo)
+    ["""
+        CREATE TABLE IF NOT EXISTS videos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            canal TEXT NOT NULL,
+            video_id TEXT NOT NULL,
+            link TEXT,
+            roteiro_ok INTEGER DEFAULT 0,
+            audio_ok INTEGER DEFAULT 0,
+            legenda_ok INTEGER DEFAULT 0,
+            metadado_ok INTEGER DEFAULT 0,
+            thumb_ok INTEGER DEFAULT 0,
+            estado INTEGER DEFAULT 0,
+            roteiro_data TEXT,
+            audio_data TEXT,
+            legenda_data TEXT,
+            metadado_data TEXT,
+            thumb_data TEXT,
+            criado_em TEXT,
+            configs TEXT,
+            UNIQUE(canal, video_id)
+        )
+    """],
+    # 2: listar pendências sem varrer a tabela. (canal, estado, video_id) cobre
+    #    "video_id WHERE canal = ? AND estado != 7" e "estado WHERE canal = ?"
+    #    só com o índice; (estado) atende as buscas por estado em todos os canais.
+    [
+        "CREATE INDEX IF NOT EXISTS idx_videos_canal_estado ON videos(canal, estado, video_id)",
+        "CREATE INDEX IF NOT EXISTS idx_videos_estado ON videos(estado)",
+        "ANALYZE",
+    ],
+    # 3: situação de cada etapa por vídeo (ver status_etapas.py). Só existem
+    #    linhas "pendente" para etapas com as dependências prontas, então
+    #    listar trabalho é uma busca no índice, não uma varredura de pastas.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS etapas (
+            fluxo TEXT NOT NULL,
+            canal TEXT NOT NULL,
+            video_id TEXT NOT NULL,
+            etapa TEXT NOT NULL,
+            situacao TEXT NOT NULL,
+            atualizado_em TEXT,
+            PRIMARY KEY (fluxo, canal, video_id, etapa)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_etapas_situacao ON etapas(fluxo, etapa, situacao, canal, video_id)",
+        # último videos.id já semeado em cada fluxo (vídeos novos entram por aqui)
+        """
+        CREATE TABLE IF NOT EXISTS etapas_fluxos (
+            fluxo TEXT PRIMARY KEY,
+            ultimo_video INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+    ],
+    # 4: fila de trabalho do VideoForge com lease (ver app_videoforge/vf_fila.py)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS fila (
+            canal TEXT NOT NULL,
+            video_id TEXT NOT NULL,
+            etapa TEXT NOT NULL,
+            recurso TEXT NOT NULL,
+            situacao TEXT NOT NULL,
+            dono TEXT,
+            expira_em REAL,
+            tentativas INTEGER NOT NULL DEFAULT 0,
+            erro TEXT,
+            atualizado_em REAL,
+            PRIMARY KEY (canal, video_id, etapa)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_fila_situacao ON fila(situacao, atualizado_em)",
+        "CREATE INDEX IF NOT EXISTS idx_fila_dono ON fila(dono, situacao)",
+    ],
+]
+
+MIGRACOES_MIDIAS = [
+    # 1: acervo de embeddings (ver app_midia_manual_importer/acervo_embeddings.py).
+    #    id = linha da matriz em embeddings.bin; uma mídia reimportada ganha id
+    #    novo e a linha antiga fica com ativo = 0 (a matriz só cresce).
+    [
+        """
+        CREATE TABLE IF NOT EXISTS midias (
+            id INTEGER PRIMARY KEY,
+            caminho TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            descricao TEXT NOT NULL,
+            ativo INTEGER NOT NULL DEFAULT 1,
+            criado_em TEXT
+        )
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_midias_caminho ON midias(caminho) WHERE ativo = 1",
+        # formato da matriz (float32, float16 ou int8), fixado na criação
+        """
+        CREATE TABLE IF NOT EXISTS acervo_config (
+            chave TEXT PRIMARY KEY,
+            valor TEXT NOT NULL
+        )
+        """,
+    ],
+]
+
+
+
+def versao_do_banco(caminho):
+    return conectar(caminho).execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migracoes(caminho, migracoes):
+    """
+    Aplica as migrações que faltam, cada uma na sua própria transação
+    (se uma falhar, o banco fica na versão anterior). Retorna a versão final.
+    """
+    conn = conectar(caminho)
+    for numero in range(versao_do_banco(caminho) + 1, len(migracoes) + 1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # outro processo pode ter migrado enquanto esperávamos o lock
+            if versao_do_banco(caminho) >= numero:
+                conn.rollback()
+                continue
+            for comando in migracoes[numero - 1]:
+                conn.execute(comando)
+            conn.execute(f"PRAGMA user_version = {numero}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"[DB Manager] {Path(caminho).name}: migração {numero} aplicada.")
+    return versao_do_banco(caminho)
+
 
 def inicializar_bancos_de_dados():
     """
@@ -16,56 +223,14 @@ def inicializar_bancos_de_dados():
         # Garante que o diretório 'data' exista
         CHANNELS_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-        # --- 1. Banco de Dados de Canais ---
-        # Conecta e cria a tabela 'canais' se ela não existir
-        with sqlite3.connect(CHANNELS_DB_PATH) as conn_channels:
-            cursor = conn_channels.cursor()
-            # SQL copiado exatamente do seu modal_criar_canal.py
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS canais (
-                    id TEXT PRIMARY KEY,
-                    nome TEXT NOT NULL UNIQUE,
-                    idioma TEXT,
-                    marca_dagua TEXT,
-                    ativo INTEGER DEFAULT 1,
-                    caminho_videos TEXT,
-                    roteiros_gerados INTEGER DEFAULT 0,
-                    data_criacao TEXT,
-                    configs TEXT
-                )
-            """)
-            conn_channels.commit()
-
-        # --- 2. Banco de Dados de Vídeos ---
-        # Conecta e cria a tabela 'videos' se ela não existir
-        with sqlite3.connect(VIDEOS_DB_PATH) as conn_videos:
-            cursor = conn_videos.cursor()
-            # SQL copiado exatamente do seu modal_adicionar_videos.py
-            # Adicionei a coluna 'configs' que estava faltando no seu CREATE TABLE, mas existia no INSERT
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS videos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    canal TEXT NOT NULL,
-                    video_id TEXT NOT NULL,
-                    link TEXT,
-                    roteiro_ok INTEGER DEFAULT 0,
-                    audio_ok INTEGER DEFAULT 0,
-                    legenda_ok INTEGER DEFAULT 0,
-                    metadado_ok INTEGER DEFAULT 0,
-                    thumb_ok INTEGER DEFAULT 0,
-                    estado INTEGER DEFAULT 0,
-                    roteiro_data TEXT,
-                    audio_data TEXT,
-                    legenda_data TEXT,
-                    metadado_data TEXT,
-                    thumb_data TEXT,
-                    criado_em TEXT,
-                    configs TEXT,
-                    UNIQUE(canal, video_id)
-                )
-            """)
-            conn_videos.commit()
-        
+        # --- 1. Modo WAL (uma vez; fica gravado nos arquivos) ---
+        ativar_wal(CHANNELS_DB_PATH)
+        ativar_wal(VIDEOS_DB_PATH)
+
+        # --- 2. Esquema: cria ou atualiza até a última versão ---
+        aplicar_migracoes(CHANNELS_DB_PATH, MIGRACOES_CANAIS)
+        aplicar_migracoes(VIDEOS_DB_PATH, MIGRACOES_VIDEOS)
+
         # Se chegou até aqui, tudo ocorreu bem.
         print("[DB Manager] Bancos de dados inicializados com sucesso.")
 
@@ -0,0 +1,120 @@
+# governador.py
+#
+# Controle de carga único por processo para os trabalhos pesados (ffmpeg do
+# importador, WhisperX, e a montagem do vídeo quando existir), no lugar das
+# pausas fixas do antigo descansar().
+#
+# - Quantos trabalhos podem rodar juntos (o "limite") se ajusta sozinho:
+#   sobe de um em um enquanto CPU, RAM e temperatura estão com folga e os
+#   trabalhos ocupam todas as vagas; cai pela metade quando alguma passa do
+#   alvo (CPU_ALVO, RAM_ALVO, TEMP_ALVO).
+# - Uso:
+#
+#       with governador.vaga():
+#           subprocess.run([...])
+#
+#   Se há vaga, entra na hora; só espera quem passaria do limite. Sempre
+#   roda pelo menos um, então nada trava.
+# - As medidas não bloqueiam: cpu_percent(interval=None) compara com a
+#   medida anterior. A temperatura só existe onde o psutil a expõe (Linux);
+#   sem ela, valem CPU e RAM.
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+CPU_ALVO = 85.0       # % de CPU do sistema
+RAM_ALVO = 85.0       # % de RAM em uso
+TEMP_ALVO = 85.0      # °C do sensor mais quente
+FOLGA = 10.0          # pontos abaixo do alvo para poder subir o limite
+INTERVALO_AMOSTRA = 1.0  # segundos entre medidas (e entre reavaliações de quem espera)
+
+
+def medir():
+    """{"cpu", "ram", "temp"} agora (temp = None se não houver sensor)."""
+    import psutil
+    temp = None
+    sensores = getattr(psutil, "sensors_temperatures", None)
+    if sensores is not None:
+        try:
+            leituras = [s.current for lista in sensores().values() for s in lista if s.current]
+            temp = max(leituras) if leituras else None
+        except Exception:
+            temp = None
+    return {"cpu": psutil.cpu_percent(interval=None), "ram": psutil.virtual_memory().percent, "temp": temp}
+
+
+class Governador:
+    def __init__(self, minimo=1, maximo=None, cpu_alvo=CPU_ALVO, ram_alvo=RAM_ALVO, temp_alvo=TEMP_ALVO):
+        self.minimo = minimo
+        self.maximo = maximo or os.cpu_count() or 1
+        self.alvos = {"cpu": cpu_alvo, "ram": ram_alvo, "temp": temp_alvo}
+        self.limite = minimo
+        self.ativos = 0
+        self._cond = threading.Condition()
+        self._ultima = 0.0
+        self._iniciado = False
+
+    def _ajustar(self):
+        """Mede (no máximo a cada INTERVALO_AMOSTRA) e recalcula o limite. Chamar com o lock."""
+        agora = time.monotonic()
+        if not self._iniciado:
+            medir()   # a primeira leitura de cpu_percent não vale: só marca o ponto de partida
+            self._iniciado, self._ultima = True, agora
+            return
+        if agora - self._ultima < INTERVALO_AMOSTRA:
+            return
+        self._ultima = agora
+        m = medir()
+        acima = [k for k, alvo in self.alvos.items() if m[k] is not None and m[k] >= alvo]
+        folga = all(m[k] is None or m[k] < alvo - FOLGA for k, alvo in self.alvos.items())
+        antigo = self.limite
+        if acima:
+            self.limite = max(self.minimo, self.limite // 2)
+        elif folga and self.ativos >= self.limite:
+            self.limite = min(self.maximo, self.limite + 1)
+        if self.limite != antigo:
+            temp = f", {m['temp']:.0f}°C" if m["temp"] is not None else ""
+            print(f"🎛️ Governador: {antigo} → {self.limite} trabalho(s) (CPU {m['cpu']:.0f}%, RAM {m['ram']:.0f}%{temp})")
+            self._cond.notify_all()
+
+    def entrar(self, peso=1):
+        with self._cond:
+            self._ajustar()
+            # sem ninguém rodando entra sempre (mesmo com peso acima do limite)
+            while self.ativos > 0 and self.ativos + peso > self.limite:
+                self._cond.wait(INTERVALO_AMOSTRA)
+                self._ajustar()
+            self.ativos += peso
+
+    def sair(self, peso=1):
+        with self._cond:
+            self.ativos = max(0, self.ativos - peso)
+            self._ajustar()
+            self._cond.notify_all()
+
+    @contextmanager
+    def vaga(self, peso=1):
+        self.entrar(peso)
+        try:
+            yield
+        finally:
+            self.sair(peso)
+
+
+_padrao = None
+_lock = threading.Lock()
+
+
+def padrao():
+    """O governador compartilhado do processo."""
+    global _padrao
+    with _lock:
+        if _padrao is None:
+            _padrao = Governador()
+        return _padrao
+
+
+def vaga(peso=1):
+    return padrao().vaga(peso)
@@ -1,56 +1,26 @@
 import os
 import json
-import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as tb
 from datetime import datetime
 from pathlib import Path
+from db_manager import conectar
 
 VIDEOS_DB_PATH = Path("data/videos.db")
 CHANNELS_DB_PATH = Path("data/channels.db")
 
-def verificar_ou_criar_videos_db():
-    if not VIDEOS_DB_PATH.exists():
-        VIDEOS_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS videos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            canal TEXT NOT NULL,
-            video_id TEXT NOT NULL,
-            link TEXT,
-            roteiro_ok INTEGER DEFAULT 0,
-            audio_ok INTEGER DEFAULT 0,
-            legenda_ok INTEGER DEFAULT 0,
-            metadado_ok INTEGER DEFAULT 0,
-            thumb_ok INTEGER DEFAULT 0,
-            estado INTEGER DEFAULT 0,
-            roteiro_data TEXT,
-            audio_data TEXT,
-            legenda_data TEXT,
-            metadado_data TEXT,
-            thumb_data TEXT,
-            criado_em TEXT,
-            configs TEXT
-        );
-    """)
-
-        conn.commit()
-
 def obter_lista_canais():
     canais = []
     if CHANNELS_DB_PATH.exists():
-        with sqlite3.connect(CHANNELS_DB_PATH) as conn:
+        with conectar(CHANNELS_DB_PATH) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT nome FROM canais ORDER BY nome ASC")
             canais = [row[0] for row in cursor.fetchall()]
     return canais
 
 def obter_configs_do_canal(canal_nome):
-    with sqlite3.connect(CHANNELS_DB_PATH) as conn:
+    with conectar(CHANNELS_DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT configs FROM canais WHERE nome = ?", (canal_nome,))
         row = cursor.fetchone()
@@ -115,7 +85,7 @@ def abrir_modal_adicionar_videos(janela_pai, callback_atualizar_lista=None):
         existentes = [int(p) for p in os.listdir(canal_path) if p.isdigit()]
         proximo_id = max(existentes, default=0) + 1
 
-        with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+        with conectar(VIDEOS_DB_PATH) as conn:
             cursor = conn.cursor()
 
             for i, link in enumerate(links):
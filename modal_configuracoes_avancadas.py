@@ -1,17 +1,17 @@
 import os
 import json
-import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as tb
 from pathlib import Path
 from tkinter import simpledialog
+from db_manager import conectar
 
 DB_PATH = Path("data/channels.db")
 SENHA_SECRETA = "595985656729"
 
 def abrir_modal_configuracoes_avancadas(janela_pai, canal_id, fechar_modal_pai=None):
-    with sqlite3.connect(DB_PATH) as conn:
+    with conectar(DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT nome, configs FROM canais WHERE id = ?", (canal_id,))
         resultado = cursor.fetchone()
@@ -40,7 +40,7 @@ def abrir_modal_configuracoes_avancadas(janela_pai, canal_id, fechar_modal_pai=N
     # Criar modal
     modal = tb.Toplevel(janela_pai)
     modal.title(f"Configurações Avançadas - {nome}")
-    modal.geometry("400x500")
+    modal.geometry("400x600")
     modal.grab_set()
 
     switches = {}
@@ -53,6 +53,8 @@ def abrir_modal_configuracoes_avancadas(janela_pai, canal_id, fechar_modal_pai=N
 
     # Adiciona todos os switches
     adicionar_switch("gerar_roteiro", "Gerar Roteiro")
+    adicionar_switch("conteudos_paralelos", "Conteúdos em Paralelo")
+    adicionar_switch("costurar_conteudos", "Costurar Transições")
     adicionar_switch("gerar_audio", "Gerar Áudio")
     adicionar_switch("audio_manual", "Áudio Manual")
     adicionar_switch("gerar_video", "Gerar Vídeo")
@@ -66,7 +68,7 @@ def abrir_modal_configuracoes_avancadas(janela_pai, canal_id, fechar_modal_pai=N
             configs[chave] = var.get()
 
         try:
-            with sqlite3.connect(DB_PATH) as conn:
+            with conectar(DB_PATH) as conn:
                 cursor = conn.cursor()
                 cursor.execute("UPDATE canais SET configs = ? WHERE id = ?", (json.dumps(configs), canal_id))
                 conn.commit()
@@ -1,11 +1,11 @@
 import os
 import json
-import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as tb
 from pathlib import Path
 from tkinter import simpledialog
+from db_manager import conectar
 
 VIDEOS_DB_PATH = Path("data/videos.db")
 SENHA_SECRETA = "123"
@@ -18,7 +18,7 @@ def abrir_modal_configuracoes_avancadas_video(janela_pai, video_id, fechar_modal
         return
 
     # Busca configs no banco
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT canal, configs FROM videos WHERE video_id = ?", (video_id,))
         resultado = cursor.fetchone()
@@ -41,7 +41,7 @@ def abrir_modal_configuracoes_avancadas_video(janela_pai, video_id, fechar_modal
     # Cria modal
     modal = tb.Toplevel(janela_pai)
     modal.title(f"Configurações Avançadas - Vídeo {video_id} ({canal})")
-    modal.geometry("400x500")
+    modal.geometry("400x600")
     modal.grab_set()
 
     switches = {}
@@ -54,6 +54,8 @@ def abrir_modal_configuracoes_avancadas_video(janela_pai, video_id, fechar_modal
 
     # Switches disponíveis
     adicionar_switch("gerar_roteiro", "Gerar Roteiro")
+    adicionar_switch("conteudos_paralelos", "Conteúdos em Paralelo")
+    adicionar_switch("costurar_conteudos", "Costurar Transições")
     adicionar_switch("gerar_audio", "Gerar Áudio")
     adicionar_switch("audio_manual", "Áudio Manual")
     adicionar_switch("gerar_video", "Gerar Vídeo")
@@ -67,7 +69,7 @@ def abrir_modal_configuracoes_avancadas_video(janela_pai, video_id, fechar_modal
             configs[chave] = var.get()
 
         try:
-            with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+            with conectar(VIDEOS_DB_PATH) as conn:
                 cursor = conn.cursor()
                 cursor.execute("UPDATE videos SET configs = ? WHERE video_id = ?", (json.dumps(configs), video_id))
                 conn.commit()
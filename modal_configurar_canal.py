@@ -1,18 +1,18 @@
 import os
 import json
-import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import ttkbootstrap as tb
 from pathlib import Path
 from app_videoforge.vf_roteiro import IDIOMAS_SUPORTADOS
 from modal_configuracoes_avancadas import abrir_modal_configuracoes_avancadas
+from db_manager import conectar
 
 DB_PATH = Path("data/channels.db")
 
 
 def abrir_modal_configurar_canal(janela_pai, canal_id, callback_atualizar_lista=None):
-    with sqlite3.connect(DB_PATH) as conn:
+    with conectar(DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT nome, idioma, marca_dagua, caminho_videos FROM canais WHERE id = ?", (canal_id,))
         canal = cursor.fetchone()
@@ -74,7 +74,7 @@ def abrir_modal_configurar_canal(janela_pai, canal_id, callback_atualizar_lista=
         novo_roteiro = prompt_roteiro_text.get("1.0", tk.END).strip()
 
         try:
-            with sqlite3.connect(DB_PATH) as conn:
+            with conectar(DB_PATH) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     UPDATE canais
@@ -104,7 +104,7 @@ def abrir_modal_configurar_canal(janela_pai, canal_id, callback_atualizar_lista=
             return
 
         try:
-            with sqlite3.connect(DB_PATH) as conn:
+            with conectar(DB_PATH) as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM canais WHERE id = ?", (canal_id,))
                 conn.commit()
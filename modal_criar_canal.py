@@ -1,36 +1,16 @@
 import os
 import uuid
 import json
-import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as tb
 from datetime import datetime
 from pathlib import Path
 from app_videoforge.vf_roteiro import IDIOMAS_SUPORTADOS
+from db_manager import conectar
 
 DB_PATH = Path("data/channels.db")
 
-def verificar_e_criar_db():
-    DB_PATH.parent.mkdir(exist_ok=True)
-    if not DB_PATH.exists():
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS canais (
-                    id TEXT PRIMARY KEY,
-                    nome TEXT NOT NULL UNIQUE,
-                    idioma TEXT,
-                    marca_dagua TEXT,
-                    ativo INTEGER DEFAULT 1,
-                    caminho_videos TEXT,
-                    roteiros_gerados INTEGER DEFAULT 0,
-                    data_criacao TEXT,
-                    configs TEXT
-                );
-            """)
-            conn.commit()
-
 def abrir_modal_criar_canal(janela_pai, callback_atualizar_lista=None):
 
     modal = tb.Toplevel(janela_pai)
@@ -103,7 +83,7 @@ def abrir_modal_criar_canal(janela_pai, callback_atualizar_lista=None):
         }
 
         try:
-            with sqlite3.connect(DB_PATH) as conn:
+            with conectar(DB_PATH) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM canais WHERE nome = ?", (nome,))
                 if cursor.fetchone()[0] > 0:
@@ -1,10 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as tb
-import sqlite3
 from pathlib import Path
 from datetime import datetime
 from modal_configuracoes_avancadas_video import abrir_modal_configuracoes_avancadas_video
+from db_manager import conectar
 
 VIDEOS_DB_PATH = Path("data/videos.db")
 
@@ -32,7 +32,7 @@ def abrir_modal_editar_video(janela_pai, video_id, canal_nome, callback_atualiza
     switches = {}
     datas_atuais = {}
 
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT roteiro_ok, audio_ok, legenda_ok, metadado_ok, thumb_ok,
@@ -88,7 +88,7 @@ def abrir_modal_editar_video(janela_pai, video_id, canal_nome, callback_atualiza
         novas_datas = [datas_atuais[k] for k in datas_keys]
         novo_estado = INVERSE_ESTADOS.get(estado_var.get(), 0)
 
-        with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+        with conectar(VIDEOS_DB_PATH) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE videos SET
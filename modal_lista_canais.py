@@ -1,11 +1,11 @@
 import os
-import sqlite3
 import tkinter as tk
 from pathlib import Path
 from tkinter import ttk
 import ttkbootstrap as tb
 from modal_configurar_canal import abrir_modal_configurar_canal
 from modal_lista_videos_por_canal import abrir_modal_lista_videos_por_canal
+from db_manager import conectar
 
 DB_PATH = Path("data/channels.db")
 VIDEOS_DB_PATH = Path("data/videos.db")
@@ -14,7 +14,7 @@ def obter_contagem_videos(canal_nome):
     if not VIDEOS_DB_PATH.exists():
         return 0, 0
 
-    with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+    with conectar(VIDEOS_DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT estado FROM videos WHERE canal = ?", (canal_nome,))
         estados = [row[0] for row in cursor.fetchall()]
@@ -55,7 +55,7 @@ def criar_lista_canais(container):
         mostrar_mensagem_boas_vindas(scroll_frame)
         return
 
-    with sqlite3.connect(DB_PATH) as conn:
+    with conectar(DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT id, nome, caminho_videos FROM canais ORDER BY nome ASC")
         canais = cursor.fetchall()
@@ -1,5 +1,4 @@
 
-import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as tb
@@ -7,6 +6,7 @@ from ttkbootstrap.constants import *
 from datetime import datetime
 from pathlib import Path
 from modal_editar_video import abrir_modal_editar_video  # Certifique-se de ter esse arquivo
+from db_manager import conectar
 
 VIDEOS_DB_PATH = Path("data/videos.db")
 
@@ -75,7 +75,7 @@ def abrir_modal_lista_videos_por_canal(janela_pai, canal_nome, callback_atualiza
         busca = busca_var.get().lower()
         estado_filtro = estado_var.get()
 
-        with sqlite3.connect(VIDEOS_DB_PATH) as conn:
+        with conectar(VIDEOS_DB_PATH) as conn:
             cursor = conn.cursor()
 
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='videos'")
@@ -0,0 +1,149 @@
+# modelos.py
+#
+# Registro único dos modelos locais (embedding MiniLM, BLIP...) por processo.
+#
+# - Cada modelo é carregado uma vez só, no primeiro uso, não importa quantos
+#   módulos o usem (controller_midia, preencher_nome_midia,
+#   preencher_segmentos_obrigatorio, teste_busca_annoy...).
+# - Uso com contagem de referências:
+#
+#       with modelos.usar("embedding") as modelo:
+#           vetor = modelo.encode(texto)
+#
+# - Um modelo sem ninguém usando há mais de OCIOSO_SEGUNDOS é descarregado
+#   por uma thread em segundo plano (e a memória da GPU devolvida); o
+#   próximo usar() carrega de novo.
+#
+# O WhisperX não passa por aqui: roda como processo separado
+# (whisperx_analisador.py), que devolve toda a memória ao terminar.
+
+import time
+import threading
+from contextlib import contextmanager
+
+OCIOSO_SEGUNDOS = 300     # descarrega modelos parados há mais que isso
+INTERVALO_VARREDURA = 30  # segundos entre verificações de ociosidade
+
+MODELO_EMBEDDING = "all-MiniLM-L6-v2"
+MODELO_BLIP = "Salesforce/blip-image-captioning-large"
+
+_fabricas = {}      # nome -> função que carrega e retorna o modelo
+_carregados = {}    # nome -> {"modelo", "refs", "ultimo_uso"}
+_lock = threading.RLock()
+_varredor = None
+_dispositivo = None
+
+
+def dispositivo():
+    """"cuda" se houver GPU, senão "cpu" (importa o torch só na primeira chamada)."""
+    global _dispositivo
+    if _dispositivo is None:
+        import torch
+        _dispositivo = "cuda" if torch.cuda.is_available() else "cpu"
+    return _dispositivo
+
+
+def registrar(nome, carregar):
+    """Registra (ou troca) a função que carrega o modelo `nome`."""
+    with _lock:
+        _fabricas[nome] = carregar
+
+
+def _carregar_embedding():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODELO_EMBEDDING, device=dispositivo())
+
+
+def _carregar_blip():
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+    processor = BlipProcessor.from_pretrained(MODELO_BLIP)
+    model = BlipForConditionalGeneration.from_pretrained(MODELO_BLIP).to(dispositivo())
+    return processor, model
+
+
+registrar("embedding", _carregar_embedding)
+registrar("blip", _carregar_blip)
+
+
+def _iniciar_varredor():
+    global _varredor
+    if _varredor is None:
+        _varredor = threading.Thread(target=_varrer, name="modelos_ociosos", daemon=True)
+        _varredor.start()
+
+
+def _varrer():
+    while True:
+        time.sleep(INTERVALO_VARREDURA)
+        descarregar_ociosos()
+
+
+def adquirir(nome):
+    """Retorna o modelo (carregando se preciso) e conta uma referência. Ver liberar()."""
+    with _lock:
+        if nome not in _fabricas:
+            raise KeyError(f"Modelo não registrado: '{nome}'")
+        entrada = _carregados.get(nome)
+        if entrada is None:
+            print(f"🧠 Carregando modelo '{nome}'...")
+            inicio = time.perf_counter()
+            entrada = _carregados[nome] = {"modelo": _fabricas[nome](), "refs": 0, "ultimo_uso": 0.0}
+            print(f"🧠 Modelo '{nome}' carregado em {time.perf_counter() - inicio:.1f}s")
+            _iniciar_varredor()
+        entrada["refs"] += 1
+        entrada["ultimo_uso"] = time.monotonic()
+        return entrada["modelo"]
+
+
+def liberar(nome):
+    with _lock:
+        entrada = _carregados.get(nome)
+        if entrada is not None:
+            entrada["refs"] = max(0, entrada["refs"] - 1)
+            entrada["ultimo_uso"] = time.monotonic()
+
+
+@contextmanager
+def usar(nome):
+    modelo = adquirir(nome)
+    try:
+        yield modelo
+    finally:
+        liberar(nome)
+
+
+def _liberar_memoria():
+    import sys
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def descarregar(nome):
+    """Descarrega `nome` se ninguém estiver usando. Retorna True se descarregou."""
+    with _lock:
+        entrada = _carregados.get(nome)
+        if entrada is None or entrada["refs"] > 0:
+            return False
+        del _carregados[nome]
+    print(f"🧹 Modelo '{nome}' descarregado.")
+    _liberar_memoria()
+    return True
+
+
+def descarregar_ociosos(ocioso_segundos=None):
+    """Descarrega os modelos sem uso há mais de `ocioso_segundos` (padrão OCIOSO_SEGUNDOS)."""
+    limite = OCIOSO_SEGUNDOS if ocioso_segundos is None else ocioso_segundos
+    agora = time.monotonic()
+    with _lock:
+        ociosos = [
+            nome for nome, e in _carregados.items()
+            if e["refs"] == 0 and agora - e["ultimo_uso"] >= limite
+        ]
+    return [nome for nome in ociosos if descarregar(nome)]
+
+
+def carregados():
+    """{nome: referências ativas} dos modelos em memória."""
+    with _lock:
+        return {nome: e["refs"] for nome, e in _carregados.items()}
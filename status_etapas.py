@@ -0,0 +1,148 @@
+# status_etapas.py
+#
+# Situação persistente de cada etapa de cada vídeo (tabela "etapas" do
+# videos.db, criada pela migração 3 do db_manager), no lugar de varrer
+# data/<canal>/<video>/control a cada execução.
+#
+# - Cada fluxo (roteiro, gerador_video, videoforge) registra suas etapas e
+#   dependências com registrar_fluxo().
+# - Uma etapa só ganha linha "pendente" quando todas as dependências ficam
+#   "concluida"; vídeos novos da tabela videos entram nas etapas sem
+#   dependência (marca d'água por videos.id, então só os novos são lidos).
+# - listar_pendentes() é uma única consulta no índice e cresce com o
+#   trabalho pendente, não com o total de vídeos já criados.
+# - As etapas chamam marcar() quando terminam.
+# - Apagar o arquivo de saída de uma etapa concluída continua refazendo a
+#   etapa: quem lista pendências chama antes reabrir_sem_saida(), que confere
+#   (um stat por vídeo, sem listar pastas) se a saída das concluídas existe.
+
+from datetime import datetime
+
+from db_manager import conectar, VIDEOS_DB_PATH
+
+PENDENTE = "pendente"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+
+_fluxos = {}   # fluxo -> {etapa: [dependências]}
+
+
+def registrar_fluxo(fluxo, dependencias):
+    """dependencias: {etapa: [etapas das quais depende]} (na ordem de execução)."""
+    _fluxos[fluxo] = {etapa: list(deps) for etapa, deps in dependencias.items()}
+
+
+def _dependencias(fluxo):
+    if fluxo not in _fluxos:
+        raise ValueError(f"Fluxo de etapas não registrado: '{fluxo}'")
+    return _fluxos[fluxo]
+
+
+def _sincronizar_videos(conn, fluxo):
+    """Semeia as etapas iniciais dos vídeos adicionados desde a última chamada."""
+    raizes = [etapa for etapa, deps in _dependencias(fluxo).items() if not deps]
+    row = conn.execute("SELECT ultimo_video FROM etapas_fluxos WHERE fluxo = ?", (fluxo,)).fetchone()
+    ultimo = row[0] if row else 0
+    novos = conn.execute(
+        "SELECT id, canal, video_id FROM videos WHERE id > ? ORDER BY id", (ultimo,)
+    ).fetchall()
+    if not novos:
+        return
+    agora = datetime.now().isoformat()
+    conn.executemany(
+        "INSERT OR IGNORE INTO etapas (fluxo, canal, video_id, etapa, situacao, atualizado_em) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [(fluxo, canal, video_id, etapa, PENDENTE, agora) for _, canal, video_id in novos for etapa in raizes]
+    )
+    conn.execute(
+        "INSERT INTO etapas_fluxos (fluxo, ultimo_video) VALUES (?, ?) "
+        "ON CONFLICT(fluxo) DO UPDATE SET ultimo_video = excluded.ultimo_video",
+        (fluxo, novos[-1][0])
+    )
+
+
+def listar_pendentes(fluxo, etapa, canal=None, incluir_falhas=True):
+    """
+    Vídeos com a etapa pronta para rodar, no formato {canal: [video_id, ...]}.
+    incluir_falhas=True devolve também as que falharam antes (nova tentativa).
+    """
+    situacoes = (PENDENTE, FALHOU) if incluir_falhas else (PENDENTE,)
+    with conectar(VIDEOS_DB_PATH) as conn:
+        _sincronizar_videos(conn, fluxo)
+        sql = (
+            "SELECT canal, video_id FROM etapas "
+            f"WHERE fluxo = ? AND etapa = ? AND situacao IN ({', '.join('?' * len(situacoes))})"
+        )
+        params = [fluxo, etapa, *situacoes]
+        if canal is not None:
+            sql += " AND canal = ?"
+            params.append(canal)
+        # sem ORDER BY: com ele o SQLite prefere varrer a chave primária do fluxo
+        linhas = sorted(conn.execute(sql, params).fetchall())
+
+    tarefas = {}
+    for canal_linha, video_id in linhas:
+        tarefas.setdefault(canal_linha, []).append(video_id)
+    return tarefas
+
+
+def marcar(fluxo, canal, video_id, etapa, situacao=CONCLUIDA):
+    """
+    Grava a situação da etapa. Ao concluir, libera (linha "pendente") as
+    etapas seguintes do fluxo cujas dependências ficaram todas prontas.
+    """
+    dependencias = _dependencias(fluxo)
+    agora = datetime.now().isoformat()
+    with conectar(VIDEOS_DB_PATH) as conn:
+        conn.execute(
+            "INSERT INTO etapas (fluxo, canal, video_id, etapa, situacao, atualizado_em) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(fluxo, canal, video_id, etapa) DO UPDATE SET "
+            "situacao = excluded.situacao, atualizado_em = excluded.atualizado_em",
+            (fluxo, canal, video_id, etapa, situacao, agora)
+        )
+        if situacao != CONCLUIDA:
+            return
+        concluidas = {
+            row[0] for row in conn.execute(
+                "SELECT etapa FROM etapas WHERE fluxo = ? AND canal = ? AND video_id = ? AND situacao = ?",
+                (fluxo, canal, video_id, CONCLUIDA)
+            )
+        }
+        liberadas = [
+            proxima for proxima, deps in dependencias.items()
+            if etapa in deps and all(d in concluidas for d in deps)
+        ]
+        conn.executemany(
+            "INSERT OR IGNORE INTO etapas (fluxo, canal, video_id, etapa, situacao, atualizado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(fluxo, canal, video_id, proxima, PENDENTE, agora) for proxima in liberadas]
+        )
+
+
+def reabrir(fluxo, canal, video_id, etapa):
+    """Volta a etapa para "pendente" (ex.: o arquivo de saída foi apagado para refazer)."""
+    marcar(fluxo, canal, video_id, etapa, PENDENTE)
+
+
+def reabrir_sem_saida(fluxo, etapa, tem_saida, canal=None):
+    """
+    Volta para "pendente" as linhas concluídas da etapa cuja saída sumiu
+    (tem_saida(canal, video_id) -> False). Retorna quantas reabriu.
+    """
+    sql = "SELECT canal, video_id FROM etapas WHERE fluxo = ? AND etapa = ? AND situacao = ?"
+    params = [fluxo, etapa, CONCLUIDA]
+    if canal is not None:
+        sql += " AND canal = ?"
+        params.append(canal)
+    with conectar(VIDEOS_DB_PATH) as conn:
+        concluidas = conn.execute(sql, params).fetchall()
+    sumidas = [(c, v) for c, v in concluidas if not tem_saida(c, v)]
+    if sumidas:
+        agora = datetime.now().isoformat()
+        with conectar(VIDEOS_DB_PATH) as conn:
+            conn.executemany(
+                "UPDATE etapas SET situacao = ?, atualizado_em = ? "
+                "WHERE fluxo = ? AND canal = ? AND video_id = ? AND etapa = ?",
+                [(PENDENTE, agora, fluxo, c, v, etapa) for c, v in sumidas]
+            )
+    return len(sumidas)
@@ -0,0 +1,60 @@
+import sys
+import time
+import numpy as np
+
+from app_midia_manual_importer import indice_midia
+from app_gerador_de_video import backends_busca
+
+# Compara os backends de busca (backends_busca.py) na biblioteca real de
+# data_midia: tempo de montagem, consultas por segundo e recall@k contra a
+# busca exata. As consultas são vetores da própria biblioteca com um pouco
+# de ruído (parecidas com descrições de segmentos, sem precisar do modelo).
+#
+#   python teste_benchmark_busca.py [n_consultas] [k]
+N_CONSULTAS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+K = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+RUIDO = 0.05
+CONFIGURACOES = [
+    ("exato", {}),
+    ("annoy", {"search_k": -1}),
+    ("annoy", {"search_k": 10 * indice_midia.N_ARVORES * K}),
+    ("hnsw", {"ef": 64}),
+    ("hnsw", {"ef": 128}),
+    ("hnsw", {"ef": 256}),
+]
+
+
+def recall(achados, verdade):
+    return np.mean([len(set(a) & set(v)) / len(v) for a, v in zip(achados, verdade)])
+
+
+ids, vetores, _ = indice_midia.carregar()
+if len(ids) == 0:
+    sys.exit("⚠️ Índice vazio: rode o importador de mídias antes.")
+K = min(K, len(ids))
+print(f"📦 {len(ids)} mídias | {N_CONSULTAS} consultas | k={K}")
+
+gerador = np.random.default_rng(0)
+amostra = gerador.choice(len(ids), size=N_CONSULTAS, replace=N_CONSULTAS > len(ids))
+consultas = backends_busca.normalizar(vetores[amostra])
+consultas = backends_busca.normalizar(consultas + RUIDO * gerador.standard_normal(consultas.shape))
+consultas = consultas.astype("float32")
+
+verdade, _ = backends_busca.BuscaExata(ids, vetores).buscar(consultas, K)
+
+for nome, parametros in CONFIGURACOES:
+    rotulo = nome + "".join(f" {p}={v}" for p, v in parametros.items())
+    try:
+        inicio = time.perf_counter()
+        backend = backends_busca.criar_backend(nome, ids, vetores, **parametros)
+        montagem = time.perf_counter() - inicio
+    except ImportError as e:
+        print(f"⚠️ {rotulo}: indisponível ({e})")
+        continue
+    inicio = time.perf_counter()
+    achados, _ = backend.buscar(consultas, K)
+    duracao = time.perf_counter() - inicio
+    print(
+        f"✅ {rotulo:<28} montagem {montagem:6.2f}s | "
+        f"{N_CONSULTAS / duracao:9.0f} consultas/s | recall@{K} {recall(achados, verdade):.3f}"
+    )
@@ -1,50 +1,31 @@
-import json
-import numpy as np
-from pathlib import Path
-from annoy import AnnoyIndex
-from sentence_transformers import SentenceTransformer, util
-import torch
-
-# Configurações
-INDEX_DIR = Path("data_midia/index_annoy")
-MAP_FILE = INDEX_DIR / "index_map.json"
-ANNOY_FILE = INDEX_DIR / "index.ann"
-VECTOR_SIZE = 384
-
-# Carrega mapeamento
-with open(MAP_FILE, "r", encoding="utf-8") as f:
-    index_map = json.load(f)
-
-# Carrega índice Annoy
-ann_index = AnnoyIndex(VECTOR_SIZE, "angular")
-ann_index.load(str(ANNOY_FILE))
-
-# Modelo e dispositivo
-modelo = SentenceTransformer("all-MiniLM-L6-v2")
-device = "cuda" if torch.cuda.is_available() else "cpu"
+import sys
+
+from app_gerador_de_video.busca_midia import carregar_index, embutir, vizinhos
+from app_midia_manual_importer import acervo_embeddings
+
+# Backend de busca: argumento da linha de comando ou BUSCA_MIDIA_BACKEND
+# (exato, annoy, hnsw; ver app_gerador_de_video/backends_busca.py)
+backend = sys.argv[1] if len(sys.argv) > 1 else None
+
+# Carrega as mídias do acervo no backend escolhido
+index, index_map = carregar_index(backend)
+print(f"📦 {len(index)} mídias no índice (backend: {index.nome})")
 
 # Entrada do usuário
 consulta = input("🔍 Digite sua busca: ").strip()
-embedding = modelo.encode(consulta, convert_to_tensor=True).to(device)
-
-# Busca preliminar com Annoy
-ids, distancias = ann_index.get_nns_by_vector(embedding.cpu().numpy(), 100, include_distances=True)
-
-# Avalia com similaridade real
-resultados = []
-for id_, distancia in zip(ids, distancias):
-    item = index_map.get(str(id_))
-    if not item:
-        continue
-    caminho_npy = Path(item["caminho"]).with_suffix(".npy")
-    if not caminho_npy.exists():
-        continue
-    vetor = np.load(caminho_npy)
-    if vetor.ndim == 2:
-        vetor = vetor[0]
-    vetor_torch = torch.tensor(vetor).to(device)
-    score = util.cos_sim(embedding, vetor_torch).item()
-    resultados.append((score, distancia, item))
+embedding = embutir([consulta])
+
+# Busca preliminar no backend
+ids, similaridades = vizinhos(embedding, index, 100)
+ids, similaridades = ids[0], similaridades[0]
+
+# Avalia com similaridade real: os 100 vetores saem do acervo num fancy-index só
+scores = acervo_embeddings.vetores(ids) @ embedding[0]
+resultados = [
+    (float(score), float(sim), str(id_), index_map[str(id_)])
+    for id_, sim, score in zip(ids, similaridades, scores)
+    if str(id_) in index_map
+]
 
 # Filtra e ordena por maior similaridade real
 resultados = [r for r in resultados if r[0] >= 0.45]
@@ -55,9 +36,9 @@ print("\n🎯 Resultados mais similares:")
 if not resultados:
     print("Nenhum resultado relevante encontrado.")
 else:
-    for score, distancia, item in resultados[:10]:
+    for score, sim, id_, item in resultados[:10]:
         estrelas = "⭐" * int(score * 10)
-        print(f"✅ ID: {list(index_map.keys())[list(index_map.values()).index(item)]}")
+        print(f"✅ ID: {id_}")
         print(f"📁 {item['caminho']}")
         print(f"📝 Descrição: {item.get('descricao', '[sem descrição]')[:120]}...")
-        print(f"📏 Similaridade real: {score:.4f} | Distância Annoy: {distancia:.4f} {estrelas}\n")
+        print(f"📏 Similaridade real: {score:.4f} | Similaridade {index.nome}: {sim:.4f} {estrelas}\n")
@@ -0,0 +1,91 @@
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cache_llm
+import cliente_openai
+
+# Servidor falso que imita /v1/chat/completions localmente.
+# A cada requisição sorteia: 429 (com Retry-After), 500 ou resposta normal.
+PORTA = 8765
+CHANCE_429 = 0.2
+CHANCE_500 = 0.1
+LATENCIA = 0.3  # segundos
+
+contadores = {"ok": 0, "429": 0, "500": 0}
+contadores_lock = threading.Lock()
+
+
+class FakeOpenAI(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status, corpo, headers=None):
+        dados = json.dumps(corpo).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+        time.sleep(LATENCIA)
+
+        sorteio = random.random()
+        if sorteio < CHANCE_429:
+            with contadores_lock:
+                contadores["429"] += 1
+            return self._responder(429, {"error": {"message": "Rate limit", "type": "rate_limit"}}, {"retry-after": "0.2"})
+        if sorteio < CHANCE_429 + CHANCE_500:
+            with contadores_lock:
+                contadores["500"] += 1
+            return self._responder(500, {"error": {"message": "Erro interno", "type": "server_error"}})
+
+        with contadores_lock:
+            contadores["ok"] += 1
+        conteudo = pedido["messages"][-1]["content"]
+        self._responder(200, {
+            "id": "chatcmpl-falso",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": pedido.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": f"eco: {conteudo[:40]}"},
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+
+servidor = ThreadingHTTPServer(("127.0.0.1", PORTA), FakeOpenAI)
+threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+# O cache esconderia o servidor a partir da segunda execução
+cache_llm.configurar(ativo=False)
+cliente_openai.configurar(
+    base_url=f"http://127.0.0.1:{PORTA}/v1",
+    api_key="chave-falsa",
+    rpm=120,
+    concorrencia=8,
+)
+
+total = 40
+inicio = time.time()
+respostas = cliente_openai.completar_varios([
+    {"prompt": f"Pedido {i}", "model": "gpt-4o", "temperature": 0.5}
+    for i in range(total)
+])
+duracao = time.time() - inicio
+
+falhas = [r for r in respostas if isinstance(r, Exception)]
+print(f"✅ {total - len(falhas)}/{total} respostas em {duracao:.2f}s")
+print(f"📊 Servidor: {contadores}")
+print(f"🔁 Chamada síncrona: {cliente_openai.completar('Olá', model='gpt-4o-mini')}")
+servidor.shutdown()
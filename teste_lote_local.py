@@ -0,0 +1,102 @@
+import os
+import re
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+# Roda o modo lote inteiro contra o servidor de arquivos local (sem OpenAI).
+# As respostas falsas seguem o formato que cada etapa espera, então os
+# metadados.json dos vídeos pendentes ganham resumo, tópicos e introdução
+# de mentira. Por isso tudo roda numa pasta temporária com um canal e
+# vídeos de exemplo: os bancos e o data/ são relativos à pasta atual, então
+# o data/ de verdade nunca é tocado.
+CANAL = "canal_teste"
+VIDEOS = {
+    "video_001": "Hoje vamos falar sobre como montar uma horta em casa, escolher o vaso e regar na medida certa.",
+    "video_002": "Neste vídeo explico a história do café, da Etiópia até as fazendas do Brasil.",
+}
+
+contadores = {"pedidos": 0}
+
+
+def criar_exemplo():
+    """data/ mínimo na pasta atual: um canal, seus vídeos, transcrições e metadados."""
+    import db_manager
+
+    db_manager.inicializar_bancos_de_dados()
+    with db_manager.conectar(db_manager.CHANNELS_DB_PATH) as conn:
+        conn.execute("INSERT INTO canais (id, nome, idioma) VALUES (?, ?, ?)", ("1", CANAL, "pt"))
+    configs = json.dumps({"gerar_roteiro": True, "idioma": "pt"})
+    with db_manager.conectar(db_manager.VIDEOS_DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO videos (canal, video_id, configs) VALUES (?, ?, ?)",
+            [(CANAL, video_id, configs) for video_id in VIDEOS]
+        )
+
+    pasta_canal = Path("data") / CANAL
+    pasta_canal.mkdir(parents=True, exist_ok=True)
+    (pasta_canal / "prompts.json").write_text(
+        json.dumps({"prompt_topicos": "Divida o vídeo em 3 tópicos."}, ensure_ascii=False), encoding="utf-8"
+    )
+    for video_id, texto in VIDEOS.items():
+        control_dir = pasta_canal / video_id / "control"
+        control_dir.mkdir(parents=True, exist_ok=True)
+        (control_dir / "transcript_original.json").write_text(
+            json.dumps({"transcricao_limpa": texto}, ensure_ascii=False), encoding="utf-8"
+        )
+        (control_dir / "metadados.json").write_text(
+            json.dumps({"video_id": video_id}, ensure_ascii=False), encoding="utf-8"
+        )
+
+
+def responder_falso(corpos):
+    respostas = []
+    for corpo in corpos:
+        contadores["pedidos"] += 1
+        prompt = corpo["messages"][-1]["content"]
+        if "RESUMO:" in prompt:
+            respostas.append("\n".join(
+                f'Topico {n:02d}: "Título falso {n}"\nRESUMO: "Resumo falso do tópico {n}."'
+                for n in range(1, 4)
+            ))
+        elif re.search(r"introdu[çc][ãa]o", prompt, re.IGNORECASE) and "Tópicos do Vídeo" in prompt:
+            respostas.append("Introdução falsa gerada pelo servidor local.")
+        else:
+            respostas.append("Resumo falso gerado pelo servidor local.")
+    return respostas
+
+
+with tempfile.TemporaryDirectory(prefix="teste_lote_") as pasta_temp:
+    os.chdir(pasta_temp)
+    print(f"📁 Rodando em {pasta_temp}")
+    criar_exemplo()
+
+    import cache_llm
+    from app_videoforge import vf_lote
+
+    pasta = vf_lote.LOTES_DIR / "teste_local"
+    parar = threading.Event()
+    servidor = threading.Thread(
+        target=vf_lote.servir_pasta_local,
+        kwargs={"pasta": pasta, "responder": responder_falso, "intervalo": 0.2, "parar": parar.is_set},
+        daemon=True,
+    )
+    servidor.start()
+
+    # Respostas falsas não devem ficar no cache
+    cache_llm.configurar(ativo=False)
+    vf_lote.executar_lote(backend=vf_lote.BackendArquivos(pasta), intervalo=0.5)
+    parar.set()
+    servidor.join()
+    print(f"📊 Servidor local respondeu {contadores['pedidos']} pedidos")
+
+    for video_id in VIDEOS:
+        meta_path = vf_lote.DATA_DIR / CANAL / video_id / "control" / "metadados.json"
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        faltando = [c for c in ("resumo", "topicos", "introducao") if not meta.get(c)]
+        print(f"{'✅' if not faltando else '❌'} {video_id}: " + (f"faltou {', '.join(faltando)}" if faltando else "resumo, tópicos e introdução gravados"))
+
+    import db_manager
+    db_manager.fechar_conexoes()   # no Windows a pasta temporária não sai com o banco aberto
+    os.chdir(Path(__file__).resolve().parent)
@@ -0,0 +1,53 @@
+import sys
+import json
+import subprocess
+
+# Mede quanto cada módulo de entrada leva para importar, cada um num
+# interpretador novo (sem aproveitar o que outro já carregou), e quais
+# dependências pesadas ele puxou. Nenhuma deveria aparecer: modelos,
+# yt_dlp e o cliente OpenAI só carregam quando a etapa que usa roda.
+MODULOS = [
+    "app_videoforge.controller",
+    "app_videoforge.vf_worker",
+    "app_roteiro.controller_roteiro",
+    "app_gerador_de_video.controller_gerador_video",
+    "app_midia_manual_importer.controller_midia",
+    "app",
+]
+PESADOS = ["torch", "transformers", "sentence_transformers", "yt_dlp", "openai", "av", "cv2", "whisperx"]
+LIMITE_SEGUNDOS = 1.0
+REPETICOES = 3
+
+MEDIR = """
+import sys, json, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"segundos": duracao, "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def medir(modulo):
+    melhor = None
+    for _ in range(REPETICOES):
+        proc = subprocess.run(
+            [sys.executable, "-c", MEDIR.format(modulo=modulo, pesados=PESADOS)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            erro = (proc.stderr.strip().splitlines() or ["?"])[-1]
+            return {"erro": erro}
+        resultado = json.loads(proc.stdout.strip().splitlines()[-1])
+        if melhor is None or resultado["segundos"] < melhor["segundos"]:
+            melhor = resultado
+    return melhor
+
+
+for modulo in MODULOS:
+    r = medir(modulo)
+    if "erro" in r:
+        print(f"⚠️ {modulo}: não importou ({r['erro']})")
+        continue
+    marca = "✅" if r["segundos"] < LIMITE_SEGUNDOS and not r["pesados"] else "❌"
+    pesados = f" | carregou: {', '.join(r['pesados'])}" if r["pesados"] else ""
+    print(f"{marca} {modulo}: {r['segundos'] * 1000:.0f} ms{pesados}")